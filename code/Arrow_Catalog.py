@@ -0,0 +1,179 @@
+# Polars (Arrow)
+import polars as pl
+import pyarrow as pa
+
+# Tools
+import os
+import json
+import time
+from datetime import datetime
+
+
+### SHARED ARROW TABLES - DEFINE ###
+
+# Path (One Folder Per Table, One Uncompressed .arrow File Per Published Version)
+arrow_dir = 'Data/Arrow'
+catalog_file = 'Data/Arrow/catalog.json'
+
+# Versions Kept Per Table (Older Ones Are Removed On Publish Unless A Reader Still Has Them Open On Windows)
+KEEP_VERSIONS = 2
+
+# 1) FUNCTION: Catalog Read / Locked Update
+def load_catalog(path=catalog_file):
+    """This function will return {table name: entry} (path, rows, bytes, columns, published_at) from the catalog file"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def _update_catalog(name, entry, path=catalog_file, wait_seconds=30):
+    # Lock File (O_EXCL Works On Every OS And Shared Drive) So Two Publishers Never Drop Each Other's Entries
+    lock_path = path + '.lock'
+    deadline = time.time() + wait_seconds
+    while True:
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if time.time() > deadline:
+                raise TimeoutError(f"Catalog locked by another publisher: {lock_path}")
+            time.sleep(0.05)
+    try:
+        catalog = load_catalog(path)
+        catalog[name] = entry
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(catalog, file, indent=1, sort_keys=True)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    finally:
+        os.close(fd)
+        os.remove(lock_path)
+    return catalog
+
+# 2) FUNCTION: Publish A Table As A Memory-Mappable Arrow IPC File
+def publish_table(name, data, save_dir=arrow_dir, catalog_path=catalog_file, keep=KEEP_VERSIONS):
+    """This function will write data (polars, pandas or pyarrow) to Data/Arrow/{name}/{name}_{stamp}.arrow as one uncompressed
+    record batch (so readers map it with no decode and every column is one contiguous buffer) and point the catalog at it.
+
+    Each publish is a new file: processes that already opened the previous version keep reading it unchanged, new opens
+    get the new one. Returns the catalog entry"""
+    start_time = time.time()
+    if isinstance(data, pl.DataFrame):
+        table = data.to_arrow()
+    elif isinstance(data, pa.Table):
+        table = data
+    else:
+        table = pa.Table.from_pandas(data, preserve_index=False)
+    table = table.combine_chunks()
+
+    folder = os.path.join(save_dir, name)
+    os.makedirs(folder, exist_ok=True)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    path = os.path.join(folder, f"{name}_{stamp}.arrow")
+    with pa.OSFile(path + '.tmp', 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table, max_chunksize=max(table.num_rows, 1))
+    os.replace(path + '.tmp', path)
+
+    entry = {
+        'path': path,
+        'rows': table.num_rows,
+        'bytes': os.path.getsize(path),
+        'columns': {field.name: str(field.type) for field in table.schema},
+        'published_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    _update_catalog(name, entry, catalog_path)
+    prune_versions(name, save_dir, keep)
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"Published {name}: {entry['rows']} Rows | {round(entry['bytes'] / 1e6, 1)} MB in {elap_time} Seconds | Path: {path}")
+    return entry
+
+def prune_versions(name, save_dir=arrow_dir, keep=KEEP_VERSIONS):
+    """Remove all but the newest keep versions of a table (a file still mapped by a reader stays until it is closed on
+    Linux/macOS; on Windows it is skipped and removed by a later publish)"""
+    folder = os.path.join(save_dir, name)
+    versions = sorted(f for f in os.listdir(folder) if f.endswith('.arrow'))
+    for f in versions[:-keep] if keep else []:
+        try:
+            os.remove(os.path.join(folder, f))
+        except PermissionError:
+            pass
+
+### END SHARED ARROW TABLES ###
+
+### ZERO-COPY READERS - DEFINE ###
+
+def table_path(name, catalog_path=catalog_file):
+    catalog = load_catalog(catalog_path)
+    if name not in catalog:
+        raise KeyError(f"{name} is not in the catalog ({', '.join(sorted(catalog)) or 'empty'}) | Path: {catalog_path}")
+    return catalog[name]['path']
+
+# 3) FUNCTION: PyArrow Table Backed By The Mapped File
+def open_arrow(name, columns=None, catalog_path=catalog_file):
+    """This function will memory map the table's current version and return a pyarrow Table whose buffers point into the
+    map (nothing is read until touched, and every process opening it shares the same OS page cache pages)"""
+    reader = pa.ipc.open_file(pa.memory_map(table_path(name, catalog_path), 'r'))
+    table = reader.read_all()
+    return table.select(columns) if columns else table
+
+# 4) FUNCTION: Polars Frame Over The Mapped File
+def open_table(name, columns=None, catalog_path=catalog_file):
+    """This function will return a polars DataFrame over the mapped file (pl.read_ipc with memory_map, no copy of
+    numeric/string buffers). Use in place of pl.read_parquet for the published feature/prediction tables"""
+    return pl.read_ipc(table_path(name, catalog_path), columns=columns, memory_map=True)
+
+# 5) FUNCTION: NumPy Views Of Numeric Columns
+def open_numpy(name, columns, catalog_path=catalog_file):
+    """This function will return {column: numpy array} viewing the mapped buffers directly. Only numeric columns without
+    nulls can be viewed - anything else raises (pa.ArrowInvalid) rather than silently copying"""
+    table = open_arrow(name, columns, catalog_path)
+    return {col: table.column(col).chunk(0).to_numpy(zero_copy_only=True) for col in columns}
+
+# 6) FUNCTION: Arrow-Backed Pandas Frame
+def open_pandas(name, columns=None, catalog_path=catalog_file):
+    """This function will return a pandas DataFrame with pd.ArrowDtype columns, which keep pointing at the mapped buffers
+    instead of converting to NumPy object/float blocks like to_pandas() does"""
+    import pandas as pd
+
+    return open_arrow(name, columns, catalog_path).to_pandas(types_mapper=pd.ArrowDtype)
+
+# 7) FUNCTION: Catalog As A Table
+def list_tables(catalog_path=catalog_file):
+    """This function will return one row per published table (name, rows, MB, columns, published_at)"""
+    catalog = load_catalog(catalog_path)
+    return pl.DataFrame([
+        {'name': name, 'rows': e['rows'], 'mb': round(e['bytes'] / 1e6, 1), 'columns': len(e['columns']), 'published_at': e['published_at'], 'path': e['path']}
+        for name, e in sorted(catalog.items())
+    ])
+
+### END ZERO-COPY READERS ###
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point:
+
+    python Arrow_Catalog.py publish --name PBP_2023 --parquet Data/PBP/API_RAW_PBP_Data_2023.parquet
+    python Arrow_Catalog.py list
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Publish parquet tables as shared memory-mapped Arrow files")
+    parser.add_argument('command', choices=['publish', 'list'])
+    parser.add_argument('--name', help="Catalog name (publish)")
+    parser.add_argument('--parquet', help="Parquet file to publish")
+    parser.add_argument('--catalog', default=catalog_file, help="Catalog path")
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        publish_table(args.name, pl.read_parquet(args.parquet), catalog_path=args.catalog)
+    else:
+        print(list_tables(args.catalog))
+
+if __name__ == "__main__":
+    main()
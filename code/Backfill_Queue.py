@@ -0,0 +1,307 @@
+# Tools
+import os
+import json
+import time
+import socket
+import sqlite3
+import subprocess
+import sys
+from datetime import datetime
+
+# Load_All_PBP (polars/pandas/requests) Is Only Imported By The Functions That Load Or Merge Games, So The Queue Itself Is
+# Plain sqlite3 And Any Machine Can Read Its Status Cheaply
+
+
+### BACKFILL WORK QUEUE - DEFINE ###
+
+# Path (On A Filesystem Every Worker Machine Can Reach, Next To Data/Checkpoints)
+queue_file = 'Data/Checkpoints/backfill_queue.sqlite'
+
+# Games Per Shard, Seconds A Lease Lasts Without A Heartbeat, Tries Before A Shard Is Marked Failed
+SHARD_SIZE = 25
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+
+queue_schema = """
+CREATE TABLE IF NOT EXISTS shards (
+    shard_id INTEGER PRIMARY KEY,
+    season INTEGER NOT NULL,
+    game_ids TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    lease_expires REAL,
+    bad_ids TEXT,
+    error TEXT,
+    updated_at TEXT
+);
+CREATE INDEX IF NOT EXISTS shards_status ON shards (status, season);
+"""
+
+# 1) CLASS: Lease-Based Shard Queue In One SQLite File
+class WorkQueue:
+    """Hands out shards of game ids to any number of worker processes.
+
+    A lease is taken inside BEGIN IMMEDIATE (one writer at a time), so two workers never get the same shard. A worker renews
+    its lease after every game; a shard whose lease runs out (worker killed, machine lost) goes back to the queue and is
+    picked up by the next lease call. Games already checkpointed are skipped on retry, so a re-leased shard only loads the
+    games its last worker did not finish.
+
+    The database uses the rollback journal (not WAL) so it also locks correctly for workers on other machines sharing the
+    folder, as long as the shared filesystem supports POSIX locks.
+    """
+
+    def __init__(self, path=queue_file, timeout=60):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.conn.executescript(queue_schema)
+
+    def close(self):
+        self.conn.close()
+
+    def _now(self):
+        return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+    def add_games(self, season, game_ids, shard_size=SHARD_SIZE):
+        """Queue a season's game ids in shards of shard_size (games already queued for the season are skipped)"""
+        queued = set()
+        for (ids,) in self.conn.execute('SELECT game_ids FROM shards WHERE season = ?', (season,)):
+            queued |= set(json.loads(ids))
+        new_ids = sorted(set(game_ids) - queued)
+        shards = [new_ids[k:k + shard_size] for k in range(0, len(new_ids), shard_size)]
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany(
+            'INSERT INTO shards (season, game_ids, updated_at) VALUES (?, ?, ?)',
+            [(season, json.dumps(ids), self._now()) for ids in shards]
+        )
+        self.conn.execute('COMMIT')
+        return len(shards)
+
+    def lease(self, worker, lease_seconds=LEASE_SECONDS, max_attempts=MAX_ATTEMPTS):
+        """Take the oldest pending shard, or one whose lease expired. Returns (shard_id, season, game_ids) or None"""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = self.conn.execute(
+                """SELECT shard_id, season, game_ids FROM shards
+                   WHERE (status = 'pending') OR (status = 'leased' AND lease_expires < ?)
+                   ORDER BY season, shard_id LIMIT 1""", (now,)
+            ).fetchone()
+            if row is None:
+                self.conn.execute('COMMIT')
+                return None
+            shard_id, season, ids = row
+            attempts = self.conn.execute('SELECT attempts FROM shards WHERE shard_id = ?', (shard_id,)).fetchone()[0]
+            if attempts >= max_attempts:
+                self.conn.execute("UPDATE shards SET status = 'failed', worker = NULL, updated_at = ? WHERE shard_id = ?", (self._now(), shard_id))
+                self.conn.execute('COMMIT')
+                return self.lease(worker, lease_seconds, max_attempts)
+            self.conn.execute(
+                "UPDATE shards SET status = 'leased', worker = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ? WHERE shard_id = ?",
+                (worker, now + lease_seconds, self._now(), shard_id)
+            )
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return shard_id, season, json.loads(ids)
+
+    def renew(self, shard_id, worker, lease_seconds=LEASE_SECONDS):
+        """Extend the lease (heartbeat). False means the lease expired and the shard now belongs to another worker"""
+        cur = self.conn.execute(
+            "UPDATE shards SET lease_expires = ?, updated_at = ? WHERE shard_id = ? AND worker = ? AND status = 'leased'",
+            (time.time() + lease_seconds, self._now(), shard_id, worker)
+        )
+        return cur.rowcount == 1
+
+    def complete(self, shard_id, worker, bad_ids=()):
+        cur = self.conn.execute(
+            "UPDATE shards SET status = 'done', bad_ids = ?, lease_expires = NULL, updated_at = ? WHERE shard_id = ? AND worker = ? AND status = 'leased'",
+            (json.dumps(sorted(bad_ids)), self._now(), shard_id, worker)
+        )
+        return cur.rowcount == 1
+
+    def release(self, shard_id, worker, error):
+        """Give a shard back after an error (retried by the next lease until MAX_ATTEMPTS)"""
+        self.conn.execute(
+            "UPDATE shards SET status = 'pending', worker = NULL, lease_expires = NULL, error = ?, updated_at = ? WHERE shard_id = ? AND worker = ?",
+            (str(error)[:500], self._now(), shard_id, worker)
+        )
+
+    def retry_failed(self, season=None):
+        """Put failed shards back in the queue with their attempts reset"""
+        sql = "UPDATE shards SET status = 'pending', attempts = 0, error = NULL WHERE status = 'failed'"
+        cur = self.conn.execute(sql + (' AND season = ?' if season is not None else ''), (season,) if season is not None else ())
+        return cur.rowcount
+
+    def status(self):
+        """Shards per season and status"""
+        out = {}
+        for season, status, n in self.conn.execute('SELECT season, status, COUNT(*) FROM shards GROUP BY season, status ORDER BY season'):
+            out.setdefault(season, {})[status] = n
+        return out
+
+    def season_results(self, season):
+        """(game ids queued, game ids that failed inside done shards, shards not done) for one season"""
+        games, bad, open_shards = [], [], 0
+        for ids, status, bad_ids in self.conn.execute('SELECT game_ids, status, bad_ids FROM shards WHERE season = ?', (season,)):
+            games += json.loads(ids)
+            bad += json.loads(bad_ids) if bad_ids else []
+            open_shards += status != 'done'
+        return games, bad, open_shards
+
+# 2) FUNCTION: Worker - Lease, Load, Checkpoint, Repeat Until The Queue Is Empty
+def run_worker(queue_path=queue_file, worker=None, lease_seconds=LEASE_SECONDS, min_request_seconds=0.0, idle_exit=True):
+    """This function will lease shards and load each game with the same steps as load_season_checkpointed, writing one
+    checkpoint per game (Data/Checkpoints/{season}/). Games with a checkpoint are skipped, the lease is renewed after every
+    game, and a lost lease stops the shard without completing it.
+
+    min_request_seconds spaces this worker's API calls (n workers x 1 / min_request_seconds = total request rate)"""
+    import Load_All_PBP as loader
+
+    worker = worker or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(queue_path)
+    n_games, start_time = 0, time.time()
+    while True:
+        leased = queue.lease(worker, lease_seconds)
+        if leased is None:
+            if idle_exit:
+                break
+            time.sleep(lease_seconds / 10)
+            continue
+
+        shard_id, season, game_ids = leased
+        folder = os.path.join(loader.checkpoint_root, str(season))
+        bad_ids, lost = [], False
+        try:
+            for i in game_ids:
+                if os.path.exists(os.path.join(folder, f"{i}_pbp.parquet")):
+                    continue
+                tic = time.time()
+                try:
+                    game_stints = []
+                    result_df = loader.append_shift_data(loader.reconcile_api_data(loader.align_and_cast_columns(data=loader.ping_nhl_api(i=i), sch=loader.raw_schema)), stint_list=game_stints)
+                    loader.write_game_checkpoint(season, i, result_df, game_stints)
+                    n_games += 1
+                except ValueError as e:
+                    bad_ids.append(i)
+                    print(f"Error In Loading NHL API for GameID: {i} | {e}")
+                if not queue.renew(shard_id, worker, lease_seconds):
+                    lost = True
+                    print(f"Lease Lost On Shard {shard_id} - Leaving It To The Worker That Re-Leased It")
+                    break
+                time.sleep(max(0.0, min_request_seconds - (time.time() - tic)))
+        except Exception as e:
+            queue.release(shard_id, worker, e)
+            print(f"Shard {shard_id} Released After Error: {e}")
+            continue
+        if not lost:
+            queue.complete(shard_id, worker, bad_ids)
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"Worker {worker} Done: {n_games} Games Loaded in {elap_time} Seconds | Queue: {queue_path}")
+    queue.close()
+    return n_games
+
+# 3) FUNCTION: Merge A Finished Season's Checkpoints Into The Season File
+def merge_season(season, queue_path=queue_file):
+    """This function will, once every shard of the season is done, mark the checkpointed games done in the season's
+    progress file and let load_season_checkpointed stream them into Data/PBP/API_RAW_PBP_Data_{season}.parquet (plus stints
+    and on-ice bridge) exactly as a single-process backfill would. A season already complete (loaded or merged before) keeps
+    its file and gets just the queue's games swapped in (replace_season_games). Returns the season file path, or None if
+    shards are open"""
+    import Load_All_PBP as loader
+
+    queue = WorkQueue(queue_path)
+    game_ids, bad_ids, open_shards = queue.season_results(season)
+    queue.close()
+    if open_shards:
+        print(f"{season}-{season+1} Season Not Merged: {open_shards} Shards Still Open | Queue: {queue_path}")
+        return None
+
+    folder = os.path.join(loader.checkpoint_root, str(season))
+    done = [i for i in game_ids if os.path.exists(os.path.join(folder, f"{i}_pbp.parquet"))]
+    progress = loader.load_progress(season)
+    save_season_path = f"Data/PBP/API_RAW_PBP_Data_{season}.parquet"
+    if progress['complete'] and os.path.exists(save_season_path):
+        # Season Already Written (Its Own Checkpoints Dropped) - Stream Just The Queue's Games Into It
+        if done:
+            loader.replace_season_games(season, done)
+        progress['done'] = sorted(set(progress['done']) | set(done))
+        loader.save_progress(season, progress)
+        rows = loader.parquet_rows(save_season_path)
+    else:
+        progress['done'] = sorted(set(progress['done']) | set(done))
+        loader.save_progress(season, progress)
+        rows, _, save_season_path = loader.load_season_checkpointed(season, progress['done'], [], len(game_ids))
+    print(f"{season}-{season+1} Season Merged: {len(done)} Games | {rows} Rows | {len(bad_ids)} Bad IDs | Path: {save_season_path}")
+    return save_season_path
+
+# 4) FUNCTION: Local Coordinator - Queue The Seasons, Start Workers, Merge
+def run_backfill(seasons, n_workers=4, queue_path=queue_file, game_ids_path='game_ids.pkl', shard_size=SHARD_SIZE, min_request_seconds=0.0):
+    """This function will queue every game of seasons (from game_ids.pkl), start n_workers worker processes on this machine
+    (more can join from other machines with `python Backfill_Queue.py work --queue <path>`), wait for them and merge each
+    finished season. Returns {season: season file path or None}"""
+    import pickle
+
+    start_time = time.time()
+    with open(game_ids_path, 'rb') as file:
+        game_ids = pickle.load(file)
+    queue = WorkQueue(queue_path)
+    for season in seasons:
+        n_shards = queue.add_games(season, [g for g in game_ids if str(g).startswith(str(season))], shard_size)
+        print(f"{season}-{season+1} Season Queued: {n_shards} New Shards | Queue: {queue_path}")
+    queue.close()
+
+    cmd = [sys.executable, os.path.abspath(__file__), 'work', '--queue', queue_path, '--min-request-seconds', str(min_request_seconds)]
+    workers = [subprocess.Popen(cmd) for _ in range(n_workers)]
+    for proc in workers:
+        proc.wait()
+
+    out = {season: merge_season(season, queue_path) for season in seasons}
+    elap_time = round((time.time() - start_time) / 60, 2)
+    print(f"Backfill Done in {elap_time} Minutes | {n_workers} Local Workers | Queue: {queue_path}")
+    return out
+
+### END BACKFILL WORK QUEUE ###
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point:
+
+    python Backfill_Queue.py run --seasons 2019 2020 --workers 8      (queue + local workers + merge)
+    python Backfill_Queue.py work [--queue path]                       (extra worker, any machine sharing Data/)
+    python Backfill_Queue.py status | merge --seasons 2019 | retry
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Lease-based work queue for play by play backfills")
+    parser.add_argument('command', choices=['run', 'work', 'status', 'merge', 'retry'])
+    parser.add_argument('--seasons', nargs='+', type=int, default=[], help="Starting years (run/merge)")
+    parser.add_argument('--workers', type=int, default=4, help="Local worker processes (run)")
+    parser.add_argument('--queue', default=queue_file, help="Queue database path")
+    parser.add_argument('--shard-size', type=int, default=SHARD_SIZE, help="Games per shard (run)")
+    parser.add_argument('--min-request-seconds', type=float, default=0.0, help="Minimum seconds between one worker's games")
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        run_backfill(args.seasons, args.workers, args.queue, shard_size=args.shard_size, min_request_seconds=args.min_request_seconds)
+    elif args.command == 'work':
+        run_worker(args.queue, min_request_seconds=args.min_request_seconds)
+    elif args.command == 'merge':
+        for season in args.seasons:
+            merge_season(season, args.queue)
+    else:
+        queue = WorkQueue(args.queue)
+        if args.command == 'retry':
+            print(f"{queue.retry_failed()} Failed Shards Re-Queued")
+        for season, counts in queue.status().items():
+            print(f"{season}: " + ' | '.join(f"{k}: {v}" for k, v in sorted(counts.items())))
+        queue.close()
+
+if __name__ == "__main__":
+    main()
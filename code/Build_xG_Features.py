@@ -0,0 +1,1220 @@
+# Polars
+import polars as pl
+
+# General
+from math import pi
+
+# Modeling (sklearn/xgboost Are Imported Inside imp_sec_type - Only The Imputer Needs Them)
+
+# Run Telemetry
+from PipelineProfiler import profile_stage
+
+# Sort-Once Storage (Skip Sorts When Frames Are Already In Event Order)
+from Sorted_Storage import sort_if_needed
+
+
+### Event Type Classification ###
+xG_Events = ['GOAL', 'SHOT', 'MISSED_SHOT', 'BLOCKED_SHOT', 'FACEOFF', 'TAKEAWAY', 'GIVEAWAY', 'HIT']
+fenwick_events = ['SHOT', 'GOAL', 'MISSED_SHOT']
+corsi_events = ['SHOT', 'GOAL', 'MISSED_SHOT', 'BLOCKED_SHOT']
+
+# Strength States
+EV_STR_Codes = ['5v5', '4v4', '3v3']
+PP_STR_Codes = ["5v4", "4v5", "5v3", "3v5", "4v3", "3v4"]
+UE_STR_Codes = ["5v4", "4v5", "5v3", "3v5", "4v3", "3v4", "5vE", "Ev5", "4vE", "Ev4", "3vE", "Ev3"]
+SH_STR_Codes = ['5v6', '4v5', '3v4', '4v6']
+
+# Categorical Encoding - Indicator Groups Collapsed Into One Dictionary Encoded Column Each (model_prep(..., encoding='categorical'))
+categorical_groups = {
+    'state_': 'strength_cat',
+    'score_': 'score_cat',
+    'prior_': 'prior_event_cat'
+}
+shot_types = ['Wrist', 'Deflected', 'Tip-In', 'Slap', 'Backhand', 'Snap', 'Wrap-Around']
+
+# Load Rosters
+roster_file = 'https://raw.githubusercontent.com/twinfield10/NHL-Data/main/Rosters/parquet/all/NHL_Roster_AllSeasons_Slim.parquet'
+_ROSTER_CACHE = {}
+
+def load_model_roster(path = roster_file):
+    """This function will read the slim roster file once and key it on event_player_1_id for the shooter join in model_prep"""
+    if path not in _ROSTER_CACHE:
+        ROSTER_DF_RAW = pl.read_parquet(path)
+        _ROSTER_CACHE[path] = (
+            ROSTER_DF_RAW
+            .rename({"player_id": "event_player_1_id"})
+            .with_columns([
+                pl.col("event_player_1_id").cast(pl.Utf8),
+                pl.when((pl.col('pos_F') == 0) & (pl.col('pos_G') == 0)).then(pl.lit(1)).otherwise(pl.lit(0)).alias('pos_D')
+                ])
+            .select(['event_player_1_id', 'hand_R', 'hand_L', 'pos_F', 'pos_D', 'pos_G'])
+            .unique()
+        )
+    return _ROSTER_CACHE[path]
+
+### PREPROCESSING FUNCTIONS - DEFINE ###
+
+# 0) FUNCTION: Collapse One Hot Indicator Groups Into Enum Columns
+def collapse_indicators(data, indicator_cols, groups=categorical_groups, none_label='none'):
+    """This function will replace each group of 0/1 indicator columns (by prefix, e.g. state_5v5/state_4v4) with one pl.Enum
+    column holding the label of the active indicator (none_label when no indicator is set).
+
+    Categories are fixed by the indicator names, so every season/split gets the same codes and XGBoost can train on them
+    natively (enable_categorical=True) instead of splitting on each indicator.
+    """
+    drop_cols = []
+    new_cols = []
+    for prefix, name in groups.items():
+        cols = [c for c in indicator_cols if c.startswith(prefix)]
+        if not cols:
+            continue
+        labels = [c[len(prefix):] for c in cols]
+        expr = pl.when(pl.col(cols[0]) == 1).then(pl.lit(labels[0]))
+        for col, label in zip(cols[1:], labels[1:]):
+            expr = expr.when(pl.col(col) == 1).then(pl.lit(label))
+        new_cols.append(expr.otherwise(pl.lit(none_label)).cast(pl.Enum(labels + [none_label])).alias(name))
+        drop_cols += cols
+    return data.with_columns(new_cols).drop(drop_cols)
+
+# 1) FUNCTION: Spatial Normalization and Feature Creation
+@profile_stage('clean_pbp_data')
+def clean_pbp_data(data):
+    """ This function will use inputs from play-by-play data to build usable features in a model.
+    Notes:
+        1) x_fixed and y_fixed are independent of period and remain constant (Home attacking zone is x_fixed > 0 and Away attacking zone is y_fixed < 0)
+        2) Neutral Zone calculation assumes that x coord is > abs(25). >= abs(25) is considered OZ and DZ
+    """
+    ### EVENT CALCULATIONS ###
+
+    # 1) Create Columns Relative To Event Team
+    data = data.with_columns([
+        pl.when(pl.col('event_team_id') == pl.col('away_id')).then(pl.col('away_abbreviation'))
+          .when(pl.col('event_team_id') == pl.col('home_id')).then(pl.col('home_abbreviation'))
+          .otherwise(pl.lit(None)).alias('event_team')
+      ])
+    # 2) Create Zones Using Coordinates
+    data = data.with_columns(
+      [
+        pl.when(data['x_abs'] >= 25).then(pl.lit('OZ'))
+        .when((data['x_abs'] > -25) & (data['x_abs'] < 25)).then(pl.lit('NZ'))
+        .when(data['x_abs'] <= -25).then(pl.lit('DZ'))
+        .otherwise(None)
+        .alias('event_zone')
+      ]
+    )
+
+    data = data.with_columns(
+      [
+        pl.when((data['event_zone'] == 'OZ') & (data['event_team_type'] == 'home')).then(pl.lit('OZ'))
+        .when((data['event_zone'] == 'OZ') & (data['event_team_type'] == 'away')).then(pl.lit('DZ'))
+        .when((data['event_zone'] == 'DZ') & (data['event_team_type'] == 'home')).then(pl.lit('DZ'))
+        .when((data['event_zone'] == 'DZ') & (data['event_team_type'] == 'away')).then(pl.lit('OZ'))
+        .when((data['event_zone'] == 'NZ')).then(pl.lit('NZ'))
+        .otherwise(None)
+        .alias('home_event_zone')
+      ]
+    )
+    # 3) Create Event Distance Calculation
+    data = (
+        data
+        .with_columns([
+          pl.when(data['x_abs'] >= 0).then(pl.Series.sqrt((89.25 - pl.Series.abs(data['x_abs']))**2 + data['y_abs']**2))
+          .when(data['x_abs'] <  0).then(pl.Series.sqrt((pl.Series.abs(data['x_abs']) + 89.25)**2 + data['y_abs']**2))
+          .alias('event_distance')
+        ])
+        .with_columns([
+            pl.when((pl.col('event_distance').abs() == 0.0)).then(pl.lit(0.25))
+            .otherwise(pl.col('event_distance').round(3)).alias('event_distance')
+        ])
+    )
+    # 4) Create Event Angle Calculation
+    data = (
+        data
+        .with_columns(
+        pl.when(data['x_abs'] >= 0)
+          .then(pl.Series.arctan(data['y_abs'] / (89.25 - pl.Series.abs(data['x_abs'])))
+                .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+          .when(data['x_abs'] < 0)
+          .then(pl.Series.arctan(data['y_abs'] / (pl.Series.abs(data['x_abs']) + 89.25))
+                .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+          .alias('event_angle')
+        )
+        .with_columns(
+            pl.when(pl.col('x_abs') > 89.25).then((180 - pl.col('event_angle'))).otherwise(pl.col('event_angle')).alias('event_angle')
+        )
+        .with_columns(
+            pl.col('event_angle').round(3)
+        )
+    )
+    # 5) Adjust Penalty Shot Game State
+    data = data.with_columns(
+        [
+            pl.when(
+                (data['secondary_type'] == 'Penalty Shot') &
+                (data['event_team_type'] == 'home')
+            ).then(pl.lit('Ev1'))
+            .when(
+                (data['secondary_type'] == 'Penalty Shot') &
+                (data['event_team_type'] == 'away')
+            ).then(pl.lit('1vE'))
+            .otherwise(data['strength_state']).alias('strength_state'),
+
+            pl.when(
+                (data['secondary_type'] == 'Penalty Shot') &
+                (data['event_team_type'] == 'home')
+            ).then(pl.lit(1))
+            .when(
+                (data['secondary_type'] == 'Penalty Shot') &
+                (data['event_team_type'] == 'away')
+            ).then(pl.lit(0))
+            .otherwise(data['home_skaters']).alias('home_skaters'),
+
+            pl.when(
+                (data['secondary_type'] == 'Penalty Shot') &
+                (data['event_team_type'] == 'home')
+            ).then(pl.lit(0))
+            .when(
+                (data['secondary_type'] == 'Penalty Shot') &
+                (data['event_team_type'] == 'away')
+            ).then(pl.lit(1))
+            .otherwise(data['away_skaters']).alias('away_skaters')
+        ]
+    )
+
+    ### END EVENT CALCULATION ###
+    return data
+
+# 2) FUNCTION: Indexing Operations (Faceoffs, Shifts, Penalties)
+@profile_stage('index_input_data')
+def index_input_data(data, stints = None):
+    """ This Function will create indexes and ID's for certain types of plays/events.
+
+    stints: Optional stint table from ingest (Data/Stints). When passed (and events carry stint_id) shift changes are read
+    from the integer stint/config IDs instead of comparing the on-ice player columns event to event, and shift-chart time on
+    ice is joined by stint_id (see join_stint_toi) """
+
+    # 1) Add Zone Start For Corsi Events (i.e., shots)
+    #fc_idx = (
+    #    data
+    #    .filter((pl.col('event_type').is_in(['FACEOFF'] + xG_Events)) &
+    #    (((pl.col('period') < 5) & (pl.col('season_type') == 'R')) | (pl.col('season_type') == 'P'))
+    #    )
+    #    .sort('game_id', 'period', 'event_idx')
+    #    .with_columns(pl.when(pl.col('event_type') == "FACEOFF").then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_fac'))
+    #    .with_columns(pl.col('is_fac').cum_sum().alias('face_index'))
+    #    .select(['game_id', 'event_idx', 'face_index', 'home_zone'])
+    #    .sort('game_id', 'event_idx', 'face_index')
+    #    .with_columns(pl.col('home_zone').first().over(['game_id', 'face_index']).alias('first_home_zone'))
+    #    .with_columns(
+    #        pl.when(pl.first('first_home_zone') == 'OZ').then(1)
+    #        .when(pl.first('first_home_zone') == 'NZ').then(2)
+    #        .when(pl.first('first_home_zone') == 'DZ').then(3)
+    #        .otherwise(pl.lit(None))
+    #        .alias('home_zonestart')
+    #    )
+    #    .select(['game_id', 'event_idx', 'home_zonestart'])
+    #)
+    #data = data.join(fc_idx, on=["game_id", "event_idx"], how="left")
+
+
+    # 2) Create Indexes For Shift and Penalties
+    home_player_id_col_struct = ["home_1_on_id", "home_2_on_id", "home_3_on_id", "home_4_on_id", "home_5_on_id", "home_6_on_id", "home_goalie"]
+    away_player_id_col_struct = ["away_1_on_id", "away_2_on_id", "away_3_on_id", "away_4_on_id", "away_5_on_id", "away_6_on_id", "away_goalie"]
+    all_player_id_col_struct = home_player_id_col_struct + away_player_id_col_struct
+
+    if (stints is not None) and ('stint_id' in data.columns):
+        data = data.join(stints.select('stint_id', 'home_config_id', 'away_config_id'), on='stint_id', how='left')
+        all_shift_key, home_shift_key, away_shift_key = pl.col('stint_id'), pl.col('home_config_id'), pl.col('away_config_id')
+    else:
+        all_shift_key, home_shift_key, away_shift_key = pl.struct(all_player_id_col_struct), pl.struct(home_player_id_col_struct), pl.struct(away_player_id_col_struct)
+
+    data = (
+        data
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
+        .with_columns([
+            pl.when(pl.col("event_type") == "FACEOFF").then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_fac'),
+            pl.when(pl.col("event_type") == "PENALTY").then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_pen'),
+            pl.when((all_shift_key != all_shift_key.shift()) | (pl.col('event_type').shift() == 'PERIOD_START')).then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_shi'),
+            pl.when((home_shift_key != home_shift_key.shift()) | (pl.col('event_type').shift() == 'PERIOD_START')).then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_H_shi'),
+            pl.when((away_shift_key != away_shift_key.shift()) | (pl.col('event_type').shift() == 'PERIOD_START')).then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_A_shi'),
+          ])
+        .with_columns([
+            pl.col('is_fac').cum_sum().alias('face_index'),
+            pl.col('is_pen').cum_sum().alias('pen_index'),
+            pl.col('is_shi').cum_sum().alias('all_shift_index'),
+            pl.col('is_H_shi').cum_sum().alias('home_shift_index'),
+            pl.col('is_A_shi').cum_sum().alias('away_shift_index'),
+        ])
+        .pipe(sort_if_needed, ['season', 'game_id', 'event_idx'])
+        .with_columns([
+            (pl.col('game_seconds').first().over(["season","game_id", "period", "all_shift_index"])).alias("all_shift_start_seconds"),
+            (pl.col('game_seconds').last().over(["season","game_id", "period", "all_shift_index"])).alias("all_shift_end_seconds"),
+            (pl.col('game_seconds').first().over(["season","game_id", "period", "home_shift_index"])).alias("home_shift_start_seconds"),
+            (pl.col('game_seconds').last().over(["season","game_id", "period", "home_shift_index"])).alias("home_shift_end_seconds"),
+            (pl.col('game_seconds').first().over(["season","game_id", "period", "away_shift_index"])).alias("away_shift_start_seconds"),
+            (pl.col('game_seconds').last().over(["season","game_id", "period", "away_shift_index"])).alias("away_shift_end_seconds")
+            ])
+        .drop(['is_fac', 'is_shi', 'is_pen', 'is_H_shi', 'is_A_shi'])
+        )
+
+
+    gb_cols_1 = ["game_id", "period", "face_index", "pen_index"]
+
+    idx_df = (
+        data
+        .filter(
+            (((pl.col('period') < 5) & (pl.col('season_type') == 'R')) | (pl.col('season_type') == 'P'))
+        )
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
+        .with_columns([
+            pl.when(pl.struct(gb_cols_1 + ['all_shift_index']) != pl.struct(gb_cols_1 + ['all_shift_index']).shift()).then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_all_new_shift'),
+            pl.when(pl.struct(["game_id", "period",'home_shift_index']) != pl.struct(["game_id", "period",'home_shift_index']).shift()).then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_home_new_shift'),
+            pl.when(pl.struct(["game_id", "period",'away_shift_index']) != pl.struct(["game_id", "period",'away_shift_index']).shift()).then(pl.lit(1)).otherwise(pl.lit(0)).alias('is_away_new_shift'),
+                   ])
+        .with_columns([
+            pl.col('is_all_new_shift').cum_sum().alias('all_shift_ID'),
+            pl.col('is_home_new_shift').cum_sum().alias('home_shift_ID'),
+            pl.col('is_away_new_shift').cum_sum().alias('away_shift_ID')
+        ])
+        .with_columns([
+            (pl.col('game_seconds') - pl.col('all_shift_start_seconds')).alias('all_shift_length'),
+            (pl.col('game_seconds') - pl.col('home_shift_start_seconds')).alias('home_shift_length'),
+            (pl.col('game_seconds') - pl.col('away_shift_start_seconds')).alias('away_shift_length')
+        ])
+        .with_columns([
+            pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_shift_length'))
+              .when(pl.col('event_team_type') == 'away').then(pl.col('away_shift_length'))
+              .otherwise(None).alias('event_team_toi'),
+            pl.when(pl.col('event_team_type') == 'away').then(pl.col('home_shift_length'))
+              .when(pl.col('event_team_type') == 'home').then(pl.col('away_shift_length'))
+              .otherwise(None).alias('def_team_toi'),
+            pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_shift_length') - pl.col('away_shift_length'))
+              .when(pl.col('event_team_type') == 'away').then(pl.col('away_shift_length') - pl.col('home_shift_length'))
+              .otherwise(None).alias('event_team_shift_time_diff')
+        ])
+        .select("game_id", "period", "event_idx", "face_index", "all_shift_index", "home_shift_index", "away_shift_index", "pen_index",
+                "all_shift_ID", "home_shift_ID", "away_shift_ID",
+                "all_shift_length", "home_shift_length", "away_shift_length")
+    )
+
+    # Join Indexes To Data (Join All Common Columns)
+    idx_cols = idx_df.columns
+    data_cols = data.columns
+    common_cols = list(set(idx_cols) & set(data_cols))
+
+    data =  data.join(
+             idx_df,
+             on=common_cols,
+             how="left"
+         )
+
+    if 'home_config_id' in data.columns:
+        data = data.drop('home_config_id', 'away_config_id')
+
+    # Shift-Chart Time On Ice Joined Once By stint_id (split_by_strength Reads It Instead Of Per-Unit Windows)
+    if (stints is not None) and ('stint_id' in data.columns):
+        data = join_stint_toi(data, stints)
+
+    return data
+
+# 2a) FUNCTION: Time On Ice From The Stint Table
+def join_stint_toi(data, stints):
+    """ This Function will join shift-chart time on ice to each event by stint_id (seconds since the stint / each team's
+    unit changed), instead of measuring from the first event seen with the same players on the ice """
+
+    stint_toi = stints.select('stint_id', 'start_seconds', 'stint_seconds', 'home_config_start_seconds', 'away_config_start_seconds')
+
+    return (
+        data
+        .join(stint_toi, on='stint_id', how='left')
+        .with_columns([
+            (pl.col('period_seconds') - pl.col('start_seconds')).alias('stint_toi'),
+            (pl.col('period_seconds') - pl.col('home_config_start_seconds')).alias('home_stint_toi'),
+            (pl.col('period_seconds') - pl.col('away_config_start_seconds')).alias('away_stint_toi')
+        ])
+        .with_columns([
+            pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_stint_toi'))
+              .when(pl.col('event_team_type') == 'away').then(pl.col('away_stint_toi'))
+              .otherwise(None).alias('event_team_stint_toi'),
+            pl.when(pl.col('event_team_type') == 'away').then(pl.col('home_stint_toi'))
+              .when(pl.col('event_team_type') == 'home').then(pl.col('away_stint_toi'))
+              .otherwise(None).alias('def_team_stint_toi')
+        ])
+        .drop('start_seconds', 'home_config_start_seconds', 'away_config_start_seconds')
+    )
+
+# 2b) FUNCTION: Skater Time On Ice At Each Event
+def skaters_toi(data, side, shift_col):
+    """home/away skaters' seconds on ice as {side}_skaters_toi: {side}_stint_toi when join_stint_toi already ran (index_input_data
+    with stints), else seconds since the first event in the period with the same shift_col"""
+    if f"{side}_stint_toi" in data.columns:
+        return pl.col(f"{side}_stint_toi").alias(f"{side}_skaters_toi")
+    return ((pl.col('game_seconds')) - (pl.col('game_seconds').first().over(['season', 'game_id', 'period', shift_col]))).alias(f"{side}_skaters_toi")
+
+# 3) FUNCTION: Separate Data by Game Strength State (EV, PP, SH, EN)
+@profile_stage('split_by_strength')
+def split_by_strength(data):
+    """This function will split and clean indexed play-by-play data into 4 categories (EV, PP, SH, and EN)"""
+
+    EV_DF = (
+        data
+        .filter(
+            (pl.col('event_type').is_in(xG_Events)) &
+            (((pl.col('period') < 5) & (pl.col('season_type') == 'R')) | (pl.col('season_type') == 'P')) &
+            (~pl.col('x_abs').is_null()) &
+            (~pl.col('y_abs').is_null())
+        )
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
+        .with_columns([
+            ((pl.col('game_seconds')) - (pl.col('game_seconds').shift(1).over(['season', 'game_id', 'period']))).alias('seconds_since_last'),
+            skaters_toi(data, 'home', 'home_shift_ID'),
+            skaters_toi(data, 'away', 'away_shift_ID'),
+            ((pl.col('event_type').shift(1).over(['season', 'game_id', 'period']))).alias('event_type_last'),
+            ((pl.col('event_team_abbr').shift(1).over(['season', 'game_id', 'period']))).alias('event_team_last'),
+            ((pl.col('strength_state').shift(1).over(['season', 'game_id', 'period']))).alias('event_strength_last'),
+            ((pl.col('x_abs').shift(1).over(['season', 'game_id', 'period']))).alias('x_abs_last'),
+            ((pl.col('y_abs').shift(1).over(['season', 'game_id', 'period']))).alias('y_abs_last'),
+            ((pl.col('home_score').shift(1).over(['season', 'game_id', 'period']))).alias('home_score'),
+            ((pl.col('away_score').shift(1).over(['season', 'game_id', 'period']))).alias('away_score'),
+            (pl.when((pl.col('event_team_type') == 'home')).then((pl.col('home_goalie')).str.to_uppercase()).otherwise((pl.col('away_goalie').str.to_uppercase())).alias('event_goalie_id'))
+        ])
+        .with_columns([
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'away').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('event_team_toi'),
+            (pl.when(pl.col('event_team_type') == 'away').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'home').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('def_team_toi')
+        ])
+        .with_columns([
+            (pl.col('def_team_toi') - pl.col('event_team_toi')).alias('event_team_shift_time_diff')
+        ])
+        .pipe(sort_if_needed, ['season', 'game_id', 'event_idx'])
+        .filter(
+            (pl.col('event_type').is_in(fenwick_events)) &
+            (pl.col('strength_state').is_in(EV_STR_Codes)) &
+            (~pl.col('x_abs_last').is_null()) &
+            (~pl.col('y_abs_last').is_null())
+        )
+        .with_columns([
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('x_abs_last')).otherwise(pl.col('x_abs_last') * -1).alias('x_abs_last')),
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('y_abs_last')).otherwise(pl.col('y_abs_last') * -1).alias('y_abs_last')),
+            (pl.when(pl.col('home_score').is_null()).then(pl.lit(0)).otherwise(pl.col('home_score'))).alias('home_score'),
+            (pl.when(pl.col('away_score').is_null()).then(pl.lit(0)).otherwise(pl.col('away_score'))).alias('away_score')
+        ])
+        .with_columns([
+            (pl.when(pl.col('event_team_abbr') == pl.col('event_team_last')).then(pl.lit(1)).otherwise(pl.lit(0))).alias('same_team_last'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_home'),
+            (pl.when(pl.col('period') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_overtime'),
+            (pl.when(pl.col('season_type') == 'P').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_playoff'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_score') - pl.col('away_score')).otherwise(pl.col('away_score') - pl.col('home_score'))).alias('score_state'),
+            #(pl.when((pl.col('seconds_since_last') == 0) & (pl.col('event_type_last') == 'FACEOFF')).then(pl.col("shift_length")).otherwise(pl.col('seconds_since_last'))).alias('seconds_since_last'),
+            ((((pl.col('x_abs') - pl.col('x_abs_last')) ** 2) + ((pl.col('y_abs') - pl.col('y_abs_last')) ** 2)).sqrt()).alias('distance_from_last')
+        ])
+        .with_columns(
+            pl.when(pl.col('seconds_since_last') == 0).then(pl.lit(0.5)).otherwise(pl.col('seconds_since_last')).alias('seconds_since_last'),
+            pl.when(pl.col('x_abs_last') >= 0)
+            .then((pl.col('y_abs_last') / (89.25 - (pl.col('x_abs_last').abs()))).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .when(pl.col('x_abs_last') < 0)
+            .then((pl.col('y_abs_last') / ((pl.col('x_abs_last').abs()) + 89.25)).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .alias('event_angle_last')
+        )
+        .with_columns(
+            pl.when(pl.col('x_abs_last') > 89.25).then((180 - pl.col('event_angle_last'))).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+        )
+        .with_columns([
+            (pl.col('distance_from_last') / pl.col('seconds_since_last')).alias('puck_speed_since_last'),
+            ((pl.col('event_angle') - pl.col('event_angle_last')).abs()).alias('event_angle_change')
+            ])
+        .with_columns((pl.col('event_angle_change') / pl.col('seconds_since_last')).alias('event_angle_change_speed'))
+        .with_columns([
+            pl.when(pl.col('puck_speed_since_last').is_infinite()).then(pl.col('distance_from_last') / pl.lit(0.5)).otherwise(pl.col('puck_speed_since_last')).alias('puck_speed_since_last'),
+            pl.when(pl.col('event_angle_last').is_infinite()).then(None).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+            ])
+        .select(['season', 'game_id', 'game_date', 'event_idx', 'period', 'game_seconds', 'is_overtime', 'is_playoff',
+                'strength_state', 'score_state', 'is_home', 
+                'event_player_1_id', 'home_goalie', 'away_goalie', 'event_player_2_id', 'event_goalie_id',
+                'home_score', 'away_score', 'home_abbreviation', 'away_abbreviation', 'home_skaters', 'away_skaters',
+                'event_type', 'event_team', 'event_team_abbr', 'secondary_type',
+                'x_abs', 'y_abs', 'event_angle_last', 'event_angle', 'event_distance',
+                'event_angle_change', 'event_angle_change_speed',
+                'event_team_last', 'same_team_last', 'event_strength_last', 'event_type_last',
+                'seconds_since_last', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+                'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'])
+    )
+
+    ## Build PP DataFrame ##
+    PP_DF = (
+        data
+        .filter(
+            (pl.col('event_type').is_in(xG_Events)) &
+            (((pl.col('period') < 5) & (pl.col('season_type') == 'R')) | (pl.col('season_type') == 'P')) &
+            (~pl.col('x_abs').is_null()) &
+            (~pl.col('y_abs').is_null())
+        )
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
+        .with_columns([
+            ((pl.col('game_seconds')) - (pl.col('game_seconds').shift(1).over(['season', 'game_id', 'period']))).alias('seconds_since_last'),
+            skaters_toi(data, 'home', 'home_shift_ID'),
+            skaters_toi(data, 'away', 'away_shift_ID'),
+            ((pl.col('event_type').shift(1).over(['season', 'game_id', 'period']))).alias('event_type_last'),
+            ((pl.col('event_team_abbr').shift(1).over(['season', 'game_id', 'period']))).alias('event_team_last'),
+            ((pl.col('strength_state').shift(1).over(['season', 'game_id', 'period']))).alias('event_strength_last'),
+            ((pl.col('x_abs').shift(1).over(['season', 'game_id', 'period']))).alias('x_abs_last'),
+            ((pl.col('y_abs').shift(1).over(['season', 'game_id', 'period']))).alias('y_abs_last'),
+            ((pl.col('event_angle').shift(1).over(['season', 'game_id', 'period']))).alias('event_angle_last'),
+            ((pl.col('home_score').shift(1).over(['season', 'game_id', 'period']))).alias('home_score'),
+            ((pl.col('away_score').shift(1).over(['season', 'game_id', 'period']))).alias('away_score'),
+            (pl.when(pl.col('strength_state').is_in(PP_STR_Codes)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_pen'),
+            (pl.when(((pl.col('home_skaters') - pl.col('away_skaters')) >= 2) | ((pl.col('away_skaters') - pl.col('home_skaters')) >= 2)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_two_ma'),
+            (pl.when((pl.col('event_team_type') == 'home')).then((pl.col('home_goalie')).str.to_uppercase()).otherwise((pl.col('away_goalie').str.to_uppercase())).alias('event_goalie_id'))
+        ])
+        .with_columns(((pl.col('is_pen')) * ((pl.col('game_seconds')) - (pl.col('game_seconds').first().over(['season', 'game_id', 'pen_index'])))).alias('pen_seconds_since'))
+        .with_columns([
+            (pl.when((pl.col('pen_seconds_since') > 0) & (pl.col('pen_seconds_since') >= 300)).then(pl.lit(120)).otherwise(pl.col('pen_seconds_since'))).alias('pen_seconds_since')
+            ])
+        .with_columns([
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'away').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('event_team_toi'),
+            (pl.when(pl.col('event_team_type') == 'away').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'home').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('def_team_toi')
+        ])
+        .with_columns([
+            (pl.col('def_team_toi') - pl.col('event_team_toi')).alias('event_team_shift_time_diff')
+        ])
+        .pipe(sort_if_needed, ['season', 'game_id', 'event_idx'])
+        .filter(
+            (pl.col('event_type').is_in(fenwick_events)) &
+            (((pl.col('event_team_type') == 'home') & (pl.col('true_strength_state').is_in(["6v5", "6v4", "5v4", "5v3", "4v3"]))) |
+            ((pl.col('event_team_type') == 'away') & (pl.col('true_strength_state').is_in(["5v6", "4v6", "4v5", "3v5", "3v4"])))) &
+            (~pl.col('x_abs_last').is_null()) &
+            (~pl.col('y_abs_last').is_null())
+        )
+        .with_columns([
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('x_abs_last')).otherwise(pl.col('x_abs_last') * -1).alias('x_abs_last')),
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('y_abs_last')).otherwise(pl.col('y_abs_last') * -1).alias('y_abs_last')),
+            (pl.when(pl.col('home_score').is_null()).then(pl.lit(0)).otherwise(pl.col('home_score'))).alias('home_score'),
+            (pl.when(pl.col('away_score').is_null()).then(pl.lit(0)).otherwise(pl.col('away_score'))).alias('away_score')
+        ])
+        .with_columns([
+            (pl.when(pl.col('event_team_abbr') == pl.col('event_team_last')).then(pl.lit(1)).otherwise(pl.lit(0))).alias('same_team_last'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_home'),
+            (pl.when(pl.col('period') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_overtime'),
+            (pl.when(pl.col('season_type') == 'P').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_playoff'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_score') - pl.col('away_score')).otherwise(pl.col('away_score') - pl.col('home_score'))).alias('score_state'),
+            #(pl.when((pl.col('seconds_since_last') == 0) & (pl.col('event_type_last') == 'FACEOFF')).then(pl.col("shift_length")).otherwise(pl.col('seconds_since_last'))).alias('seconds_since_last'),
+            ((((pl.col('x_abs') - pl.col('x_abs_last')) ** 2) + ((pl.col('y_abs') - pl.col('y_abs_last')) ** 2)).sqrt()).alias('distance_from_last'),
+            (pl.when(pl.col('event_strength_last').is_in(EV_STR_Codes)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_event_EV')
+        ])
+        .with_columns(
+            pl.when(pl.col('seconds_since_last') == 0).then(pl.lit(0.5)).otherwise(pl.col('seconds_since_last')).alias('seconds_since_last'),
+            pl.when(pl.col('x_abs_last') >= 0)
+            .then((pl.col('y_abs_last') / (89.25 - (pl.col('x_abs_last').abs()))).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .when(pl.col('x_abs_last') < 0)
+            .then((pl.col('y_abs_last') / ((pl.col('x_abs_last').abs()) + 89.25)).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .alias('event_angle_last')
+        )
+        .with_columns(
+            pl.when(pl.col('x_abs_last') > 89.25).then((180 - pl.col('event_angle_last'))).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+        )
+        .with_columns([
+            (pl.col('distance_from_last') / pl.col('seconds_since_last')).alias('puck_speed_since_last'),
+            ((pl.col('event_angle') - pl.col('event_angle_last')).abs()).alias('event_angle_change')
+            ])
+        .with_columns((pl.col('event_angle_change') / pl.col('seconds_since_last')).alias('event_angle_change_speed'))
+        .with_columns([
+            pl.when(pl.col('puck_speed_since_last').is_infinite()).then(pl.col('distance_from_last') / pl.lit(0.5)).otherwise(pl.col('puck_speed_since_last')).alias('puck_speed_since_last'),
+            pl.when(pl.col('event_angle_last').is_infinite()).then(None).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+            ])
+        .select([
+            'season', 'game_id', 'game_date', 'event_idx', 'period', 'game_seconds', 'is_overtime', 'is_playoff',
+            'strength_state', 'true_strength_state', 'score_state', 'is_home', 'is_two_ma',
+            'event_player_1_id', 'home_goalie', 'away_goalie', 'event_player_2_id', 'event_goalie_id',
+            'home_score', 'away_score', 'home_abbreviation', 'away_abbreviation', 'home_skaters', 'away_skaters',
+            'event_type', 'event_team', 'event_team_abbr', 'event_team_type', 'secondary_type',
+            'x_abs', 'y_abs', 'event_angle_last', 'event_angle', 'event_distance',
+            'event_angle_change', 'event_angle_change_speed',
+            'event_team_last', 'same_team_last', 'event_strength_last', 'prior_event_EV', 'event_type_last',
+            'seconds_since_last', 'pen_seconds_since', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+            'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'
+        ])
+    )
+
+    ## Build SH DataFrame ##
+    SH_DF = (
+        data
+        .filter(
+            (pl.col('event_type').is_in(xG_Events)) &
+            (((pl.col('period') < 5) & (pl.col('season_type') == 'R')) | (pl.col('season_type') == 'P')) &
+            (~pl.col('x_abs').is_null()) &
+            (~pl.col('y_abs').is_null())
+        )
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
+        .with_columns([
+            ((pl.col('game_seconds')) - (pl.col('game_seconds').shift(1).over(['season', 'game_id', 'period']))).alias('seconds_since_last'),
+            skaters_toi(data, 'home', 'home_shift_ID'),
+            skaters_toi(data, 'away', 'away_shift_ID'),
+            ((pl.col('event_type').shift(1).over(['season', 'game_id', 'period']))).alias('event_type_last'),
+            ((pl.col('event_team_abbr').shift(1).over(['season', 'game_id', 'period']))).alias('event_team_last'),
+            ((pl.col('strength_state').shift(1).over(['season', 'game_id', 'period']))).alias('event_strength_last'),
+            ((pl.col('x_abs').shift(1).over(['season', 'game_id', 'period']))).alias('x_abs_last'),
+            ((pl.col('y_abs').shift(1).over(['season', 'game_id', 'period']))).alias('y_abs_last'),
+            ((pl.col('event_angle').shift(1).over(['season', 'game_id', 'period']))).alias('event_angle_last'),
+            ((pl.col('home_score').shift(1).over(['season', 'game_id', 'period']))).alias('home_score'),
+            ((pl.col('away_score').shift(1).over(['season', 'game_id', 'period']))).alias('away_score'),
+            (pl.concat_str([pl.col('home_skaters'), pl.lit('v'), pl.col('away_skaters')])).alias('true_strength_state'),
+            (pl.when(pl.col('strength_state').is_in(PP_STR_Codes)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_pen'),
+            (pl.when(((pl.col('home_skaters') - pl.col('away_skaters')) >= 2) | ((pl.col('away_skaters') - pl.col('home_skaters')) >= 2)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_two_ma'),
+            (pl.when((pl.col('event_team_type') == 'home')).then((pl.col('home_goalie')).str.to_uppercase()).otherwise((pl.col('away_goalie').str.to_uppercase())).alias('event_goalie_id'))
+        ])
+        .with_columns([((pl.col('is_pen')) * ((pl.col('game_seconds')) - (pl.col('game_seconds').first().over(['season', 'game_id', 'pen_index'])))).alias('pen_seconds_since')
+            ])
+        .with_columns((pl.when((pl.col('pen_seconds_since') > 0) & (pl.col('pen_seconds_since') >= 300)).then(pl.lit(120)).otherwise(pl.col('pen_seconds_since'))).alias('pen_seconds_since'))
+        .with_columns([
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'away').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('event_team_toi'),
+            (pl.when(pl.col('event_team_type') == 'away').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'home').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('def_team_toi')
+        ])
+        .with_columns([
+            (pl.col('def_team_toi') - pl.col('event_team_toi')).alias('event_team_shift_time_diff')
+        ])
+        .pipe(sort_if_needed, ['season', 'game_id', 'event_idx'])
+        .filter(
+            (pl.col('event_type').is_in(fenwick_events)) &
+            (((pl.col('event_team_type') == 'away') & (pl.col('true_strength_state').is_in(["5v4", "5v3", "4v3"]))) |
+            ((pl.col('event_team_type') == 'home') & (pl.col('true_strength_state').is_in(["4v5", "3v5", "3v4"])))) &
+            (~pl.col('x_abs_last').is_null()) &
+            (~pl.col('y_abs_last').is_null())
+        )
+        .with_columns([
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('x_abs_last')).otherwise(pl.col('x_abs_last') * -1).alias('x_abs_last')),
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('y_abs_last')).otherwise(pl.col('y_abs_last') * -1).alias('y_abs_last')),
+            (pl.when(pl.col('home_score').is_null()).then(pl.lit(0)).otherwise(pl.col('home_score'))).alias('home_score'),
+            (pl.when(pl.col('away_score').is_null()).then(pl.lit(0)).otherwise(pl.col('away_score'))).alias('away_score')
+        ])
+        .with_columns([
+            (pl.when(pl.col('event_team_abbr') == pl.col('event_team_last')).then(pl.lit(1)).otherwise(pl.lit(0))).alias('same_team_last'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_home'),
+            (pl.when(pl.col('period') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_overtime'),
+            (pl.when(pl.col('season_type') == 'P').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_playoff'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_score') - pl.col('away_score')).otherwise(pl.col('away_score') - pl.col('home_score'))).alias('score_state'),
+            #(pl.when((pl.col('seconds_since_last') == 0) & (pl.col('event_type_last') == 'FACEOFF')).then(pl.col("shift_length")).otherwise(pl.col('seconds_since_last'))).alias('seconds_since_last'),
+            ((((pl.col('x_abs') - pl.col('x_abs_last')) ** 2) + ((pl.col('y_abs') - pl.col('y_abs_last')) ** 2)).sqrt()).alias('distance_from_last'),
+            (pl.when(pl.col('event_strength_last').is_in(EV_STR_Codes)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_event_EV')
+        ])
+        .with_columns(
+            pl.when(pl.col('seconds_since_last') == 0).then(pl.lit(0.5)).otherwise(pl.col('seconds_since_last')).alias('seconds_since_last'),
+            pl.when(pl.col('x_abs_last') >= 0)
+            .then((pl.col('y_abs_last') / (89.25 - (pl.col('x_abs_last').abs()))).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .when(pl.col('x_abs_last') < 0)
+            .then((pl.col('y_abs_last') / ((pl.col('x_abs_last').abs()) + 89.25)).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .alias('event_angle_last')
+        )
+        .with_columns(
+            pl.when(pl.col('x_abs_last') > 89.25).then((180 - pl.col('event_angle_last'))).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+        )
+        .with_columns([
+            (pl.col('distance_from_last') / pl.col('seconds_since_last')).alias('puck_speed_since_last'),
+            ((pl.col('event_angle') - pl.col('event_angle_last')).abs()).alias('event_angle_change')
+            ])
+        .with_columns((pl.col('event_angle_change') / pl.col('seconds_since_last')).alias('event_angle_change_speed'))
+        .with_columns([
+            pl.when(pl.col('puck_speed_since_last').is_infinite()).then(pl.col('distance_from_last') / pl.lit(0.5)).otherwise(pl.col('puck_speed_since_last')).alias('puck_speed_since_last'),
+            pl.when(pl.col('event_angle_last').is_infinite()).then(None).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+            ])
+        .select([
+            'season', 'game_id', 'game_date', 'event_idx', 'period', 'game_seconds', 'is_overtime', 'is_playoff',
+            'strength_state', 'true_strength_state', 'score_state', 'is_home', 'is_two_ma',
+            'event_player_1_id', 'home_goalie', 'away_goalie', 'event_player_2_id', 'event_goalie_id',
+            'home_score', 'away_score', 'home_abbreviation', 'away_abbreviation', 'home_skaters', 'away_skaters',
+            'event_type', 'event_team', 'event_team_abbr', 'event_team_type', 'secondary_type',
+            'x_abs', 'y_abs', 'event_angle_last', 'event_angle', 'event_distance',
+            'event_angle_change', 'event_angle_change_speed',
+            'event_team_last', 'same_team_last', 'event_strength_last', 'prior_event_EV', 'event_type_last',
+            'seconds_since_last', 'pen_seconds_since', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+            'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'
+        ])
+    )
+
+    ## Build Empty Net DataFrame ##
+    EN_DF = (
+        data
+        .filter(
+            (pl.col('event_type').is_in(xG_Events)) &
+            (((pl.col('period') < 5) & (pl.col('season_type') == 'R')) | (pl.col('season_type') == 'P')) &
+            (~pl.col('x_abs').is_null()) &
+            (~pl.col('y_abs').is_null())
+        )
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
+        .with_columns([
+            ((pl.col('game_seconds')) - (pl.col('game_seconds').shift(1).over(['season', 'game_id', 'period']))).alias('seconds_since_last'),
+            skaters_toi(data, 'home', 'home_shift_index'),
+            skaters_toi(data, 'away', 'away_shift_index'),
+            ((pl.col('event_type').shift(1).over(['season', 'game_id', 'period']))).alias('event_type_last'),
+            ((pl.col('event_team_abbr').shift(1).over(['season', 'game_id', 'period']))).alias('event_team_last'),
+            ((pl.col('strength_state').shift(1).over(['season', 'game_id', 'period']))).alias('event_strength_last'),
+            ((pl.col('x_abs').shift(1).over(['season', 'game_id', 'period']))).alias('x_abs_last'),
+            ((pl.col('y_abs').shift(1).over(['season', 'game_id', 'period']))).alias('y_abs_last'),
+            ((pl.col('home_score').shift(1).over(['season', 'game_id', 'period']))).alias('home_score'),
+            ((pl.col('away_score').shift(1).over(['season', 'game_id', 'period']))).alias('away_score'),
+            ((pl.col('event_angle').shift(1).over(['season', 'game_id', 'period']))).alias('event_angle_last'),
+            (pl.when(pl.col('strength_state').is_in(PP_STR_Codes)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_pen'),
+            (pl.when(((pl.col('home_skaters') - pl.col('away_skaters')) >= 2) | ((pl.col('away_skaters') - pl.col('home_skaters')) >= 2)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_two_ma')
+        ])
+        .with_columns([
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'away').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('event_team_toi'),
+            (pl.when(pl.col('event_team_type') == 'away').then(pl.col('home_skaters_toi'))
+               .when(pl.col('event_team_type') == 'home').then(pl.col('away_skaters_toi'))
+               .otherwise(pl.lit(None))
+            ).alias('def_team_toi')
+        ])
+        .with_columns([
+            (pl.col('def_team_toi') - pl.col('event_team_toi')).alias('event_team_shift_time_diff')
+        ])
+        .pipe(sort_if_needed, ['season', 'game_id', 'event_idx'])
+        .filter(
+            (pl.col('event_type').is_in(fenwick_events)) &
+            (((pl.col('event_team_type') == 'away') & (pl.col('true_strength_state').is_in(["Ev5", "Ev4", "Ev3"]))) |
+            ((pl.col('event_team_type') == 'home') & (pl.col('true_strength_state').is_in(["5vE", "4vE", "3vE"])))) &
+            (~pl.col('x_abs_last').is_null()) &
+            (~pl.col('y_abs_last').is_null())
+        )
+        .with_columns([
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('x_abs_last')).otherwise(pl.col('x_abs_last') * -1).alias('x_abs_last')),
+            (pl.when(pl.col('event_team_last') == pl.col('event_team_abbr')).then(pl.col('y_abs_last')).otherwise(pl.col('y_abs_last') * -1).alias('y_abs_last')),
+            (pl.when(pl.col('home_score').is_null()).then(pl.lit(0)).otherwise(pl.col('home_score'))).alias('home_score'),
+            (pl.when(pl.col('away_score').is_null()).then(pl.lit(0)).otherwise(pl.col('away_score'))).alias('away_score')
+        ])
+        .with_columns([
+            (pl.when(pl.col('event_team_abbr') == pl.col('event_team_last')).then(pl.lit(1)).otherwise(pl.lit(0))).alias('same_team_last'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_home'),
+            (pl.when(pl.col('period') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_overtime'),
+            (pl.when(pl.col('season_type') == 'P').then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_playoff'),
+            (pl.when(pl.col('event_team_type') == 'home').then(pl.col('home_score') - pl.col('away_score')).otherwise(pl.col('away_score') - pl.col('home_score'))).alias('score_state'),
+            #(pl.when((pl.col('seconds_since_last') == 0) & (pl.col('event_type_last') == 'FACEOFF')).then(pl.col("shift_length")).otherwise(pl.col('seconds_since_last'))).alias('seconds_since_last'),
+            ((((pl.col('x_abs') - pl.col('x_abs_last')) ** 2) + ((pl.col('y_abs') - pl.col('y_abs_last')) ** 2)).sqrt()).alias('distance_from_last'),
+            (pl.when(pl.col('event_strength_last').is_in(EV_STR_Codes)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_event_EV'),
+            (pl.when(pl.col('strength_state').is_in(EV_STR_Codes + ['6v6'])).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_EV')
+        ])
+        .with_columns(
+            pl.when(pl.col('seconds_since_last') == 0).then(pl.lit(0.5)).otherwise(pl.col('seconds_since_last')).alias('seconds_since_last'),
+            pl.when(pl.col('x_abs_last') >= 0)
+            .then((pl.col('y_abs_last') / (89.25 - (pl.col('x_abs_last').abs()))).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .when(pl.col('x_abs_last') < 0)
+            .then((pl.col('y_abs_last') / ((pl.col('x_abs_last').abs()) + 89.25)).arctan()
+                    .map_elements(lambda x: abs(x * (180 / pi)), return_dtype=pl.Float64))
+            .alias('event_angle_last')
+        )
+        .with_columns(
+            pl.when(pl.col('x_abs_last') > 89.25).then((180 - pl.col('event_angle_last'))).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+        )
+        .with_columns([
+            (pl.col('distance_from_last') / pl.col('seconds_since_last')).alias('puck_speed_since_last'),
+            ((pl.col('event_angle') - pl.col('event_angle_last')).abs()).alias('event_angle_change')
+            ])
+        .with_columns((pl.col('event_angle_change') / pl.col('seconds_since_last')).alias('event_angle_change_speed'))
+        .with_columns([
+            pl.when(pl.col('puck_speed_since_last').is_infinite()).then(pl.col('distance_from_last') / pl.lit(0.5)).otherwise(pl.col('puck_speed_since_last')).alias('puck_speed_since_last'),
+            pl.when(pl.col('event_angle_last').is_infinite()).then(None).otherwise(pl.col('event_angle_last')).alias('event_angle_last')
+            ])
+        .select([
+            'season', 'game_id', 'game_date', 'event_idx', 'period', 'game_seconds', 'is_overtime', 'is_playoff',
+            'strength_state', 'true_strength_state', 'score_state', 'is_home', 'is_two_ma', 'is_pen', 'is_EV',
+            'event_player_1_id', 'home_goalie', 'away_goalie', 'event_player_2_id',
+            'home_score', 'away_score', 'home_abbreviation', 'away_abbreviation', 'home_skaters', 'away_skaters',
+            'event_type', 'event_team', 'event_team_abbr', 'event_team_type', 'secondary_type', 
+            'x_abs', 'y_abs', 'event_angle', 'event_distance',
+            'event_angle_change', 'event_angle_change_speed',
+            'event_team_last', 'same_team_last', 'event_strength_last', 'prior_event_EV', 'event_type_last',
+            'seconds_since_last', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+            'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'
+        ])
+    )
+    return EV_DF, PP_DF, SH_DF, EN_DF
+
+# 4) FUNCTION: One Hot Encoding and Other Feature Engineering
+@profile_stage('model_prep')
+def model_prep(data, prep_type, roster = None, encoding = 'onehot'):
+    """ This function will prep each dataframe to be inputted into a classification model to predict expected goals
+
+    roster defaults to the slim roster file (see load_model_roster)
+    encoding = 'categorical' keeps strength state, score state and prior event as one Enum column each (see collapse_indicators)
+    instead of the one hot indicator columns. Derived flags (is_rebound, is_rush_play, etc.) are the same in both modes """
+    if encoding not in ['onehot', 'categorical']:
+        raise ValueError(f"Unknown encoding: {encoding}")
+    ROSTER_DF = load_model_roster() if roster is None else roster
+
+    if(prep_type == 'EV'):
+        model_prep = (
+            data
+            .join(ROSTER_DF.with_columns(pl.col('event_player_1_id').cast(pl.Utf8)), on=["event_player_1_id"], how = 'left')
+            #.join(GOALIES, on=["event_goalie_id"], how = 'left')
+            .with_columns([
+                # Target Variable
+                (pl.when(pl.col('event_type') == "GOAL").then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_goal'),
+                # Game State
+                (pl.when(pl.col('strength_state') == "5v5").then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_5v5'),
+                (pl.when(pl.col('strength_state') == "4v4").then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_4v4'),
+                (pl.when(pl.col('strength_state') == "3v3").then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_3v3'),
+                # Score State
+                (pl.when(pl.col('score_state') <= -4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_4'),
+                (pl.when(pl.col('score_state') == -3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_3'),
+                (pl.when(pl.col('score_state') == -2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_2'),
+                (pl.when(pl.col('score_state') == -1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_1'),
+                (pl.when(pl.col('score_state') == 0).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_even'),
+                (pl.when(pl.col('score_state') == 1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_1'),
+                (pl.when(pl.col('score_state') == 2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_2'),
+                (pl.when(pl.col('score_state') == 3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_3'),
+                (pl.when(pl.col('score_state') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_4'),
+                # Prior Shot Outcome
+                (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_same'),
+                (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_same'),
+                (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_same'),
+                (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_opp'),
+                (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_opp'),
+                (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_opp'),
+                # Prior Event - Non Shot
+                (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_opp'),
+                (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_same'),
+                (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_opp'),
+                (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_same'),
+                (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_opp'),
+                (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_same'),
+                (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_win'),
+                (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_lose'),
+                # Handiness
+                (pl.when(
+                    ((pl.col('hand_R') == 1) & (pl.col('y_abs') > 0) & ((pl.col('event_angle') > 10))) |
+                    ((pl.col('hand_L') == 1) & (pl.col('y_abs') < 0) & ((pl.col('event_angle') > 10)))
+                    ).then(pl.lit(1)).otherwise(pl.lit(0)).alias('off_wing'))
+            ])
+            .with_columns([
+                # Create Rebound Flag
+                (pl.when(
+                (pl.col('prior_shot_same') == 1) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rebound'),
+                (pl.when(
+                ((pl.col('prior_miss_same') == 1) | (pl.col('prior_block_same') == 1)) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_post_miss_shot'),
+                # Set Play (Faceoff Win + Shot In 5 Seconds)
+                (pl.when(
+                (pl.col('prior_face_win') == 1) &
+                (pl.col('x_abs_last') > 25) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_set_play'),
+                # Rush (Transition Play after Turnover)
+                (pl.when(
+                (pl.col('x_abs_last') < 0) &
+                (pl.col('seconds_since_last') <= 5) &
+                ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rush_play'),
+                (pl.when(
+                (pl.col('x_abs_last') < 25) &
+                (pl.col('seconds_since_last') <= 3) &
+                ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_fast_rush_play')
+            ])
+        )
+
+        # Get Creates Column Names + Slim
+        new_cols = model_prep.columns[-32:]
+        model_prep = (
+            model_prep
+            .select([ 'season', 'game_id', 'event_idx', 'secondary_type',
+                'is_goal',
+                'period', 'game_seconds','is_home', 'is_overtime', 'is_playoff',
+                'x_abs', 'y_abs', 'event_distance', 'event_angle',
+                'event_angle_change', 'event_angle_change_speed',
+                'seconds_since_last', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+                'pos_F', 'pos_D', 'pos_G', 'hand_R', 'hand_L', #'G_hand_R', 'G_hand_L',
+                'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'] + new_cols
+            )
+        )
+
+    elif(prep_type == 'PP'):
+        model_prep = (
+            data
+            .join(ROSTER_DF.with_columns(pl.col('event_player_1_id').cast(pl.Utf8)), on=["event_player_1_id"], how = 'left')
+            #.join(GOALIES, on=["event_goalie_id"], how = 'left')
+            .with_columns([
+                # Target Variable
+                (pl.when(pl.col('event_type') == "GOAL").then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_goal'),
+                # Game State
+                (pl.when(((pl.col('true_strength_state') == "5v4") & (pl.col('event_team_type') == 'home')) | 
+                         ((pl.col('true_strength_state') == "4v5") & (pl.col('event_team_type') == 'away'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_5v4'),
+                (pl.when(((pl.col('true_strength_state') == "5v3") & (pl.col('event_team_type') == 'home')) | 
+                         ((pl.col('true_strength_state') == "3v5") & (pl.col('event_team_type') == 'away'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_5v3'),
+                (pl.when(((pl.col('true_strength_state') == "4v3") & (pl.col('event_team_type') == 'home')) | 
+                         ((pl.col('true_strength_state') == "3v4") & (pl.col('event_team_type') == 'away'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_4v3'),
+                (pl.when(((pl.col('true_strength_state') == "6v5") & (pl.col('event_team_type') == 'home')) | 
+                         ((pl.col('true_strength_state') == "5v6") & (pl.col('event_team_type') == 'away'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_6v5'),
+                (pl.when(((pl.col('true_strength_state') == "6v4") & (pl.col('event_team_type') == 'home')) | 
+                         ((pl.col('true_strength_state') == "4v6") & (pl.col('event_team_type') == 'away'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_6v4'),
+                # Score State
+                (pl.when(pl.col('score_state') <= -4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_4'),
+                (pl.when(pl.col('score_state') == -3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_3'),
+                (pl.when(pl.col('score_state') == -2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_2'),
+                (pl.when(pl.col('score_state') == -1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_1'),
+                (pl.when(pl.col('score_state') == 0).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_even'),
+                (pl.when(pl.col('score_state') == 1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_1'),
+                (pl.when(pl.col('score_state') == 2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_2'),
+                (pl.when(pl.col('score_state') == 3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_3'),
+                (pl.when(pl.col('score_state') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_4'),
+                # Prior Shot Outcome
+                (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_same'),
+                (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_same'),
+                (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_same'),
+                (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_opp'),
+                (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_opp'),
+                (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_opp'),
+                # Prior Event - Non Shot
+                (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_opp'),
+                (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_same'),
+                (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_opp'),
+                (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_same'),
+                (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_opp'),
+                (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_same'),
+                (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_win'),
+                (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_lose'),
+                # Handiness
+                (pl.when(
+                    ((pl.col('hand_R') == 1) & (pl.col('y_abs') > 0) & ((pl.col('event_angle') > 10))) |
+                    ((pl.col('hand_L') == 1) & (pl.col('y_abs') < 0) & ((pl.col('event_angle') > 10)))
+                    ).then(pl.lit(1)).otherwise(pl.lit(0)).alias('off_wing'))
+            ])
+            .with_columns([
+                # Create Rebound Flag
+                (pl.when(
+                (pl.col('prior_shot_same') == 1) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rebound'),
+                (pl.when(
+                ((pl.col('prior_miss_same') == 1) | (pl.col('prior_block_same') == 1)) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_post_miss_shot'),
+                # Set Play (Faceoff Win + Shot In 5 Seconds)
+                (pl.when(
+                (pl.col('prior_face_win') == 1) &
+                (pl.col('x_abs_last') > 25) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_set_play'),
+                # Rush (Transition Play after Turnover)
+                (pl.when(
+                (pl.col('x_abs_last') < 0) &
+                (pl.col('seconds_since_last') <= 5) &
+                ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rush_play'),
+                (pl.when(
+                (pl.col('x_abs_last') < 25) &
+                (pl.col('seconds_since_last') <= 3) &
+                ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_fast_rush_play')
+            ])
+        )
+
+        # Get Creates Column Names + Slim
+        new_cols = model_prep.columns[-34:]
+        model_prep = (
+            model_prep
+            .select([ 'season', 'game_id', 'event_idx', 'secondary_type',
+                'is_goal',
+                'period', 'game_seconds','is_home', 'is_overtime', 'is_playoff',
+                'x_abs', 'y_abs', 'event_angle', 'event_distance',
+                'event_angle_change', 'event_angle_change_speed',
+                'seconds_since_last', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+                'pen_seconds_since', 'prior_event_EV', 'is_two_ma',
+                'pos_F', 'pos_D', 'pos_G', 'hand_R', 'hand_L', #'G_hand_R', 'G_hand_L',
+                'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'] + new_cols
+            )
+        )
+
+    elif(prep_type == 'SH'):
+        model_prep = (
+            data
+            .join(ROSTER_DF.with_columns(pl.col('event_player_1_id').cast(pl.Utf8)), on=["event_player_1_id"], how = 'left')
+            #.join(GOALIES, on=["event_goalie_id"], how = 'left')
+            .with_columns([
+                # Target Variable
+                (pl.when(pl.col('event_type') == "GOAL").then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_goal'),
+                # Game State
+                (pl.when(((pl.col('true_strength_state') == "5v4") & (pl.col('event_team_type') == 'away')) | 
+                         ((pl.col('true_strength_state') == "4v5") & (pl.col('event_team_type') == 'home'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_4v5'),
+                (pl.when(((pl.col('true_strength_state') == "5v3") & (pl.col('event_team_type') == 'away')) | 
+                         ((pl.col('true_strength_state') == "3v5") & (pl.col('event_team_type') == 'home'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_3v5'),
+                (pl.when(((pl.col('true_strength_state') == "4v3") & (pl.col('event_team_type') == 'away')) | 
+                         ((pl.col('true_strength_state') == "3v4") & (pl.col('event_team_type') == 'home'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_3v4'),
+                # Score State
+                (pl.when(pl.col('score_state') <= -4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_4'),
+                (pl.when(pl.col('score_state') == -3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_3'),
+                (pl.when(pl.col('score_state') == -2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_2'),
+                (pl.when(pl.col('score_state') == -1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_1'),
+                (pl.when(pl.col('score_state') == 0).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_even'),
+                (pl.when(pl.col('score_state') == 1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_1'),
+                (pl.when(pl.col('score_state') == 2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_2'),
+                (pl.when(pl.col('score_state') == 3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_3'),
+                (pl.when(pl.col('score_state') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_4'),
+                # Prior Shot Outcome
+                (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_same'),
+                (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_same'),
+                (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_same'),
+                (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_opp'),
+                (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_opp'),
+                (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_opp'),
+                # Prior Event - Non Shot
+                (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_opp'),
+                (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_same'),
+                (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_opp'),
+                (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_same'),
+                (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_opp'),
+                (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_same'),
+                (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_win'),
+                (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_lose'),
+                # Handiness
+                (pl.when(
+                    ((pl.col('hand_R') == 1) & (pl.col('y_abs') > 0) & ((pl.col('event_angle') > 10))) |
+                    ((pl.col('hand_L') == 1) & (pl.col('y_abs') < 0) & ((pl.col('event_angle') > 10)))
+                    ).then(pl.lit(1)).otherwise(pl.lit(0)).alias('off_wing'))
+            ])
+            .with_columns([
+                # Create Rebound Flag
+                (pl.when(
+                (pl.col('prior_shot_same') == 1) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rebound'),
+                (pl.when(
+                ((pl.col('prior_miss_same') == 1) | (pl.col('prior_block_same') == 1)) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_post_miss_shot'),
+                # Set Play (Faceoff Win + Shot In 5 Seconds)
+                (pl.when(
+                (pl.col('prior_face_win') == 1) &
+                (pl.col('x_abs_last') > 25) &
+                (pl.col('seconds_since_last') <= 3)
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_set_play'),
+                # Rush (Transition Play after Turnover)
+                (pl.when(
+                (pl.col('x_abs_last') < 0) &
+                (pl.col('seconds_since_last') <= 5) &
+                ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rush_play'),
+                (pl.when(
+                (pl.col('x_abs_last') < 25) &
+                (pl.col('seconds_since_last') <= 3) &
+                ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+                ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_fast_rush_play')
+            ])
+        )
+
+        # Get Creates Column Names + Slim
+        new_cols = model_prep.columns[-32:]
+        model_prep = (
+            model_prep
+            .select([ 'season', 'game_id', 'event_idx', 'secondary_type',
+                'is_goal',
+                'period', 'game_seconds','is_home', 'is_overtime', 'is_playoff',
+                'x_abs', 'y_abs', 'event_angle', 'event_distance',
+                'event_angle_change', 'event_angle_change_speed',
+                'seconds_since_last', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+                'pen_seconds_since', 'prior_event_EV',
+                'pos_F', 'pos_D', 'pos_G', 'hand_R', 'hand_L', #'G_hand_R', 'G_hand_L',
+                'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'] + new_cols
+            )
+        )
+
+    elif(prep_type == 'EN'):
+        model_prep = (
+        data
+        .join(ROSTER_DF.with_columns(pl.col('event_player_1_id').cast(pl.Utf8)), on=["event_player_1_id"], how = 'left')
+        .with_columns([
+            # Target Variable
+            (pl.when(pl.col('event_type') == "GOAL").then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_goal'),
+            # Game State
+            (pl.when(((pl.col('true_strength_state') == "Ev5") & (pl.col('event_team_type') == 'away')) | 
+                     ((pl.col('true_strength_state') == "5vE") & (pl.col('event_team_type') == 'home'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_Ev5'),
+            (pl.when(((pl.col('true_strength_state') == "Ev4") & (pl.col('event_team_type') == 'away')) | 
+                     ((pl.col('true_strength_state') == "4vE") & (pl.col('event_team_type') == 'home'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_Ev4'),
+            (pl.when(((pl.col('true_strength_state') == "Ev3") & (pl.col('event_team_type') == 'away')) | 
+                     ((pl.col('true_strength_state') == "3vE") & (pl.col('event_team_type') == 'home'))).then(pl.lit(1)).otherwise(pl.lit(0))).alias('state_Ev3'),
+            # Score State
+            (pl.when(pl.col('score_state') <= -4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_4'),
+            (pl.when(pl.col('score_state') == -3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_3'),
+            (pl.when(pl.col('score_state') == -2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_2'),
+            (pl.when(pl.col('score_state') == -1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_down_1'),
+            (pl.when(pl.col('score_state') == 0).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_even'),
+            (pl.when(pl.col('score_state') == 1).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_1'),
+            (pl.when(pl.col('score_state') == 2).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_2'),
+            (pl.when(pl.col('score_state') == 3).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_3'),
+            (pl.when(pl.col('score_state') >= 4).then(pl.lit(1)).otherwise(pl.lit(0))).alias('score_up_4'),
+            # Prior Shot Outcome
+            (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_same'),
+            (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_same'),
+            (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_same'),
+            (pl.when((pl.col('event_type_last') == "SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_shot_opp'),
+            (pl.when((pl.col('event_type_last') == "MISSED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_miss_opp'),
+            (pl.when((pl.col('event_type_last') == "BLOCKED_SHOT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_block_opp'),
+            # Prior Event - Non Shot
+            (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_opp'),
+            (pl.when((pl.col('event_type_last') == "GIVEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_give_same'),
+            (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_opp'),
+            (pl.when((pl.col('event_type_last') == "TAKEAWAY") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_take_same'),
+            (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_opp'),
+            (pl.when((pl.col('event_type_last') == "HIT") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_hit_same'),
+            (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 1)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_win'),
+            (pl.when((pl.col('event_type_last') == "FACEOFF") & (pl.col('same_team_last') == 0)).then(pl.lit(1)).otherwise(pl.lit(0))).alias('prior_face_lose'),
+            # Handiness
+            (pl.when(
+                    ((pl.col('hand_R') == 1) & (pl.col('y_abs') > 0) & ((pl.col('event_angle') > 10))) |
+                    ((pl.col('hand_L') == 1) & (pl.col('y_abs') < 0) & ((pl.col('event_angle') > 10)))
+                    ).then(pl.lit(1)).otherwise(pl.lit(0)).alias('off_wing'))
+        ])
+        .with_columns([
+            # Create Rebound Flag
+            (pl.when(
+            (pl.col('prior_shot_same') == 1) &
+            (pl.col('seconds_since_last') <= 3)
+            ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rebound'),
+            (pl.when(
+            ((pl.col('prior_miss_same') == 1) | (pl.col('prior_block_same') == 1)) &
+            (pl.col('seconds_since_last') <= 3)
+            ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_post_miss_shot'),
+            # Set Play (Faceoff Win + Shot In 5 Seconds)
+            (pl.when(
+            (pl.col('prior_face_win') == 1) &
+            (pl.col('x_abs_last') > 25) &
+            (pl.col('seconds_since_last') <= 3)
+            ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_set_play'),
+            # Rush (Transition Play after Turnover)
+            (pl.when(
+            (pl.col('x_abs_last') < 0) &
+            (pl.col('seconds_since_last') <= 5) &
+            ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+            ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_rush_play'),
+            (pl.when(
+            (pl.col('x_abs_last') < 25) &
+            (pl.col('seconds_since_last') <= 3) &
+            ((pl.col('prior_give_opp') == 1) | (pl.col('prior_shot_opp') == 1) | (pl.col('prior_miss_opp') == 1) | (pl.col('prior_block_opp') == 1) | (pl.col('prior_take_same') == 1))
+            ).then(pl.lit(1)).otherwise(pl.lit(0))).alias('is_fast_rush_play')
+            ])
+        )
+
+        # Get Creates Column Names + Slim
+        new_cols = model_prep.columns[-32:]
+        model_prep = (
+            model_prep
+            .select(['season', 'game_id', 'event_idx', 'secondary_type',
+                'is_goal',
+                'period', 'game_seconds','is_home', 'is_overtime', 'is_playoff',
+                'x_abs', 'y_abs', 'event_distance', 'event_angle',
+                'event_angle_change', 'event_angle_change_speed',
+                'seconds_since_last', 'distance_from_last', 'x_abs_last', 'y_abs_last', 'puck_speed_since_last',
+                'prior_event_EV',
+                'pos_F', 'pos_D', 'pos_G', 'hand_R', 'hand_L',
+                'event_team_shift_time_diff', 'event_team_toi', 'def_team_toi'] + new_cols
+            )
+        )
+
+    if encoding == 'categorical':
+        model_prep = collapse_indicators(model_prep, new_cols)
+    return model_prep
+
+# 5) FUNCTION: Impute Secondary Type - Guess Using xGBoost
+@profile_stage('imp_sec_type')
+def imp_sec_type(data, encoding = 'onehot'):
+    """ This Function will looks to impute missing values in secondary type by using a classification model to guess the shot type
+
+    encoding = 'categorical' adds one Enum shot_type column instead of the seven shot flags (use with model_prep(..., encoding='categorical'))"""
+    from sklearn.preprocessing import LabelEncoder
+    from xgboost import XGBClassifier
+
+    if encoding not in ['onehot', 'categorical']:
+        raise ValueError(f"Unknown encoding: {encoding}")
+
+    data = data.with_columns(pl.when(pl.col('secondary_type').is_in(["Poked", "Batted", "Between Legs"])).then(pl.lit(None)).otherwise(pl.col('secondary_type')).alias("secondary_type"))
+
+    train = data.filter(~pl.col('secondary_type').is_null())
+    test = data.filter(pl.col('secondary_type').is_null())
+
+    exclude_cols = ['game_id', 'event_idx']
+    features = [t_col for t_col in train.columns if t_col not in exclude_cols and t_col != "secondary_type"]
+
+    train_features = train.select(features)
+    impute_features = test.select(features)
+
+
+    # Label encode the target variable
+    le = LabelEncoder()
+    train_target = le.fit_transform(
+        train.select('secondary_type')['secondary_type']
+    )
+    
+    # Train a classifier (Enum Features Go Through Pandas As Category Columns)
+    if encoding == 'categorical':
+        classifier = XGBClassifier(tree_method='hist', enable_categorical=True)
+        train_features, impute_features = train_features.to_pandas(), impute_features.to_pandas()
+    else:
+        classifier = XGBClassifier()
+    classifier.fit(train_features, train_target)
+
+    # Predict missing values
+    predicted_values = classifier.predict(impute_features)
+
+    # Decode predicted values
+    imputed_labels = le.inverse_transform(predicted_values)
+
+    # Use map_elements method to replace missing values
+    test = test.with_columns(pl.Series("event_detail", imputed_labels, dtype=pl.Utf8))
+    train = train.with_columns(pl.col('secondary_type').alias("event_detail"))
+    final_df = train.vstack(test)
+    if encoding == 'categorical':
+        shot_cols = [pl.when(pl.col('event_detail').is_in(shot_types)).then(pl.col('event_detail')).cast(pl.Enum(shot_types)).alias('shot_type')]
+    else:
+        shot_cols = [
+            (pl.when(pl.col('event_detail') == "Wrist").then(pl.lit(1)).otherwise(pl.lit(0))).alias('wrist_shot'),
+            (pl.when(pl.col('event_detail') == "Deflected").then(pl.lit(1)).otherwise(pl.lit(0))).alias('deflected_shot'),
+            (pl.when(pl.col('event_detail') == "Tip-In").then(pl.lit(1)).otherwise(pl.lit(0))).alias('tip_shot'),
+            (pl.when(pl.col('event_detail') == "Slap").then(pl.lit(1)).otherwise(pl.lit(0))).alias('slap_shot'),
+            (pl.when(pl.col('event_detail') == "Backhand").then(pl.lit(1)).otherwise(pl.lit(0))).alias('backhand_shot'),
+            (pl.when(pl.col('event_detail') == "Snap").then(pl.lit(1)).otherwise(pl.lit(0))).alias('snap_shot'),
+            (pl.when(pl.col('event_detail') == "Wrap-Around").then(pl.lit(1)).otherwise(pl.lit(0))).alias('wrap_shot')
+        ]
+    final_df = (
+        final_df
+        .pipe(sort_if_needed, ['season', 'game_id', 'event_idx'])
+        .with_columns(shot_cols)
+    )
+
+    # Calculate Differences In New Shot Types
+    null_df = final_df.filter(pl.col('secondary_type').is_null())
+    rws = null_df.height
+    val_cts = null_df['event_detail'].value_counts()
+    val_cts = val_cts.with_columns(((pl.col('count')*100 / rws).round(2)).alias('Percent'))
+    val_cts = val_cts.with_columns(((val_cts['count'].map_elements(lambda x: f"{x:,.0f}", return_dtype=pl.Utf8)) + ' ' + (val_cts['Percent'].map_elements(lambda x: f"({x:.2f}%)", return_dtype=pl.Utf8))).alias('Label')).sort("count", descending=True).drop('count', 'Percent')
+    print("Rows Imputated Using XGB MultiClassifier of Null Shot Types (Blocked And Missed Shots): "+ str(rws))
+    print(val_cts)
+    
+    return final_df.drop('secondary_type')
+
+### END PREPROCESSING FUNCTIONS ###
@@ -0,0 +1,263 @@
+# Tools
+import os
+import json
+import time
+import urllib.request
+from datetime import datetime, timedelta
+
+# Load_All_PBP (polars/pandas/requests) Is Only Imported By ingest_games, So The Watch Loop Itself Stays Small And Can Be
+# Run Against A Stub Schedule Server (benchmarks/stub_schedule_server.py) With Any ingest Function
+
+
+### POST-GAME FINALIZER - DEFINE ###
+
+# Path (Every Game Seen, Its Last Schedule State And Whether It Was Ingested)
+finalizer_state_file = 'Data/Finalizer/finalizer_state.json'
+
+# Schedule Endpoint (Same As The Loaders)
+SCHEDULE_URL = 'https://api-web.nhle.com/v1/schedule/{date}'
+
+# gameState: FUT -> PRE -> LIVE -> CRIT -> FINAL (Unofficial) -> OFF (Official, Stats Locked). Only OFF Is Ingested By Default
+FINAL_STATES = ['OFF']
+
+# gameScheduleState Other Than OK (Postponed, Cancelled, Suspended) - Never Ingested, Re-Checked If The State Changes
+SKIP_SCHEDULE_STATES = ['PPD', 'CNCL', 'SUSP']
+
+# Bounds - Seconds Between Polls, Games Loaded Per Cycle (One In Memory At A Time), Tries Per Game, Days Looked Back
+POLL_SECONDS = 120
+MAX_GAMES_PER_CYCLE = 8
+MAX_ATTEMPTS = 3
+LOOKBACK_DAYS = 1
+REQUEST_TIMEOUT = 15
+
+# 1) FUNCTION: One Day's Games From The Schedule Endpoint
+def fetch_schedule(date, url=SCHEDULE_URL, timeout=REQUEST_TIMEOUT):
+    """This function will return the regular season/playoff games (gameType 2/3) scheduled on date ('YYYY-MM-DD') as
+    {game_id: {'game_state', 'schedule_state', 'date'}}"""
+    with urllib.request.urlopen(url.format(date=date), timeout=timeout) as response:
+        payload = json.load(response)
+    games = {}
+    for day in payload.get('gameWeek', []):
+        if day.get('date') != date:
+            continue
+        for game in day.get('games', []):
+            if game.get('gameType') in [2, 3]:
+                games[int(game['id'])] = {
+                    'game_state': game.get('gameState'),
+                    'schedule_state': game.get('gameScheduleState', 'OK'),
+                    'date': date
+                }
+    return games
+
+# 2) CLASS: Watch The Schedule And Ingest Each Game Once It Is Final
+class GameFinalizer:
+    """Polls the schedule for today and the last LOOKBACK_DAYS days (late games end after midnight), keeps every game's
+    latest state in finalizer_state.json and hands games that reached a final state to ingest, at most max_games_per_cycle
+    per cycle.
+
+    ingest(season, game_ids) -> (ingested ids, failed ids). after_ingest(season, ingested ids) runs once per season per
+    cycle (feature build + scoring, e.g. pipeline_hook). A failed game is retried on later cycles until max_attempts.
+    """
+
+    def __init__(self, ingest=None, after_ingest=None, state_path=finalizer_state_file, schedule_url=SCHEDULE_URL,
+                 final_states=FINAL_STATES, max_games_per_cycle=MAX_GAMES_PER_CYCLE, max_attempts=MAX_ATTEMPTS,
+                 lookback_days=LOOKBACK_DAYS, today=None):
+        self.ingest = ingest or ingest_games
+        self.after_ingest = after_ingest
+        self.state_path = state_path
+        self.schedule_url = schedule_url
+        self.final_states = list(final_states)
+        self.max_games_per_cycle = max_games_per_cycle
+        self.max_attempts = max_attempts
+        self.lookback_days = lookback_days
+        self.today = today or (lambda: datetime.today())
+        self.games = self._load_state()
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as file:
+                return {int(k): v for k, v in json.load(file).items()}
+        return {}
+
+    def _save_state(self):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({str(k): v for k, v in sorted(self.games.items())}, file, indent=1)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.state_path)
+
+    def poll(self):
+        """Refresh the state of every game on the watched dates. Returns the number of games whose state changed"""
+        today = self.today()
+        changed = 0
+        for days_back in range(self.lookback_days, -1, -1):
+            date = (today - timedelta(days=days_back)).strftime('%Y-%m-%d')
+            for game_id, info in fetch_schedule(date, self.schedule_url).items():
+                game = self.games.setdefault(game_id, {'status': 'waiting', 'attempts': 0})
+                if (game.get('game_state'), game.get('schedule_state')) != (info['game_state'], info['schedule_state']):
+                    changed += 1
+                game.update(info)
+        return changed
+
+    def ready(self):
+        """Games in a final state, scheduled OK, not yet ingested and under max_attempts (oldest first)"""
+        return sorted(
+            (game_id for game_id, g in self.games.items()
+             if g.get('game_state') in self.final_states and g.get('schedule_state') not in SKIP_SCHEDULE_STATES
+             and g['status'] in ['waiting', 'retry'] and g['attempts'] < self.max_attempts),
+            key=lambda game_id: (self.games[game_id]['date'], game_id)
+        )
+
+    def enqueue(self, game_ids):
+        """Force games (e.g. audit_incomplete_games results) to be re-ingested once they are final"""
+        for game_id in game_ids:
+            game = self.games.setdefault(int(game_id), {'status': 'waiting', 'attempts': 0, 'game_state': 'OFF', 'schedule_state': 'OK', 'date': ''})
+            game.update({'status': 'retry', 'attempts': 0})
+        self._save_state()
+
+    def run_cycle(self):
+        """Poll, ingest up to max_games_per_cycle final games (grouped by season), run after_ingest and save the state"""
+        start_time = time.time()
+        changed = self.poll()
+        batch = self.ready()[:self.max_games_per_cycle]
+        ingested, failed = [], []
+        for season in sorted({int(str(g)[:4]) for g in batch}):
+            season_ids = [g for g in batch if int(str(g)[:4]) == season]
+            for g in season_ids:
+                self.games[g]['attempts'] += 1
+            try:
+                ok_ids, bad_ids = self.ingest(season, season_ids)
+            except Exception as e:
+                print(f"Ingest Failed For {season}-{season+1} Games {season_ids}: {e}")
+                ok_ids, bad_ids = [], season_ids
+            for g in ok_ids:
+                self.games[g].update({'status': 'ingested', 'ingested_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+            for g in bad_ids:
+                self.games[g]['status'] = 'failed' if self.games[g]['attempts'] >= self.max_attempts else 'retry'
+            self._save_state()
+            ingested += list(ok_ids)
+            failed += list(bad_ids)
+            if ok_ids and self.after_ingest is not None:
+                self.after_ingest(season, list(ok_ids))
+
+        self._save_state()
+        elap_time = round(time.time() - start_time, 2)
+        waiting = sum(1 for g in self.games.values() if g['status'] in ['waiting', 'retry'])
+        print(f"Finalizer Cycle: {changed} State Changes | {len(ingested)} Ingested | {len(failed)} Failed | {waiting} Waiting in {elap_time} Seconds | Path: {self.state_path}")
+        return {'changed': changed, 'ingested': ingested, 'failed': failed}
+
+    def run(self, poll_seconds=POLL_SECONDS, max_cycles=None):
+        """Run cycles until max_cycles (None = until interrupted). A cycle that still has ready games starts right away;
+        otherwise the loop sleeps poll_seconds. Schedule errors back off (doubling, up to 10 x poll_seconds)"""
+        cycles, backoff = 0, poll_seconds
+        while max_cycles is None or cycles < max_cycles:
+            cycles += 1
+            try:
+                self.run_cycle()
+                backoff = poll_seconds
+            except KeyboardInterrupt:
+                break
+            except Exception as e:
+                print(f"Finalizer Cycle Error: {e} | Retrying in {backoff} Seconds")
+                time.sleep(backoff)
+                backoff = min(backoff * 2, poll_seconds * 10)
+                continue
+            if max_cycles is not None and cycles >= max_cycles:
+                break
+            if not self.ready():
+                try:
+                    time.sleep(poll_seconds)
+                except KeyboardInterrupt:
+                    break
+        return self.games
+
+# 3) FUNCTION: Default Ingest - Load Final Games And Swap Them Into The Season File
+def ingest_games(season, game_ids):
+    """This function will load each game (PBP + shifts, same steps as the loaders), checkpoint it, then stream the season
+    file into a new one with those game_ids dropped and the fresh games appended (half-complete copies stored by an earlier
+    date crawl are replaced). Stints and the on-ice bridge are updated the same way. Returns (ingested ids, failed ids)"""
+    import Load_All_PBP as loader
+    from Payload_Fingerprints import discard_pending
+
+    ok_ids, bad_ids = [], []
+    for i in game_ids:
+        try:
+            game_stints = []
+            result_df = loader.append_shift_data(loader.reconcile_api_data(loader.align_and_cast_columns(data=loader.ping_nhl_api(i=i), sch=loader.raw_schema)), stint_list=game_stints)
+            loader.write_game_checkpoint(season, i, result_df, game_stints)
+            ok_ids.append(i)
+        except ValueError as e:
+            print(f"Error In Loading NHL API for GameID: {i} | {e}")
+            discard_pending([i])
+            bad_ids.append(i)
+    if not ok_ids:
+        return ok_ids, bad_ids
+
+    loader.replace_season_games(season, ok_ids)
+    return ok_ids, bad_ids
+
+# 4) FUNCTION: Stored Games Without A GAME_END (Loaded While Still Live)
+def audit_incomplete_games(season):
+    """This function will return game_ids in the season file that have no GAME_END event (two columns read)"""
+    import polars as pl
+    from Parquet_Store import scan_pbp
+
+    return (
+        scan_pbp([season], columns=['game_id', 'event_type'])
+        .group_by('game_id')
+        .agg((pl.col('event_type') == 'GAME_END').any().alias('has_end'))
+        .filter(~pl.col('has_end'))
+        .collect()['game_id'].sort().to_list()
+    )
+
+# 5) FUNCTION: Feature Build + Scoring After Ingest
+def pipeline_hook(seasons, current_season, train_seasons=None, targets=['aggregates'], max_workers=2):
+    """This function will return an after_ingest callback that brings the xG pipeline (xG_Pipeline.py) current for the
+    targets. The finalizer already rewrote the season file, so games[season] is recorded current first (otherwise its
+    changed output hash would rerun update_pbp_file - a schedule crawl and full season rewrite - every cycle); the season's
+    history/features/score/aggregate tasks then rerun and the rest skip"""
+    def after_ingest(season, game_ids):
+        from xG_Pipeline import build_pipeline
+
+        pipeline = build_pipeline(seasons, current_season, train_seasons=train_seasons)
+        if ('games', season) in pipeline.graph():
+            pipeline.mark_current([('games', season)])
+        pipeline.run(targets=targets, max_workers=max_workers)
+    return after_ingest
+
+### END POST-GAME FINALIZER ###
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point:
+
+    python Game_Finalizer.py [--once] [--poll-seconds 120] [--max-games 8] [--final-states OFF] [--audit 2023] [--score 2021 2022 2023]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Ingest NHL games as soon as the schedule marks them final")
+    parser.add_argument('--once', action='store_true', help="Run one cycle and exit")
+    parser.add_argument('--poll-seconds', type=float, default=POLL_SECONDS, help="Seconds between schedule polls")
+    parser.add_argument('--max-games', type=int, default=MAX_GAMES_PER_CYCLE, help="Games ingested per cycle")
+    parser.add_argument('--final-states', nargs='+', default=FINAL_STATES, help="gameState values treated as final (OFF, FINAL)")
+    parser.add_argument('--schedule-url', default=SCHEDULE_URL, help="Schedule endpoint with a {date} placeholder (stub server for testing)")
+    parser.add_argument('--state', default=finalizer_state_file, help="Finalizer state file")
+    parser.add_argument('--audit', type=int, default=None, help="Re-queue stored games of this season that have no GAME_END")
+    parser.add_argument('--score', nargs='+', type=int, default=None, help="Seasons for the pipeline after each ingest (last = current)")
+    args = parser.parse_args(argv)
+
+    after_ingest = pipeline_hook(args.score, max(args.score)) if args.score else None
+    finalizer = GameFinalizer(after_ingest=after_ingest, state_path=args.state, schedule_url=args.schedule_url,
+                              final_states=args.final_states, max_games_per_cycle=args.max_games)
+    if args.audit is not None:
+        incomplete = audit_incomplete_games(args.audit)
+        print(f"{len(incomplete)} Stored Games Without GAME_END Re-Queued: {incomplete}")
+        finalizer.enqueue(incomplete)
+    finalizer.run(poll_seconds=args.poll_seconds, max_cycles=1 if args.once else None)
+
+if __name__ == "__main__":
+    main()
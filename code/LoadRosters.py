@@ -1,69 +1,66 @@
-# Pandas
-import pandas as pd
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-import numpy as np
-
-# Polars (Arrow)
-from pyarrow.dataset import dataset
-import polars as pl
-pl.Config.set_tbl_rows(n=-1)
-pl.Config.set_tbl_cols(n=-1)
-
-# Hit API
-import requests
-
 # Tools
 from itertools import chain
 from datetime import datetime, timedelta
-from math import pi
 import time
 from itertools import product
 
 # Save
 import pickle
-import json
 import os
-import pathlib
-
-
-
-# Load And Save Roster Game IDs
-with open('game_ids.pkl', "rb") as file:
-    all_g_ids = pickle.load(file)
-
-st_yr = str(max(all_g_ids))[:4]
-
-
-id_start = time.time()
-st_date = st_yr +'1201'
-yday = datetime.today() - timedelta(days=1)
-end_date = yday.strftime('%Y%m%d')
-game_ids_new = []
-for i in pd.date_range(start=st_date, end=end_date, freq='D'):
-    i_str = i.strftime('%Y-%m-%d')
-    sched_link = "https://api-web.nhle.com/v1/schedule/"+i_str
-    response = requests.get(sched_link).json()
-    # Parse the JSON content of the response
-    raw_data = pd.json_normalize(response)
-    sched_data = pd.json_normalize(raw_data['gameWeek'][0])
-    sched_data = pd.json_normalize(sched_data['games'][0])
-    if len(sched_data) == 0:
-        pass
-    else:
-        sched_data = sched_data[sched_data['gameType'].isin([2,3])]
-        game_ids_new.append(sched_data['id'].tolist())
-# Create Lists (Game ID and Dates Loaded):
-game_ids = list(set(all_g_ids + list(chain(*game_ids_new))))
-# Save
-with open('game_ids.pkl', 'wb') as file:
-    pickle.dump(game_ids, file)
-id_end = time.time()
-id_elap = round((id_end - id_start)/60, 2)
-print("Successfully Loaded", str(len(game_ids)), "Game ID's From NHL Schedule in", str(id_elap), 'minutes')
 
+# pandas And requests Are Imported Inside Each Loader - Importing This Module Crawls Nothing (Run It As A Script Instead)
+
+
+# Path
+game_ids_file = 'game_ids.pkl'
+
+# 1) FUNCTION: Add Game IDs Played Since The Last Stored Season To game_ids.pkl
+def update_game_ids(path = game_ids_file):
+    """This function will crawl the NHL schedule from December of the latest stored season to yesterday and save every
+    regular season/playoff game ID (old + new) back to path"""
+    import pandas as pd
+    import requests
+
+    # Load And Save Roster Game IDs
+    with open(path, "rb") as file:
+        all_g_ids = pickle.load(file)
+
+    st_yr = str(max(all_g_ids))[:4]
+
+    id_start = time.time()
+    st_date = st_yr +'1201'
+    yday = datetime.today() - timedelta(days=1)
+    end_date = yday.strftime('%Y%m%d')
+    game_ids_new = []
+    for i in pd.date_range(start=st_date, end=end_date, freq='D'):
+        i_str = i.strftime('%Y-%m-%d')
+        sched_link = "https://api-web.nhle.com/v1/schedule/"+i_str
+        response = requests.get(sched_link).json()
+        # Parse the JSON content of the response
+        raw_data = pd.json_normalize(response)
+        sched_data = pd.json_normalize(raw_data['gameWeek'][0])
+        sched_data = pd.json_normalize(sched_data['games'][0])
+        if len(sched_data) == 0:
+            pass
+        else:
+            sched_data = sched_data[sched_data['gameType'].isin([2,3])]
+            game_ids_new.append(sched_data['id'].tolist())
+    # Create Lists (Game ID and Dates Loaded):
+    game_ids = list(set(all_g_ids + list(chain(*game_ids_new))))
+    # Save
+    with open(path, 'wb') as file:
+        pickle.dump(game_ids, file)
+    id_end = time.time()
+    id_elap = round((id_end - id_start)/60, 2)
+    print("Successfully Loaded", str(len(game_ids)), "Game ID's From NHL Schedule in", str(id_elap), 'minutes')
+    return game_ids
+
+# 2) FUNCTION: Load Or Update The Roster CSV
 def load_rosters(path = 'Data/NHL_Rosters_2014_2024.csv'):
     """Function To load Rosters. If Roster Data Exists, then the table will simply be updatad, rather than re-created every time"""
+    import pandas as pd
+    import requests
+
 
     # Load Constants:
     bad_link = ['https://api-web.nhle.com/v1/roster/ANA/20132014',
@@ -293,5 +290,24 @@ def load_rosters(path = 'Data/NHL_Rosters_2014_2024.csv'):
     
     ## Save as a CSV
     roster_data.to_csv(path, index=False)
+    return roster_data
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point - python LoadRosters.py [--path Data/NHL_Rosters_2014_2024.csv] [--skip-game-ids]"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update game_ids.pkl from the NHL schedule and load/update the roster CSV")
+    parser.add_argument('--path', default='Data/NHL_Rosters_2014_2024.csv', help="Roster CSV to create or update")
+    parser.add_argument('--game-ids', default=game_ids_file, help="Pickled game ID list to update")
+    parser.add_argument('--skip-game-ids', action='store_true', help="Only update rosters, do not crawl the schedule for new game IDs")
+    args = parser.parse_args(argv)
+
+    if not args.skip_game_ids:
+        update_game_ids(args.game_ids)
+    load_rosters(args.path)
 
-load_rosters()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
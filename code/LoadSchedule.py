@@ -1,30 +1,8 @@
-# Pandas
-import pandas as pd
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-import numpy as np
-
 # Polars (Arrow)
-from pyarrow.dataset import dataset
 import polars as pl
-pl.Config.set_tbl_rows(n=-1)
-pl.Config.set_tbl_cols(n=-1)
-
-# Hit API
-import requests
 
-# Tools
-from itertools import chain
-from datetime import datetime, timedelta
-from math import pi
-import time
-from itertools import product
+# pandas And requests Are Imported Inside load_schedule - Importing This Module Fetches Nothing (Run It As A Script Instead)
 
-# Save
-import pickle
-import json
-import os
-import pathlib
 
 #### PREVIOUS SEASONS ###
 #season_list = [2002,2003,2004,2006,2007,2008,2009,2010,
@@ -48,6 +26,9 @@ def load_schedule(start = '2023-10-10', end = '2023-12-25'): #datetime.today()
         INPUTS:
         start and end are dates stored in Y%m%d% format ('2023-12-27')
     """
+    import pandas as pd
+    import requests
+
 
     # 1) Initialize Variables (Start Date, End Date, List of IDs, Existing DF)
     start_date = start
@@ -127,10 +108,25 @@ def load_schedule(start = '2023-10-10', end = '2023-12-25'): #datetime.today()
 
     # Build + Manipulate Final DataFrame
     #game_dfs = [df for df in game_dfs if not df.is_empty()]
-    result_df = game_dfs[0]
-    for df in game_dfs[1:]:
-        result_df = result_df.vstack(df)
+    # One Concat (No Repeated vstack) - A Schedule Is One Small Row Per Game, So It Is Not Streamed Like The PBP Loaders
+    result_df = pl.concat(game_dfs)
 
     return result_df
 
-load_schedule().write_parquet('Data/Schedule/NEW_20232024_Schedule.parquet')
\ No newline at end of file
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point - python LoadSchedule.py --start 2023-10-10 --end 2023-12-25 --path Data/Schedule/NEW_20232024_Schedule.parquet"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load NHL regular season/playoff games between two dates and save them as parquet")
+    parser.add_argument('--start', default='2023-10-10', help="First date (YYYY-MM-DD)")
+    parser.add_argument('--end', default='2023-12-25', help="Last date (YYYY-MM-DD)")
+    parser.add_argument('--path', default='Data/Schedule/NEW_20232024_Schedule.parquet', help="Parquet file to write")
+    args = parser.parse_args(argv)
+
+    load_schedule(args.start, args.end).write_parquet(args.path)
+    print(f"Schedule Saved: {args.start} - {args.end} | Path: {args.path}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -1,17 +1,5 @@
-# Pandas
-import pandas as pd
-pd.set_option('display.max_columns', None)
-pd.set_option('display.max_rows', None)
-import numpy as np
-
 # Polars (Arrow)
-from pyarrow.dataset import dataset
 import polars as pl
-pl.Config.set_tbl_rows(n=-1)
-pl.Config.set_tbl_cols(n=-1)
-
-# Hit API
-import requests
 
 # Tools
 from itertools import chain
@@ -23,33 +11,47 @@ import statistics
 # Save
 import pickle
 import json
+import io
 import os
-import pathlib
 
-# System Stats
-import psutil
-import timeit
+# Pipeline Modules
+from PipelineProfiler import stage, record_http, profile_stage, profiled_run
+from Sorted_Storage import sort_if_needed
+from Parquet_Store import parquet_rows, ParquetGameSink
+from On_Ice import write_on_ice_bridge
+from Payload_Fingerprints import record_payload, save_pending, discard_pending
+
+# pandas And requests Are Only Imported Inside The Loaders That Hit The API - Importing This Module Reads No Files And Makes
+# No Requests (Startup Is Measured By benchmarks/import_time.py)
 
 
 # Path
 roster_file = 'Data/NHL_Rosters_2014_2024.csv'
+_ROSTER_CACHE = {}
 
 # All Players - Connect To event_player_1_id, event_player_2_id, event_player_3_id, event_player_4_id, event_goalie_id, home_goalie, away_goalie
-ROSTER_DF_RAW = pl.read_csv(roster_file)
-
-ROSTER_DF = (
-    ROSTER_DF_RAW
-    .with_columns([
-        pl.col("player_id").cast(pl.Int32),
-        (pl.col("first_name").str.to_uppercase() + '.' + pl.col("last_name").str.to_uppercase()).alias('player_name'),
-        pl.when((pl.col('pos_G') == 1) & (pl.col('hand_R') == 1)).then(pl.lit(1)).otherwise(pl.lit(0)).alias('G_hand_R'),
-        pl.when((pl.col('pos_G') == 1) & (pl.col('hand_L') == 1)).then(pl.lit(1)).otherwise(pl.lit(0)).alias('G_hand_L')
-        ])
-    .select(['player_id', 'player_name', 'hand_R', 'hand_L', 'pos_F', 'pos_D', 'pos_G', 'G_hand_R', 'G_hand_L'])
-    .unique()
-)
+def load_roster(path = roster_file):
+    """This function will read the roster CSV once (on first use) and return ROSTER_DF"""
+    if path not in _ROSTER_CACHE:
+        ROSTER_DF_RAW = pl.read_csv(path)
+        _ROSTER_CACHE[path] = (
+            ROSTER_DF_RAW
+            .with_columns([
+                pl.col("player_id").cast(pl.Int32),
+                (pl.col("first_name").str.to_uppercase() + '.' + pl.col("last_name").str.to_uppercase()).alias('player_name'),
+                pl.when((pl.col('pos_G') == 1) & (pl.col('hand_R') == 1)).then(pl.lit(1)).otherwise(pl.lit(0)).alias('G_hand_R'),
+                pl.when((pl.col('pos_G') == 1) & (pl.col('hand_L') == 1)).then(pl.lit(1)).otherwise(pl.lit(0)).alias('G_hand_L')
+                ])
+            .select(['player_id', 'player_name', 'hand_R', 'hand_L', 'pos_F', 'pos_D', 'pos_G', 'G_hand_R', 'G_hand_L'])
+            .unique()
+        )
+    return _ROSTER_CACHE[path]
 
-#ROSTER_DF.head()
+def __getattr__(name):
+    # ROSTER_DF Is Still A Module Attribute (loader.ROSTER_DF) But The CSV Is Only Read The First Time It Is Used
+    if name == 'ROSTER_DF':
+        return load_roster()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 ### END ROSTER LOAD ###
 
@@ -103,94 +105,114 @@ raw_schema = {
     'playerId': 'str'    
 }
 
+# 1a) Known Keys In Each Play's 'details' (Anything Else Is Reported By decode_pbp_payload)
+known_detail_keys = {
+    'descKey','reason','secondaryReason','shotType', #Event Description
+    'xCoord','yCoord','zoneCode', # Location
+    'homeScore','awayScore','homeSOG','awaySOG', 'scoringPlayerTotal','assist1PlayerTotal','assist2PlayerTotal', # Game Details
+    'eventOwnerTeamId', # Team ID
+    'goalieInNetId','scoringPlayerId','assist1PlayerId','assist2PlayerId','shootingPlayerId','blockingPlayerId', # Player IDs (Shots)
+    'winningPlayerId','losingPlayerId','hittingPlayerId','hitteePlayerId','playerId', # Faceoff/Hit/GiveTakeAway Player IDs
+    'typeCode', 'committedByPlayerId', 'drawnByPlayerId','servedByPlayerId','duration' # Penalty IDs
+}
+
+# 1b) Schema Type Labels To Polars Types
+schema_types = {'str': pl.Utf8, 'i32': pl.Int32, 'f32': pl.Float32}
+
+# 1c) Shift Chart Fields Kept By append_shift_data
+shift_keep_keys = ['id', 'endTime', 'firstName', 'gameId', 'lastName', 'period', 'playerId', 'startTime', 'teamAbbrev', 'teamId', 'duration']
+
 # 2) FUNCTION: Create Connection To NHL API
+@profile_stage('fetch_pbp')
 def ping_nhl_api(i):
-    """This function will get the raw data from the NHL API and normalize 'details'
-    to ensure we collect every detail from each event"""
+    """This function will get the raw data from the NHL API and decode it into one row per event (see decode_pbp_payload)"""
 
     # 1) Create Link For API Endpoint
+    import requests
+
     pbp_link = 'https://api-web.nhle.com/v1/gamecenter/'+str(i)+'/play-by-play'
 
-    # 2) Get Game Data From Response
-    pbp_response = requests.get(pbp_link).json()
-    game_data = pl.DataFrame({
-            'id': pbp_response.get('id'),
-            'season': pbp_response.get('season'),
-            'gameDate': pbp_response.get('gameDate'),
-            'gameType': pbp_response.get('gameType'),
-            'awayTeam.id': pbp_response.get('awayTeam', {}).get('id'),
-            'awayTeam.abbrev': pbp_response.get('awayTeam', {}).get('abbrev'),
-            'homeTeam.id': pbp_response.get('homeTeam', {}).get('id'),
-            'homeTeam.abbrev': pbp_response.get('homeTeam', {}).get('abbrev'),
-            'key': 1
-        })
-    # 3) Get Plays Data (Stored As List)
-    raw_list = pbp_response.get('plays', [])
-
-    # 4) Normalize Details Dictionary
-    ### a) Create Keys To Compare Set
-    keys_to_compare = {
-        'descKey','reason','secondaryReason','shotType', #Event Description
-        'xCoord','yCoord','zoneCode', # Location
-        'homeScore','awayScore','homeSOG','awaySOG', 'scoringPlayerTotal','assist1PlayerTotal','assist2PlayerTotal', # Game Details
-        'eventOwnerTeamId', # Team ID
-        'goalieInNetId','scoringPlayerId','assist1PlayerId','assist2PlayerId','shootingPlayerId','blockingPlayerId', # Player IDs (Shots)
-        'winningPlayerId','losingPlayerId','hittingPlayerId','hitteePlayerId','playerId', # Faceoff/Hit/GiveTakeAway Player IDs
-        'typeCode', 'committedByPlayerId', 'drawnByPlayerId','servedByPlayerId','duration' # Penalty IDs
-    }
-    ### b) Loop Through Rows To Get Complete Details Dictionary 
-    for entry in raw_list:
-        details_dict = entry.get("details", {})
-
-        ##### i) Check For Extra Keys
-        extra_keys = set(details_dict.keys()) - keys_to_compare
-        if extra_keys:
-            print(f"GameID: {i} | Extra keys in details_dict: {extra_keys}")
-        
-        ##### ii) Update Details To Include All Keys
-        entry["details"] = {key: details_dict.get(key, None) for key in keys_to_compare}
-
-    # 5) Build New DataFrame With Full Details
-    plays_raw =  (
-        pl.DataFrame(raw_list)
-        .rename({"typeCode":"eventTypeCode"})
-        .unnest('periodDescriptor')
-        .unnest('details')
-        .rename({"typeCode":"penaltyTypeCode","eventTypeCode":"typeCode"})
-        .with_columns(pl.lit(1).cast(pl.Int64).alias('key'))
+    # 2) Decode Raw Bytes From Response (Fingerprint Kept For Revision Checks - See Payload_Fingerprints.py)
+    response = record_http(requests.get(pbp_link))
+    record_payload(i, 'pbp', response)
+
+    return decode_pbp_payload(response.content, i)
+
+# 2a) FUNCTION: Decode A Raw Play-By-Play Payload Straight Into The Raw Schema
+@profile_stage('parse_pbp')
+def decode_pbp_payload(pbp_response, i, sch = raw_schema):
+    """This function will decode one gamecenter payload (raw bytes, or an already parsed dict) into one typed row per play.
+
+    polars parses the JSON in one pass (no per-play Python loop) and every schema column is pulled out of the
+    game/play/periodDescriptor/details structs and cast in a single select. Missing keys become typed nulls and
+    detail keys outside known_detail_keys are reported from the decoded struct schema, not by checking each play.
+    """
+    if isinstance(pbp_response, dict):
+        pbp_response = json.dumps(pbp_response).encode()
+    game = pl.read_json(io.BytesIO(pbp_response))
+
+    # 1) Fields Present In This Payload (From The Decoded Struct Types)
+    plays_type = game.schema.get('plays')
+    if (plays_type is None) or (not isinstance(getattr(plays_type, 'inner', None), pl.Struct)):
+        return pl.DataFrame(schema={col: schema_types[col_type] for col, col_type in sch.items()})
+    play_fields = {f.name: f.dtype for f in plays_type.inner.fields}
+    period_fields = {f.name for f in play_fields['periodDescriptor'].fields} if 'periodDescriptor' in play_fields else set()
+    detail_fields = {f.name for f in play_fields['details'].fields} if 'details' in play_fields else set()
+
+    extra_keys = detail_fields - known_detail_keys
+    if extra_keys:
+        print(f"GameID: {i} | Extra keys in details_dict: {extra_keys}")
+
+    # 2) One Row Per Play (Game Fields Broadcast By The Explode)
+    game_cols = [c for c in ['id', 'season', 'gameDate', 'gameType', 'awayTeam', 'homeTeam'] if c in game.columns]
+    plays = game.select(game_cols + ['plays']).explode('plays').unnest('plays')
+
+    # 3) Pull Every Schema Column From Its Source (Play -> periodDescriptor -> details -> Game) And Cast Once
+    def source(col):
+        if col in ['awayTeam.id', 'awayTeam.abbrev', 'homeTeam.id', 'homeTeam.abbrev']:
+            team, field = col.split('.')
+            return pl.col(team).struct.field(field) if team in game_cols else pl.lit(None)
+        if col in play_fields:
+            return pl.col(col)
+        if col in period_fields:
+            return pl.col('periodDescriptor').struct.field(col)
+        if (col == 'period') and ('number' in period_fields):
+            return pl.col('periodDescriptor').struct.field('number')
+        if (col in detail_fields) and (col != 'typeCode'):
+            return pl.col('details').struct.field(col)
+        if col in game_cols:
+            return pl.col(col)
+        return pl.lit(None)
+
+    return plays.select([source(col).cast(schema_types[col_type]).alias(col) for col, col_type in sch.items()])
+
+# 2b) FUNCTION: Decode A Raw Shift Chart Payload
+def decode_shift_payload(shift_response):
+    """This function will decode a shiftcharts payload (raw bytes, or an already parsed dict) into one row per shift with shift_keep_keys"""
+    if isinstance(shift_response, dict):
+        shift_response = json.dumps(shift_response).encode()
+    shifts = pl.read_json(io.BytesIO(shift_response))
+
+    data_type = shifts.schema.get('data')
+    if (data_type is None) or (not isinstance(getattr(data_type, 'inner', None), pl.Struct)):
+        return pl.DataFrame()
+    shift_fields = {f.name for f in data_type.inner.fields}
+
+    return (
+        shifts
+        .select(pl.col('data').explode())
+        .unnest('data')
+        .select([pl.col(key) if key in shift_fields else pl.lit(None).alias(key) for key in shift_keep_keys])
     )
-    
-    return_df = game_data.join(plays_raw, on=pl.col("key"), how="inner").drop("key")
-
-    return return_df
 
 # 3) FUNCTION: Normalize Schema
+@profile_stage('align_and_cast_columns')
 def align_and_cast_columns(data, sch):
-    # Identify missing and extra columns
-    missing_cols_int = set(sch.keys()) - set(data.columns)
-    extra_cols_int = set(data.columns) - set(sch.keys())
-    data = data.drop(extra_cols_int)
-
-    # Fill missing columns with null values and cast to the correct type
-    for col in sch.keys():
-
-        col_type = sch.get(col)
-
-        if (col in data.columns) & (col_type == 'str'):
-            data = data.with_columns(pl.col(col).cast(pl.Utf8).alias(col))
-        elif (col in data.columns) & (col_type == 'i32'):
-            data = data.with_columns(pl.col(col).cast(pl.Int32).alias(col))
-        elif (col in data.columns) & (col_type == 'f32'):
-            data = data.with_columns(pl.col(col).cast(pl.Float32).alias(col))
-        elif (col not in data.columns) & (col_type == 'str'):
-            data = data.with_columns(pl.lit(None).cast(pl.Utf8).alias(col))
-        elif (col not in data.columns) & (col_type == 'f32'):
-            data = data.with_columns(pl.lit(None).cast(pl.Float32).alias(col))
-
-    # Select columns and update schema
-    data = data.select(sch.keys())
-
-    return data
+    """This function will drop extra columns, add missing columns as nulls and cast every column to the schema type in one select"""
+    return data.select([
+        (pl.col(col) if col in data.columns else pl.lit(None)).cast(schema_types[col_type]).alias(col)
+        for col, col_type in sch.items()
+    ])
 
 # 4) FUNCTION: String Period Time to Numeric Seconds Function
 def min_to_sec(time_str):
@@ -201,9 +223,20 @@ def min_to_sec(time_str):
     minutes, seconds = map(int, time_str.split(':'))
     return minutes * 60 + seconds
 
+# Windows In reconcile_api_data Never Cross Games (Batch Size Is Only A Performance Knob)
+reconcile_partition = ['season', 'game_id']
+
 # 5) FUNCTION: Reconcile New API Columns/Data To Previous Format + Additional Feature Columns
-def reconcile_api_data(data):
-    """ This Function will take a polars dataframe and reconcile column names, values, and data types to match SDV cleaning functions to save time and effort in building more tweak functions"""
+@profile_stage('reconcile_api_data')
+def reconcile_api_data(data, partition_by = reconcile_partition):
+    """ This Function will take a polars dataframe and reconcile column names, values, and data types to match SDV cleaning functions to save time and effort in building more tweak functions
+
+    Every window/aggregate (situationCode forward fill, flipped_coords x mean) runs over partition_by, so the output for a game
+    is the same whether it is reconciled alone or with any other games (see benchmarks/check_batch_invariance.py).
+    partition_by = None keeps the old whole-frame behaviour, which only matches the per-game loaders when one game is passed """
+
+    def over(expr):
+        return expr if partition_by is None else expr.over(partition_by)
 
     # Create Dictionaries For Column Name/Value Rename
     rename_dict = {
@@ -376,9 +409,9 @@ def reconcile_api_data(data):
     # Parse Situation Code For Home/Away Skaters/EmptyNet
     data = (
         data
-        .sort('season', 'game_id', 'period', 'event_idx')
+        .pipe(sort_if_needed, ['season', 'game_id', 'period', 'event_idx'])
         .with_columns(
-            pl.when(pl.col('situationCode').is_null()).then(pl.col("situationCode").fill_null(strategy="forward")).otherwise(pl.col('situationCode')).alias('situationCode')
+            pl.when(pl.col('situationCode').is_null()).then(over(pl.col("situationCode").fill_null(strategy="forward"))).otherwise(pl.col('situationCode')).alias('situationCode')
         )
         .filter(~pl.col('situationCode').is_in(['0101', '1010']))
         .with_columns([
@@ -397,7 +430,7 @@ def reconcile_api_data(data):
     data = (
         data
         .with_columns([
-            pl.when((pl.col('event_zone') == 'O') & (pl.col('x').mean() > 0)).then(pl.lit(1)).otherwise(pl.lit(-1)).alias('flipped_coords')
+            pl.when((pl.col('event_zone') == 'O') & (over(pl.col('x').mean()) > 0)).then(pl.lit(1)).otherwise(pl.lit(-1)).alias('flipped_coords')
         ])
         .with_columns([
             # Where homeTeamDefendingSide Exists
@@ -489,8 +522,13 @@ def reconcile_api_data(data):
     return data
 
 # 5) FUNCTION: Load and Append Shift Data From NHL API
-def append_shift_data(data):
-    """ This function will load shift data allowing the user to see which players are on the ice at a given time in each game"""
+@profile_stage('append_shift_data')
+def append_shift_data(data, shift_response=None, stint_list=None):
+    """ This function will load shift data allowing the user to see which players are on the ice at a given time in each game
+    shift_response: Optional shiftcharts payload (raw bytes or dict) - skips the API request when passed (e.g. saved benchmark fixtures)
+    stint_list: Optional list - the game's stint table (see build_stint_table) is appended to it and every event gets a stint_id"""
+    import requests
+
     # Load Game ID and Home/Away Ids
     i = data['game_id'][0]
     bad_shift_ids = []
@@ -502,14 +540,15 @@ def append_shift_data(data):
         .unique()
     )
 
-    shift_link = "https://api.nhle.com/stats/rest/en/shiftcharts?cayenneExp=gameId="+str(i)
-    shift_response = requests.get(shift_link).json()
+    if shift_response is None:
+        shift_link = "https://api.nhle.com/stats/rest/en/shiftcharts?cayenneExp=gameId="+str(i)
+        with stage('fetch_shifts'):
+            response = record_http(requests.get(shift_link))
+        record_payload(i, 'shifts', response)
+        shift_response = response.content
 
-    # Assuming "data" is the key containing nested data
-    data_list = shift_response.get('data', [])
-    keep_keys = ['id', 'endTime', 'firstName', 'gameId', 'lastName', 'period', 'playerId', 'startTime', 'teamAbbrev', 'teamId', 'duration']
-    filtered_data = [{key: item[key] for key in keep_keys} for item in data_list]
-    shift_raw = pl.DataFrame(filtered_data)
+    # Decode "data" (One Row Per Shift)
+    shift_raw = decode_shift_payload(shift_response)
     try:
         shift_raw = (
             shift_raw
@@ -573,7 +612,7 @@ def append_shift_data(data):
             ])
             #.unique()
             # Separate Goalies
-            .join(ROSTER_DF.with_columns([
+            .join(load_roster().with_columns([
                 (pl.col('player_id').cast(pl.Utf8).alias('player_id')),
                 (pl.col('pos_G').cast(pl.Int32).alias('pos_G'))
             ])
@@ -742,6 +781,16 @@ def append_shift_data(data):
         # Combine DataFrames
         result_df = data.join(game_data, on = ['game_id', 'period', 'game_seconds', 'period_seconds', 'event_idx'], how = "left")
 
+        # Stint Table + Stint ID For Each Event (Shift Boundaries Are Already Known Here)
+        try:
+            stints = build_stint_table(shift_raw)
+            result_df = assign_stint_ids(result_df, stints)
+            if stint_list is not None:
+                stint_list.append(stints)
+        except Exception as e:
+            print('Stint Table Failed:', i, 'Error:', e)
+            result_df = result_df.with_columns(pl.lit(None).cast(pl.Int64).alias('stint_id'))
+
     except Exception as e:
         print('Bad ID:', i, 'Error:', e)
         bad_shift_ids.append(i)
@@ -762,15 +811,353 @@ def append_shift_data(data):
         # Add null columns to the existing DataFrame
         for column in columns_with_null:
             result_df = result_df.with_columns(pl.lit(None).alias(column))
+        result_df = result_df.with_columns(pl.lit(None).cast(pl.Int64).alias('stint_id'))
         
     
     return result_df
 
+# 5a) FUNCTION: Build On-Ice Stint Table From Cleaned Shifts
+@profile_stage('build_stint_table')
+def build_stint_table(shift_raw):
+    """This function will cut each period at every shift start/end and return one row per uninterrupted on-ice configuration.
+
+    Columns: stint_id (game_id * 1000 + n), game_id, period, start/end seconds (period and game clock), stint_seconds,
+    home/away skaters (sorted, comma separated player ids), home/away goalie (null = pulled), skater counts, strength_state
+    (home v away, same format as reconcile_api_data), and home/away_config_id + start seconds - the run of stints in which
+    that team's five (plus goalie) did not change, used for team shift lengths.
+    """
+    shifts = (
+        shift_raw
+        .select('game_id', 'period', 'team_type', 'player_id', pl.col('pos_G').fill_null(0),
+                'period_start_seconds', 'period_end_seconds')
+        .unique()
+    )
+
+    # 1) Every Shift Start/End Is A Boundary - Consecutive Boundaries Make An Interval
+    bounds = (
+        pl.concat([
+            shifts.select('game_id', 'period', pl.col('period_start_seconds').alias('start_seconds')),
+            shifts.select('game_id', 'period', pl.col('period_end_seconds').alias('start_seconds'))
+        ])
+        .unique()
+        .sort('game_id', 'period', 'start_seconds')
+        .with_columns(pl.col('start_seconds').shift(-1).over(['game_id', 'period']).alias('end_seconds'))
+        .filter(pl.col('end_seconds').is_not_null())
+    )
+
+    # 2) Players On The Ice For The Whole Interval
+    is_home = pl.col('team_type') == 'home'
+    is_away = pl.col('team_type') == 'away'
+    is_goalie = pl.col('pos_G') == 1
+    intervals = (
+        bounds
+        .join(shifts, on=['game_id', 'period'], how='inner')
+        .filter((pl.col('period_start_seconds') <= pl.col('start_seconds')) & (pl.col('period_end_seconds') >= pl.col('end_seconds')))
+        .sort('player_id')
+        .group_by(['game_id', 'period', 'start_seconds', 'end_seconds'])
+        .agg([
+            pl.col('player_id').filter(is_home & ~is_goalie).str.concat(',').alias('home_skaters'),
+            pl.col('player_id').filter(is_away & ~is_goalie).str.concat(',').alias('away_skaters'),
+            pl.col('player_id').filter(is_home & is_goalie).first().alias('home_goalie'),
+            pl.col('player_id').filter(is_away & is_goalie).first().alias('away_goalie'),
+            pl.col('player_id').filter(is_home & ~is_goalie).n_unique().cast(pl.Int32).alias('home_skater_count'),
+            pl.col('player_id').filter(is_away & ~is_goalie).n_unique().cast(pl.Int32).alias('away_skater_count')
+        ])
+        .sort('game_id', 'period', 'start_seconds')
+    )
+
+    # 3) Merge Back-To-Back Intervals With The Same Configuration Into One Stint
+    def new_run(cols):
+        key = pl.concat_str([pl.col(c).cast(pl.Utf8).fill_null('') for c in cols], separator='|')
+        return (
+            (key != key.shift()) | (pl.col('period') != pl.col('period').shift()) | (pl.col('start_seconds') != pl.col('end_seconds').shift())
+        ).fill_null(True)
+
+    config_cols = ['home_skaters', 'away_skaters', 'home_goalie', 'away_goalie']
+    stints = (
+        intervals
+        .with_columns(new_run(config_cols).cum_sum().alias('stint_n'))
+        .group_by(['game_id', 'period', 'stint_n'] + config_cols + ['home_skater_count', 'away_skater_count'])
+        .agg([
+            pl.col('start_seconds').min().alias('start_seconds'),
+            pl.col('end_seconds').max().alias('end_seconds')
+        ])
+        .sort('game_id', 'period', 'start_seconds')
+        .with_columns([
+            new_run(['home_skaters', 'home_goalie']).cum_sum().alias('home_n'),
+            new_run(['away_skaters', 'away_goalie']).cum_sum().alias('away_n')
+        ])
+        .with_columns([
+            (pl.col('game_id').cast(pl.Int64) * 1000 + pl.col('stint_n')).alias('stint_id'),
+            (pl.col('game_id').cast(pl.Int64) * 1000 + pl.col('home_n')).alias('home_config_id'),
+            (pl.col('game_id').cast(pl.Int64) * 1000 + pl.col('away_n')).alias('away_config_id'),
+            (pl.col('start_seconds') + ((pl.col('period') - 1) * 1200)).alias('game_start_seconds'),
+            (pl.col('end_seconds') + ((pl.col('period') - 1) * 1200)).alias('game_end_seconds'),
+            (pl.col('end_seconds') - pl.col('start_seconds')).alias('stint_seconds'),
+            (pl.concat_str([pl.col('home_skater_count'), pl.lit('v'), pl.col('away_skater_count')])).alias('strength_state')
+        ])
+        .with_columns([
+            pl.col('start_seconds').min().over('home_config_id').alias('home_config_start_seconds'),
+            pl.col('start_seconds').min().over('away_config_id').alias('away_config_start_seconds')
+        ])
+        .select('stint_id', 'game_id', 'period', 'start_seconds', 'end_seconds', 'game_start_seconds', 'game_end_seconds', 'stint_seconds',
+                'home_skaters', 'away_skaters', 'home_goalie', 'away_goalie', 'home_skater_count', 'away_skater_count', 'strength_state',
+                'home_config_id', 'away_config_id', 'home_config_start_seconds', 'away_config_start_seconds')
+    )
+
+    return stints
+
+# 5b) FUNCTION: Tag Each Event With The Stint It Happened In
+def assign_stint_ids(data, stints):
+    """This function will add stint_id to every event (latest stint in the same game/period starting at or before the event second)"""
+    events = (
+        data
+        .with_columns(pl.col('period_seconds').cast(pl.Int64).alias('_stint_seconds'))
+        .sort('_stint_seconds')
+    )
+    stint_starts = (
+        stints
+        .select(pl.col('game_id').cast(events.schema['game_id']), pl.col('period').cast(events.schema['period']),
+                pl.col('start_seconds').cast(pl.Int64).alias('_stint_seconds'), 'stint_id')
+        .sort('_stint_seconds')
+    )
+    return (
+        events
+        .join_asof(stint_starts, on='_stint_seconds', by=['game_id', 'period'], strategy='backward')
+        .drop('_stint_seconds')
+        .sort('game_id', 'period', 'event_idx')
+    )
+
+# 5c) FUNCTION: Save A Season's Stint Tables Next To The PBP File
+def write_stint_table(stint_list, season, existing=False):
+    """This function will combine the stint tables collected by append_shift_data and write Data/Stints/API_Stints_{season}.parquet.
+    If existing is True, stints already in the file are kept (games re-loaded here replace their old stints)"""
+    if not stint_list:
+        return None
+    save_stint_path = f"Data/Stints/API_Stints_{season}.parquet"
+    os.makedirs(os.path.dirname(save_stint_path), exist_ok=True)
+    data = pl.concat(stint_list)
+    if existing and os.path.exists(save_stint_path):
+        data = pl.concat([pl.read_parquet(save_stint_path).filter(~pl.col('game_id').is_in(data['game_id'].unique())), data])
+    data = data.sort('game_id', 'period', 'start_seconds')
+    with stage('write_stints', rows_in=data.height, season=season):
+        data.write_parquet(save_stint_path, use_pyarrow=True)
+    return save_stint_path
+
+# 5d) FUNCTION: Durable Backfill Progress Per Season (Data/Checkpoints/{season}/progress.json)
+checkpoint_root = 'Data/Checkpoints'
+
+def load_progress(season):
+    """This function will read a season's backfill progress (games checkpointed, games that failed, season file written)"""
+    path = os.path.join(checkpoint_root, str(season), 'progress.json')
+    if os.path.exists(path):
+        with open(path) as file:
+            return json.load(file)
+    return {'season': season, 'done': [], 'bad': [], 'complete': False}
+
+def save_progress(season, progress):
+    """This function will write progress to a temp file, fsync it and swap it in with os.replace, so a crash leaves either
+    the old or the new progress file and never a partial one"""
+    path = os.path.join(checkpoint_root, str(season), 'progress.json')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    progress['updated_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as file:
+        json.dump(progress, file)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
+
+# 5e) FUNCTION: Persist One Finished Game Before Moving On
+def write_game_checkpoint(season, game_id, data, stint_list):
+    """This function will write the game's events (and stints) to Data/Checkpoints/{season}/ (temp file + os.replace), so
+    a checkpoint file is either absent or complete. Also used by the backfill queue workers (Backfill_Queue.py)"""
+    folder = os.path.join(checkpoint_root, str(season))
+    os.makedirs(folder, exist_ok=True)
+    frames = [('stints', pl.concat(stint_list))] if stint_list else []
+    for name, df in frames + [('pbp', data)]:
+        path = os.path.join(folder, f"{game_id}_{name}.parquet")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        df.write_parquet(tmp_path, use_pyarrow=True)
+        os.replace(tmp_path, path)
+    save_pending([game_id])
+
+def checkpoint_game(season, game_id, data, stint_list, progress):
+    """This function will write the game's checkpoint files and only then mark the game done in progress"""
+    write_game_checkpoint(season, game_id, data, stint_list)
+    progress['done'].append(game_id)
+    save_progress(season, progress)
+
+# 5e2) FUNCTION: Swap Checkpointed Games Into An Existing Season File
+def replace_season_games(season, game_ids):
+    """This function will stream the season file into a new one with game_ids dropped and their checkpointed versions
+    appended, update the stint table and on-ice bridge, then drop the checkpoints. Used to add games that just went final
+    (Game_Finalizer.py) and to swap in revised games (Payload_Fingerprints.py) without reloading anything else"""
+    folder = os.path.join(checkpoint_root, str(season))
+    save_season_path = f"Data/PBP/API_RAW_PBP_Data_{season}.parquet"
+    stint_list = []
+    with ParquetGameSink(save_season_path) as sink:
+        if os.path.exists(save_season_path):
+            sink.write_file(save_season_path, exclude_games=game_ids)
+        for i in game_ids:
+            sink.write(pl.read_parquet(os.path.join(folder, f"{i}_pbp.parquet")))
+            stint_path = os.path.join(folder, f"{i}_stints.parquet")
+            if os.path.exists(stint_path):
+                stint_list.append(pl.read_parquet(stint_path))
+    write_stint_table(stint_list, season, existing=True)
+    write_on_ice_bridge(save_season_path, season)
+    for i in game_ids:
+        for name in ['pbp', 'stints']:
+            path = os.path.join(folder, f"{i}_{name}.parquet")
+            if os.path.exists(path):
+                os.remove(path)
+    print(f"Replaced {len(game_ids)} Games In {season}-{season+1} Season | Path: {save_season_path}")
+    return save_season_path
+
+# 5f) FUNCTION: Read A Season's Checkpointed Games Back One At A Time
+def iter_checkpoints(season, progress):
+    """This function will yield (events, stints or None) for every checkpointed game of a season in game_id order"""
+    folder = os.path.join(checkpoint_root, str(season))
+    for i in sorted(progress['done']):
+        stint_path = os.path.join(folder, f"{i}_stints.parquet")
+        yield pl.read_parquet(os.path.join(folder, f"{i}_pbp.parquet")), (pl.read_parquet(stint_path) if os.path.exists(stint_path) else None)
+
+# 5g) FUNCTION: Load (Or Resume) One Season A Checkpointed Game At A Time
+def load_season_checkpointed(s, szn_ids, shift_len, n_games, resume=True):
+    """This function will load every game in szn_ids that is not already checkpointed, persisting each one as soon as it is
+    done, then write the season file from the checkpoints. A rerun after a crash/outage starts at the first unfinished game
+    and a season already written is read back instead of re-loaded. resume = False starts the season over.
+
+    Returns (rows in the season file, failed game ids, season file path)"""
+    save_season_path = f"Data/PBP/API_RAW_PBP_Data_{s}.parquet"
+    progress = load_progress(s) if resume else {'season': s, 'done': [], 'bad': [], 'complete': False}
+    if progress['complete'] and os.path.exists(save_season_path):
+        print(f"{s}-{s+1} Season Already Saved - Skipping Load | Path: {save_season_path}")
+        return parquet_rows(save_season_path), progress['bad'], save_season_path
+    if progress['complete']:
+        # Season File Gone After Its Checkpoints Were Dropped - Nothing To Resume From, Load The Season Again
+        print(f"{s}-{s+1} Season Marked Complete But Its File Is Missing - Reloading Every Game | Path: {save_season_path}")
+        progress = {'season': s, 'done': [], 'bad': [], 'complete': False}
+
+    done = set(progress['done'])
+    remaining = [i for i in szn_ids if i not in done]
+    if done:
+        print(f"Resuming {s}-{s+1} Season: {len(done)} Games Checkpointed | {len(remaining)} Games Remaining | Path: {os.path.join(checkpoint_root, str(s))}")
+
+    # Games That Failed Last Time Are Retried
+    progress['bad'] = []
+    for i in remaining:
+        shift_start = time.time()
+        # Create Try For Bad Links
+        try:
+            game_stints = []
+            with stage('game', game_id=i, season=s) as rec:
+                # Get Raw Data
+                result_df = ping_nhl_api(i = i)
+
+                # All Functions
+                result_df = append_shift_data(reconcile_api_data(align_and_cast_columns(data = result_df, sch = raw_schema)), stint_list = game_stints)
+                rec['rows_out'] = result_df.height
+
+            # Persist Game Before The Next One Is Requested
+            with stage('checkpoint_game', rows_in=result_df.height, game_id=i, season=s):
+                checkpoint_game(s, i, result_df, game_stints, progress)
+
+        except ValueError as e:
+            progress['bad'].append(i)
+            save_progress(s, progress)
+            discard_pending([i])
+            print(f"Error In Loading NHL API for GameID: {i} | {e}")
+            continue
+
+        # Print Intermitent Update
+        shift_end = time.time()
+        shift_elap = shift_end - shift_start
+        shift_len.append(shift_elap)
+        average_shift_time = statistics.mean(shift_len)
+        hour_pace = ((average_shift_time*n_games)/3600)
+
+        if str(i)[-3:] == "500":
+            print(f"500 GAME UPDATE: Game {i} took {round(shift_elap,2)} | Each game is taking ~{round(average_shift_time,2)} Seconds | For {n_games} Games It will Take {round(hour_pace,2)} Hours")
+
+    # Stream Checkpointed Games Into The Season File One At A Time (PBP_ORDER, Game-Aligned zstd Row Groups - See Parquet_Store.py)
+    stint_list = []
+    with stage('write_season', season=s) as rec:
+        with ParquetGameSink(save_season_path) as sink:
+            for game_df, game_stints in iter_checkpoints(s, progress):
+                sink.write(game_df)
+                if game_stints is not None:
+                    stint_list.append(game_stints)
+        rec['rows_out'] = sink.rows
+    if sink.rows == 0:
+        print(f"No Games Loaded For {s}-{s+1} Season")
+        return 0, progress['bad'], save_season_path
+    write_stint_table(stint_list, s)
+    with stage('write_on_ice', season=s):
+        write_on_ice_bridge(save_season_path, s)
+
+    # Mark Season Complete, Then Drop The Per-Game Files
+    progress['complete'] = True
+    save_progress(s, progress)
+    for i in progress['done']:
+        for name in ['pbp', 'stints']:
+            path = os.path.join(checkpoint_root, str(s), f"{i}_{name}.parquet")
+            if os.path.exists(path):
+                os.remove(path)
+    return sink.rows, progress['bad'], save_season_path
+
+# 5h) FUNCTION: Stream New Games Into A Season File (Stints, On-Ice Bridge And Fingerprints Included)
+def stream_new_games(save_season_path, season, game_ids):
+    """This function will stream the season file (minus any game_ids being re-loaded) into a new one and append each game
+    fetched, cleaned and shift-joined here (PBP_ORDER, game-aligned zstd row groups - see Parquet_Store.py), then update the
+    season's stint table and on-ice bridge and store the payload fingerprints of the games written (games that failed are
+    dropped from the pending fingerprints). Shared by update_pbp_file and load_games(existing=True).
+    Returns (rows loaded, game ids written)"""
+    stint_list = []
+    rows_loaded, loaded_ids = 0, []
+    if not game_ids:
+        return rows_loaded, loaded_ids
+
+    with ParquetGameSink(save_season_path) as sink:
+        if os.path.exists(save_season_path):
+            sink.write_file(save_season_path, exclude_games=game_ids)
+        for i in game_ids:
+            try:
+                with stage('game', game_id=i, season=season) as rec:
+                    # Get Raw Data
+                    result_df = ping_nhl_api(i = i)
+                    # Loand And Clean
+                    result_df = append_shift_data(reconcile_api_data(align_and_cast_columns(data = result_df, sch = raw_schema)), stint_list = stint_list)
+                    rec['rows_out'] = result_df.height
+                # Write Game
+                sink.write(result_df)
+                rows_loaded += result_df.height
+                loaded_ids.append(i)
+
+            except ValueError as e:
+                print(f"Error In Loading NHL API for GameID: {i} | {e}")
+                continue
+    write_stint_table(stint_list, season, existing=True)
+    # Fingerprints Only For Games In The File (A Game Whose Shifts Failed Was Never Written)
+    save_pending(loaded_ids)
+    discard_pending(set(game_ids) - set(loaded_ids))
+    with stage('write_on_ice', season=season):
+        write_on_ice_bridge(save_season_path, season)
+    return rows_loaded, loaded_ids
+
 # 6) FUNCTION: Load, Clean, and Union Games Given Season - Saves as Local File (Parquet Format)
-def load_games(load_path = 'Data/PBP/API_RAW_PBP_Data_2023.parquet', season_start = 2012, season_end = 2024 , existing=False):
+@profiled_run("load_games_{season_start}_{season_end}")
+def load_games(load_path = 'Data/PBP/API_RAW_PBP_Data_2023.parquet', season_start = 2012, season_end = 2024 , existing=False, profile=False, sample_game=None, resume=True):
     """This function will load all game play by play data using the functions above to clean the raw API Data from the NHL.
     
-    If Existing is True, the function will only load games that are not in the most current PBP_RAW Parquet File"""
+    If Existing is True, the function will only load games that are not in the most current PBP_RAW Parquet File and stream them
+    into load_path with their stints, on-ice bridge and payload fingerprints (same steps as update_pbp_file, see stream_new_games)
+    If Profile is True, every stage (fetch, align, reconcile, shifts, write) is recorded to the pipeline run log (see PipelineProfiler.py)
+    sample_game is an optional game_id to run under a sampling profiler while profiling
+    Each game is checkpointed to Data/Checkpoints/{season} as soon as it loads; resume = False ignores earlier progress (see load_season_checkpointed)"""
+    import pandas as pd
+    import requests
+
     # Get Dates
     max_date_file = open('last_load_date.json', 'r+')
     max_date= json.load(max_date_file)['max_date']
@@ -797,74 +1184,27 @@ def load_games(load_path = 'Data/PBP/API_RAW_PBP_Data_2023.parquet', season_star
                 if i.get('gameType') in [2,3]:
                     f_g_id.append(i.get('id'))
 
-        # Initialize Data Frame List To Store Loaded Data Frames
-        df_list = []
-        
-        for i in f_g_id:
-            pbp_link = 'https://api-web.nhle.com/v1/gamecenter/'+str(i)+'/play-by-play'
-
-            pbp_response = requests.get(pbp_link).json()
-            
-            # PLAYS DATA
-            try:
-                game_data = pl.DataFrame({
-                    'id': pbp_response.get('id'),
-                    'season': pbp_response.get('season'),
-                    'gameDate': pbp_response.get('gameDate'),
-                    'gameType': pbp_response.get('gameType'),
-                    'awayTeam.id': pbp_response.get('awayTeam', {}).get('id'),
-                    'awayTeam.abbrev': pbp_response.get('awayTeam', {}).get('abbrev'),
-                    'homeTeam.id': pbp_response.get('homeTeam', {}).get('id'),
-                    'homeTeam.abbrev': pbp_response.get('homeTeam', {}).get('abbrev'),
-                    'key': 1
-                })
-                plays_data_list = pbp_response.get('plays', [])
-                plays_raw = (
-                    pl.DataFrame(plays_data_list)
-                    .rename({"typeCode":"eventTypeCode"})
-                    .unnest('details')
-                    .unnest('periodDescriptor')
-                    .rename({"typeCode":"penaltyTypeCode",
-                             "eventTypeCode":"typeCode"})
-                    .with_columns(pl.lit(1).cast(pl.Int64).alias('key'))
-                )
-                result_df = game_data.join(plays_raw, on=pl.col("key"), how="inner").drop("key")
-
-                # APPEND TO DF LIST FOR UNION
-                result_df = append_shift_data(reconcile_api_data(align_and_cast_columns(data = result_df, sch = raw_schema)))
-                df_list.append(result_df)
-
-            except Exception as e:
-                print(i, e)
-                continue
-        
-        for df in df_list:
-            data = data.vstack(df)
-            
-        data = data.sort('season', 'game_id', 'event_idx')
-
-        
-        max_date_new = data['game_date'].max()
+        # Existing Games (Minus Any Being Re-Loaded) Then Each New Game Go Straight To The Writer - Same Steps As update_pbp_file
+        season = int(f_g_id[0]) // 1000000 if f_g_id else None
+        rows_loaded, loaded_ids = stream_new_games(load_path, season, f_g_id)
+        new_dates = pl.read_parquet(load_path, columns=['game_id', 'game_date']).filter(pl.col('game_id').is_in(loaded_ids))['game_date'] if loaded_ids else pl.Series([], dtype=pl.Utf8)
 
         # Print Eval Statements
         end_time = time.time()
         elap_time = round(((end_time - start_time)/60),2)
-        rows_loaded = data.filter(pl.col('game_id').is_in(f_g_id)).height
-        start_date = data['game_date'].min()
-        
-        # COmbine With Existing
-        data = pl.read_parquet('Data/PBP/API_RAW_PBP_Data_2023.parquet').vstack(data)
-        
-        print("Successfully Loaded",str(rows_loaded),"Rows from", str(n_games), "played between", str(start_date), "-", str(end_date), "in", str(elap_time), "Minutes")
+        start_date = new_dates.min() if len(new_dates) else None
+        max_date_new = new_dates.max() if len(new_dates) else max_date
+
+        print("Successfully Loaded",str(rows_loaded),"Rows from", str(len(f_g_id)), "played between", str(start_date), "-", str(end_date), "in", str(elap_time), "Minutes")
 
         # Save
-        g_ids = data['game_id'].unique().to_list()
+        g_ids = pl.read_parquet(load_path, columns=['game_id'])['game_id'].unique().to_list()
         with open('game_ids.pkl', 'wb') as file:
             pickle.dump(g_ids, file)
         
         json.dump({"max_date": max_date_new}, open('last_load_date.json', 'w+'))
 
-        return data
+        return pl.scan_parquet(load_path)
     
     elif(existing==False):
         ##### BEGIN GAME ID LOAD #####
@@ -916,49 +1256,11 @@ def load_games(load_path = 'Data/PBP/API_RAW_PBP_Data_2023.parquet', season_star
         for s in season_range:
             season_start_time = time.time()
             szn_ids = [game_id for game_id in game_ids if str(game_id).startswith(str(s))]
-            szn_df_list = []
-            szn_bad_ids = []
-            
-            for i in szn_ids:
-                shift_start = time.time()
-                # Create Try For Bad Links
-                try:
-                    # Get Raw Data
-                    result_df = ping_nhl_api(i = i)
-
-                    # All Functions
-                    result_df = append_shift_data(reconcile_api_data(align_and_cast_columns(data = result_df, sch = raw_schema)))
-
-                    # Append Single Game Data To List For Union
-                    szn_df_list.append(result_df)
-
-                except ValueError as e:
-                    szn_bad_ids.append(i)
-                    print(f"Error In Loading NHL API for GameID: {i} | {e}")
-                    continue
-                
-                # Print Intermitent Update
-                shift_end = time.time()
-                shift_elap = shift_end - shift_start
-                shift_len.append(shift_elap)
-                average_shift_time = statistics.mean(shift_len)
-                hour_pace = ((average_shift_time*n_games)/3600)
-
-                if str(i)[-3:] == "500":
-                    print(f"500 GAME UPDATE: Game {i} took {round(shift_elap,2)} | Each game is taking ~{round(average_shift_time,2)} Seconds | For {n_games} Games It will Take {round(hour_pace,2)} Hours")
-                
-            # Combine Season DataFrame Into Full DF List
-            data = szn_df_list[0]
-            for df in szn_df_list[1:]:
-                data = data.vstack(df)
-            data = data.sort('game_id', 'period', 'event_idx')
-
-            # Save File After Combination
-            save_season_path = f"Data/PBP/API_RAW_PBP_Data_{s}.parquet"
-            data.write_parquet(
-                save_season_path,
-                use_pyarrow=True
-            )
+            # Load (Or Resume) The Season - Every Game Is Checkpointed As Soon As It Is Done
+            season_rows, szn_bad_ids, save_season_path = load_season_checkpointed(s, szn_ids, shift_len, n_games, resume=resume)
+            bad_ids.append(szn_bad_ids)
+            if not season_rows:
+                continue
 
             # Print Season Metrics
             season_lab = f"{s}-{s+1}"
@@ -979,7 +1281,7 @@ def load_games(load_path = 'Data/PBP/API_RAW_PBP_Data_2023.parquet', season_star
             # Save Final Load Dates and Items
             if s == 2023:
                 # Save And Print Last Load Date
-                max_date_new = data['game_date'].max()
+                max_date_new = pl.read_parquet(save_season_path, columns=['game_date'])['game_date'].max()
                 json.dump({"max_date": max_date_new}, open('last_load_date.json', 'w+'))
 
                 # Save Bad IDs for Filter In Future Use
@@ -993,22 +1295,23 @@ def load_games(load_path = 'Data/PBP/API_RAW_PBP_Data_2023.parquet', season_star
 
 
 ## LOADING GAMES ##
-        
-# 1) Load All Games:
-load_games(load_path='Data/PBP/API_RAW_PBP_Data.parquet', existing=False, season_start=2011, season_end = 2020)
 
-# 2) Update Current PBP
-def update_pbp_file(current_season = 2023):
+# 1) Update Current PBP
+@profiled_run("update_pbp_file_{current_season}")
+def update_pbp_file(current_season = 2023, profile=False):
     "This function will update the current season PBP with games occuring between the last load and yesterday's date"
+    import pandas as pd
+    import requests
+
     start_time = time.time()
-    # Initialize Existing Data Frame + Stats
-    df_list = []
-    df_list.append(pl.read_parquet(f'Data/PBP/API_RAW_PBP_Data_{current_season}.parquet'))
-    exist_games = len(df_list[0]['game_id'].unique())
-    exist_rows = df_list[0].height
+    # Existing Stats From Two Columns Only (The Season File Is Streamed Into The New One Below, Never Held In Memory)
+    exist_path = f'Data/PBP/API_RAW_PBP_Data_{current_season}.parquet'
+    exist_df = pl.read_parquet(exist_path, columns=['game_id', 'game_date'])
+    exist_games = exist_df['game_id'].n_unique()
+    exist_rows = exist_df.height
 
     # Initialize Load Dates
-    last_load = (datetime.strptime(df_list[0]['game_date'].max(), "%Y-%m-%d") + timedelta(days = 1)).strftime('%Y%m%d')
+    last_load = (datetime.strptime(exist_df['game_date'].max(), "%Y-%m-%d") + timedelta(days = 1)).strftime('%Y%m%d')
     yday = datetime.today() - timedelta(days=1)
     end_date = yday.strftime('%Y%m%d')
     load_dates = pd.date_range(start=last_load, end=end_date, freq='D')
@@ -1027,42 +1330,24 @@ def update_pbp_file(current_season = 2023):
 
     print(f"Now Loading {len(f_g_id)} New Games From {last_load} to {end_date}")
 
-    for i in f_g_id:
-        try:
-            # Get Raw Data
-            result_df = ping_nhl_api(i = i)
-            # Loand And Clean
-            result_df = append_shift_data(reconcile_api_data(align_and_cast_columns(data = result_df, sch = raw_schema)))
-            # APPEND TO DF LIST FOR UNION
-            df_list.append(result_df)
-
-        except ValueError as e:
-            print(f"Error In Loading NHL API for GameID: {i} | {e}")
-            continue
-
-    data = df_list[0]
-    for df in df_list[1:]:
-        data = data.vstack(df)
-
-    data = data.sort('season', 'game_id', 'period', 'event_idx').unique()
-        
-    # Save File After Combination
-    save_season_path = f"Data/PBP/API_RAW_PBP_Data_{current_season}.parquet"
-    data.write_parquet(
-        save_season_path,
-        use_pyarrow=True
-    )
+    # Existing Games (Minus Any Being Re-Loaded) Then Each New Game Go Straight To The Writer + Stints, On-Ice Bridge And Fingerprints
+    save_season_path = exist_path
+    rows_loaded, _ = stream_new_games(save_season_path, current_season, f_g_id)
 
     # Print Eval Statements
     end_time = time.time()
     elap_time = round(((end_time - start_time)/60),2)
-    rows_loaded = data.filter(pl.col('game_id').is_in(f_g_id)).height
 
     print("Successfully Loaded",str(rows_loaded),"Rows from", str(len(f_g_id)), "Games played between", str(last_load), "-", str(end_date), "in", str(elap_time), "Minutes")
 
-    return data
+    return pl.scan_parquet(save_season_path)
+
+# 2) Load All Seasons (One File Per Season)
+@profiled_run("load_all_games_{season_start}_{season_end}")
+def load_all_games(load_path = 'Data/PBP/API_RAW_PBP_Data_', season_start = 2012, season_end = 2024, profile=False, sample_game=None, resume=True):
+    import pandas as pd
+    import requests
 
-def load_all_games(load_path = 'Data/PBP/API_RAW_PBP_Data_', season_start = 2012, season_end = 2024):
     ##### BEGIN GAME ID LOAD #####
     max_date_file = open('last_load_date.json', 'r+')
     max_date= json.load(max_date_file)['max_date']
@@ -1113,48 +1398,11 @@ def load_all_games(load_path = 'Data/PBP/API_RAW_PBP_Data_', season_start = 2012
     for s in season_range:
         season_start_time = time.time()
         szn_ids = [game_id for game_id in game_ids if str(game_id).startswith(str(s))]
-        szn_df_list = []
-        szn_bad_ids = []
-        
-        for i in szn_ids:
-            shift_start = time.time()
-            # Create Try For Bad Links
-            try:
-                # Get Raw Data
-                result_df = ping_nhl_api(i = i)
-                # All Functions
-                result_df = append_shift_data(reconcile_api_data(align_and_cast_columns(data = result_df, sch = raw_schema)))
-
-                # Append Single Game Data To List For Union
-                szn_df_list.append(result_df)
-
-            except ValueError as e:
-                szn_bad_ids.append(i)
-                print(f"Error In Loading NHL API for GameID: {i} | {e}")
-                continue
-                
-            # Print Intermitent Update
-            shift_end = time.time()
-            shift_elap = shift_end - shift_start
-            shift_len.append(shift_elap)
-            average_shift_time = statistics.mean(shift_len)
-            hour_pace = ((average_shift_time*n_games)/3600)
-
-            if str(i)[-3:] == "500":
-                print(f"500 GAME UPDATE: Game {i} took {round(shift_elap,2)} | Each game is taking ~{round(average_shift_time,2)} Seconds | For {n_games} Games It will Take {round(hour_pace,2)} Hours")
-
-        # Combine Season DataFrame Into Full DF List
-        data = szn_df_list[0]
-        for df in szn_df_list[1:]:
-            data = data.vstack(df)
-        data = data.sort('game_id', 'period', 'event_idx')
-
-        # Save File After Combination
-        save_season_path = f"Data/PBP/API_RAW_PBP_Data_{s}.parquet"
-        data.write_parquet(
-            save_season_path,
-            use_pyarrow=True
-        )
+        # Load (Or Resume) The Season - Every Game Is Checkpointed As Soon As It Is Done
+        season_rows, szn_bad_ids, save_season_path = load_season_checkpointed(s, szn_ids, shift_len, n_games, resume=resume)
+        bad_ids.append(szn_bad_ids)
+        if not season_rows:
+            continue
 
         # Print Season Metrics
         season_lab = f"{s}-{s+1}"
@@ -1174,7 +1422,7 @@ def load_all_games(load_path = 'Data/PBP/API_RAW_PBP_Data_', season_start = 2012
     # Save Final Load Dates and Items
         if s == 2023:
             # Save And Print Last Load Date
-            max_date_new = data['game_date'].max()
+            max_date_new = pl.read_parquet(save_season_path, columns=['game_date'])['game_date'].max()
             json.dump({"max_date": max_date_new}, open('last_load_date.json', 'w+'))
 
             # Save Bad IDs for Filter In Future Use
@@ -1184,4 +1432,52 @@ def load_all_games(load_path = 'Data/PBP/API_RAW_PBP_Data_', season_start = 2012
             print(len(sv_bad_ids), "Bad IDs - Failed To Load - No Data")
             print("Bad IDs:", sv_bad_ids)
 #PBP_23 = update_pbp_file()
-#PBP_23.sort('game_id', descending=True).head()
\ No newline at end of file
+#PBP_23.sort('game_id', descending=True).head()
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point - nothing loads on import, a job only runs when this module is run as a script.
+
+    python Load_All_PBP.py load --season-start 2011 --season-end 2020      (load_games, one file)
+    python Load_All_PBP.py update --season 2023                            (update_pbp_file)
+    python Load_All_PBP.py all --season-start 2012 --season-end 2024       (load_all_games, one file per season)
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load NHL play by play data from the NHL API into Data/PBP")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_load = sub.add_parser('load', help="Load a range of seasons into one file (load_games)")
+    p_load.add_argument('--path', default='Data/PBP/API_RAW_PBP_Data.parquet', help="File to write")
+    p_load.add_argument('--season-start', type=int, default=2011)
+    p_load.add_argument('--season-end', type=int, default=2020)
+    p_load.add_argument('--existing', action='store_true', help="Only load games newer than the last load (last_load_date.json)")
+
+    p_update = sub.add_parser('update', help="Add games since the last load to the current season file (update_pbp_file)")
+    p_update.add_argument('--season', type=int, default=2023, help="Starting year of the current season")
+
+    p_all = sub.add_parser('all', help="Load every season into its own file (load_all_games)")
+    p_all.add_argument('--path', default='Data/PBP/API_RAW_PBP_Data_', help="File prefix (the season is appended)")
+    p_all.add_argument('--season-start', type=int, default=2012)
+    p_all.add_argument('--season-end', type=int, default=2024)
+
+    for p in [p_load, p_update, p_all]:
+        p.add_argument('--profile', action='store_true', help="Record every stage to the pipeline run log")
+    for p in [p_load, p_all]:
+        p.add_argument('--sample-game', type=int, default=None, help="game_id to run under a sampling profiler (with --profile)")
+        p.add_argument('--no-resume', action='store_true', help="Ignore checkpointed progress and reload every game")
+    args = parser.parse_args(argv)
+
+    if args.command == 'load':
+        load_games(load_path=args.path, season_start=args.season_start, season_end=args.season_end, existing=args.existing,
+                   profile=args.profile, sample_game=args.sample_game, resume=not args.no_resume)
+    elif args.command == 'update':
+        update_pbp_file(current_season=args.season, profile=args.profile)
+    else:
+        load_all_games(load_path=args.path, season_start=args.season_start, season_end=args.season_end,
+                       profile=args.profile, sample_game=args.sample_game, resume=not args.no_resume)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# Polars (Arrow)
+import polars as pl
+import pyarrow.parquet as pq
+
+# Tools
+import json
+import os
+
+# Parquet Layout
+from Sorted_Storage import sort_meta_key, sort_if_needed
+from Parquet_Store import game_row_groups, PBP_WRITE_PROFILE
+
+
+### ON-ICE BRIDGE - DEFINE ###
+
+# Path (One File Per Season, Next To Data/PBP And Data/Stints)
+on_ice_dir = 'Data/OnIce'
+
+# Event Key (Same As The Season File Order)
+event_keys = ['season', 'game_id', 'period', 'event_idx']
+
+# Bridge Order - Player First, So Every Player's Events Are One Contiguous Range
+ON_ICE_ORDER = ['player_id'] + event_keys
+
+# Target Rows Per Row Group (Groups Only Break Between Players, So A Lookup Reads One Or Two Groups)
+ON_ICE_ROW_GROUP_ROWS = 50_000
+
+# Wide Columns Written By append_shift_data (Slot 0 = Goalie, 1-6 = Skaters)
+SIDES = ['home', 'away']
+SKATER_SLOTS = [1, 2, 3, 4, 5, 6]
+
+def wide_id_col(side, slot):
+    return f"{side}_goalie" if slot == 0 else f"{side}_{slot}_on_id"
+
+def wide_name_col(side, slot):
+    return f"{side}_goalie_name" if slot == 0 else f"{side}_{slot}_on_name"
+
+# 1) FUNCTION: Wide On-Ice Columns -> One Row Per (Event, Player)
+def build_on_ice_bridge(data):
+    """This function will unpivot the 14 wide on-ice id columns into (event key, player_id, team_side, slot, is_goalie), one row
+    per player on the ice (nulls dropped), sorted by player_id then event. Returns (bridge, players) where players is the
+    distinct player_id -> player_name table the wide _name columns repeat on every event"""
+    side_enum = pl.Enum(SIDES)
+    parts, names = [], []
+    for side in SIDES:
+        for slot in [0] + SKATER_SLOTS:
+            id_col, name_col = wide_id_col(side, slot), wide_name_col(side, slot)
+            if id_col not in data.columns:
+                continue
+            player_id = pl.col(id_col).cast(pl.Utf8).str.strip_chars().cast(pl.Int64, strict=False).alias('player_id')
+            parts.append(
+                data
+                .select(event_keys + [player_id])
+                .filter(pl.col('player_id').is_not_null())
+                .with_columns([
+                    pl.lit(side).cast(side_enum).alias('team_side'),
+                    pl.lit(slot).cast(pl.Int8).alias('slot'),
+                    pl.lit(slot == 0).alias('is_goalie')
+                ])
+            )
+            if name_col in data.columns:
+                names.append(data.select([player_id, pl.col(name_col).cast(pl.Utf8).alias('player_name')]).filter(pl.col('player_id').is_not_null()))
+
+    bridge = pl.concat(parts).sort(ON_ICE_ORDER) if parts else None
+    players = pl.concat(names).unique('player_id').sort('player_id') if names else None
+    return bridge, players
+
+# 2) FUNCTION: Write A Season's Bridge From Its Season File
+def write_on_ice_bridge(season_path, season, save_dir=on_ice_dir, target_rows=ON_ICE_ROW_GROUP_ROWS):
+    """This function will read only the key + on-ice columns of a season file, build the bridge and write
+    Data/OnIce/API_OnIce_{season}.parquet (player-aligned row groups, statistics + page index, order in the schema metadata)
+    and Data/OnIce/API_OnIce_Players_{season}.parquet (player names). Returns the bridge path"""
+    wide_cols = [f(side, slot) for side in SIDES for slot in [0] + SKATER_SLOTS for f in [wide_id_col, wide_name_col]]
+    schema = pq.read_schema(season_path).names
+    bridge, players = build_on_ice_bridge(pl.read_parquet(season_path, columns=event_keys + [c for c in wide_cols if c in schema], use_pyarrow=True))
+    if bridge is None:
+        return None
+
+    save_path = os.path.join(save_dir, f"API_OnIce_{season}.parquet")
+    os.makedirs(save_dir, exist_ok=True)
+    table = bridge.to_arrow()
+    metadata = dict(table.schema.metadata or {})
+    metadata[sort_meta_key] = json.dumps(ON_ICE_ORDER).encode()
+    table = table.replace_schema_metadata(metadata)
+    with pq.ParquetWriter(save_path, table.schema, **PBP_WRITE_PROFILE) as writer:
+        for offset, length in game_row_groups(bridge, target_rows, game_col='player_id'):
+            writer.write_table(table.slice(offset, length), row_group_size=length)
+    if players is not None:
+        players.write_parquet(os.path.join(save_dir, f"API_OnIce_Players_{season}.parquet"), use_pyarrow=True)
+
+    print(f"On-Ice Bridge {season}: {bridge.height} Rows | {bridge['player_id'].n_unique()} Players | Path: {save_path}")
+    return save_path
+
+### END ON-ICE BRIDGE ###
+
+### ON-ICE QUERIES - DEFINE ###
+
+def on_ice_paths(seasons, save_dir=on_ice_dir):
+    return [p for p in [os.path.join(save_dir, f"API_OnIce_{s}.parquet") for s in seasons] if os.path.exists(p)]
+
+# 3) FUNCTION: Every Event A Player Was On The Ice For (Range Lookup)
+def on_ice_events(player_ids, seasons, team_side=None, include_goalies=True, save_dir=on_ice_dir):
+    """This function will return bridge rows for player_ids (int or list) across seasons. Files are sorted by player_id with
+    player-aligned row groups, so the is_between predicate skips every row group (and page) outside the players' range"""
+    player_ids = [player_ids] if isinstance(player_ids, int) else list(player_ids)
+    lazy = (
+        pl.scan_parquet(on_ice_paths(seasons, save_dir))
+        .filter(pl.col('player_id').is_between(min(player_ids), max(player_ids)) & pl.col('player_id').is_in(player_ids))
+    )
+    if team_side is not None:
+        lazy = lazy.filter(pl.col('team_side') == team_side)
+    if not include_goalies:
+        lazy = lazy.filter(~pl.col('is_goalie'))
+    return lazy.collect()
+
+# 4) FUNCTION: With / Without - Events For Player A Split By Whether Player B Shared The Ice
+def with_without(player_a, player_b, seasons, save_dir=on_ice_dir):
+    """This function will return player_a's on-ice events with a with_b flag (True when player_b was on the ice for the
+    same side). Two range lookups and one join - join the result to shots on the event key for WOWY xG splits"""
+    events = on_ice_events([player_a, player_b], seasons, save_dir=save_dir)
+    a = events.filter(pl.col('player_id') == player_a).drop('player_id')
+    b = events.filter(pl.col('player_id') == player_b).select(event_keys + ['team_side']).with_columns(pl.lit(True).alias('with_b'))
+    return a.join(b, on=event_keys + ['team_side'], how='left').with_columns(pl.col('with_b').fill_null(False)).pipe(sort_if_needed, event_keys)
+
+# 5) FUNCTION: Rebuild The Wide Columns On Demand
+def rebuild_wide(bridge, players=None):
+    """This function will pivot bridge rows back to the wide layout (home_goalie, home_1_on_id ... away_6_on_id as strings,
+    plus the _name columns when a players table is passed), one row per event key"""
+    data = bridge
+    if players is not None:
+        data = data.join(players, on='player_id', how='left')
+    wide = data.select(event_keys).unique().pipe(sort_if_needed, event_keys)
+    for side in SIDES:
+        for slot in [0] + SKATER_SLOTS:
+            cols = [pl.col('player_id').cast(pl.Utf8).alias(wide_id_col(side, slot))]
+            if players is not None:
+                cols.append(pl.col('player_name').alias(wide_name_col(side, slot)))
+            wide = wide.join(
+                data.filter((pl.col('team_side') == side) & (pl.col('slot') == slot)).select(event_keys + cols),
+                on=event_keys, how='left'
+            )
+    return wide
+
+### END ON-ICE QUERIES ###
@@ -0,0 +1,263 @@
+# Polars (Arrow)
+import polars as pl
+import pyarrow.parquet as pq
+
+# Tools
+import json
+import os
+
+# Sort-Once Storage
+from Sorted_Storage import PBP_ORDER, sort_meta_key, sort_if_needed
+
+
+### PARQUET LAYOUT - DEFINE ###
+
+# Path
+pbp_dir = 'Data/PBP'
+
+# Writer Profile - zstd + Dictionary Pages, Column Statistics And A Page Index So Readers Can Skip Row Groups/Pages
+PBP_WRITE_PROFILE = {
+    'compression': 'zstd',
+    'compression_level': 6,
+    'use_dictionary': True,
+    'write_statistics': True,
+    'write_page_index': True,
+    'data_page_size': 1 << 20
+}
+
+# Target Rows Per Row Group (~250 Games). Row Groups Only Break Between Games, So No Game Spans Two Groups
+ROW_GROUP_ROWS = 100_000
+
+# 1) FUNCTION: Row Group Boundaries That Never Split A Game
+def game_row_groups(data, target_rows=ROW_GROUP_ROWS, game_col='game_id'):
+    """This function will return (offset, length) slices of data (already in game order) that close a row group at the
+    first game boundary once target_rows is reached"""
+    game_sizes = data.get_column(game_col).rle().struct.unnest().to_series(0).to_list() if data.height else []
+    groups, start, rows = [], 0, 0
+    for size in game_sizes:
+        rows += size
+        if rows >= target_rows:
+            groups.append((start, rows))
+            start, rows = start + rows, 0
+    if rows:
+        groups.append((start, rows))
+    return groups
+
+# 2) FUNCTION: Write A Season File With Game-Aligned Row Groups
+def write_pbp_parquet(data, path, order=PBP_ORDER, target_rows=ROW_GROUP_ROWS, profile=PBP_WRITE_PROFILE):
+    """This function will put data in order (sorting only if needed) and write one row group per run of whole games with the
+    writer profile. The sort order is recorded in the schema metadata the same way as write_sorted_parquet"""
+    data = sort_if_needed(data, order)
+    table = data.to_arrow()
+    metadata = dict(table.schema.metadata or {})
+    metadata[sort_meta_key] = json.dumps(list(order)).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with pq.ParquetWriter(path, table.schema, **profile) as writer:
+        for offset, length in game_row_groups(data, target_rows):
+            writer.write_table(table.slice(offset, length), row_group_size=length)
+    return data
+
+# 3) FUNCTION: Row Group Layout Of A Stored File (Rows, Game Range, Compressed Bytes)
+def row_group_summary(path, game_col='game_id'):
+    """This function will read only the parquet footer and return one row per row group with its game_id min/max from the statistics"""
+    meta = pq.ParquetFile(path).metadata
+    col_idx = meta.schema.names.index(game_col)
+    rows = []
+    for n in range(meta.num_row_groups):
+        rg = meta.row_group(n)
+        stats = rg.column(col_idx).statistics
+        rows.append({
+            'row_group': n,
+            'rows': rg.num_rows,
+            'min_game_id': stats.min if stats is not None and stats.has_min_max else None,
+            'max_game_id': stats.max if stats is not None and stats.has_min_max else None,
+            'compressed_bytes': sum(rg.column(c).total_compressed_size for c in range(rg.num_columns))
+        })
+    return pl.DataFrame(rows)
+
+# 4) FUNCTION: Row Count From The Footer
+def parquet_rows(path):
+    """This function will return the number of rows in a parquet file without reading any data"""
+    return pq.ParquetFile(path).metadata.num_rows
+
+# 5) CLASS: Streaming Sink - Games Go Straight To An Open Writer
+class ParquetGameSink:
+    """Writes games to one open ParquetWriter as they arrive instead of keeping a season of frames in a list.
+
+    Every frame is cast to one fixed schema (schema, or the first frame's) and buffered only until target_rows, then written as
+    one game-aligned row group with the writer profile, so memory stays at about one row group however many games are written.
+    The file is written to path + '.tmp' and swapped in on close, so a failed load never clobbers the existing file. If games
+    arrive out of order they are still written and the file is re-sorted once on close a game at a time (same row group size
+    and profile, a couple of row groups in memory) - the footer already records the sort order, so it is never left unsorted.
+    """
+
+    def __init__(self, path, schema=None, order=PBP_ORDER, target_rows=ROW_GROUP_ROWS, profile=PBP_WRITE_PROFILE):
+        self.path = path
+        self.tmp_path = path + '.tmp'
+        self.schema = dict(schema) if schema is not None else None
+        self.order = list(order)
+        self.target_rows = target_rows
+        self.profile = profile
+        self.rows = 0
+        self.in_order = True
+        self._writer = None
+        self._buffer = []
+        self._buffer_rows = 0
+        self._last_key = None
+        self._dropped = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def _key(self, row):
+        # Nulls Sort First, Same As .sort And is_sorted_by
+        return tuple((v is not None, v) for v in row)
+
+    def write(self, data):
+        """Cast one game (or any run of whole games) to the sink schema and buffer it"""
+        if data.height == 0:
+            return
+        if self.schema is None:
+            self.schema = dict(data.schema)
+        extra = set(data.columns) - set(self.schema) - self._dropped
+        if extra:
+            self._dropped |= extra
+            print(f"Sink Schema Is Fixed - Dropping Columns Not In It: {sorted(extra)} | Path: {self.path}")
+        data = sort_if_needed(
+            data.select([(pl.col(c) if c in data.columns else pl.lit(None)).cast(t).alias(c) for c, t in self.schema.items()]),
+            self.order
+        )
+
+        first_key, last_key = self._key(data.select(self.order).row(0)), self._key(data.select(self.order).row(-1))
+        if (self._last_key is not None) and (first_key < self._last_key):
+            self.in_order = False
+        self._last_key = last_key
+
+        self._buffer.append(data)
+        self._buffer_rows += data.height
+        self.rows += data.height
+        if self._buffer_rows >= self.target_rows:
+            self._flush()
+
+    def write_file(self, path, exclude_games=None):
+        """Stream an existing parquet file into the sink one row group at a time (optionally dropping some game_ids)"""
+        exclude_games = list(exclude_games or [])
+        file = pq.ParquetFile(path)
+        for n in range(file.num_row_groups):
+            data = pl.from_arrow(file.read_row_group(n))
+            if exclude_games:
+                data = data.filter(~pl.col('game_id').is_in(exclude_games))
+            self.write(data)
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        table = pl.concat(self._buffer).to_arrow()
+        if self._writer is None:
+            metadata = dict(table.schema.metadata or {})
+            metadata[sort_meta_key] = json.dumps(self.order).encode()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            self._writer = pq.ParquetWriter(self.tmp_path, table.schema.with_metadata(metadata), **self.profile)
+        self._writer.write_table(table.replace_schema_metadata(self._writer.schema.metadata), row_group_size=table.num_rows)
+        self._buffer = []
+        self._buffer_rows = 0
+
+    def close(self):
+        """Write the last row group and swap the file in. Returns the path (None if nothing was written)"""
+        self._flush()
+        if self._writer is None:
+            return None
+        self._writer.close()
+        self._writer = None
+        if self.in_order:
+            os.replace(self.tmp_path, self.path)
+            return self.path
+
+        print(f"Games Arrived Out Of Order - Re-Sorting Once | Path: {self.path}")
+        unsorted_path = self.path + '.unsorted'
+        os.replace(self.tmp_path, unsorted_path)
+        self._resort(unsorted_path)
+        os.remove(unsorted_path)
+        return self.path
+
+    def _resort(self, source):
+        """Write source to path in order one game at a time (games arrive whole, so ordering the games orders the file) -
+        only the row groups holding the current game are read, so memory stays at a couple of row groups"""
+        with open(source, 'rb') as handle:
+            file = pq.ParquetFile(handle)
+            groups = {}
+            for n in range(file.num_row_groups):
+                for key in pl.from_arrow(file.read_row_group(n, columns=self.order[:2])).unique().rows():
+                    groups.setdefault(self._key(key), []).append(n)
+            cache = {}
+            with ParquetGameSink(self.path, schema=self.schema, order=self.order, target_rows=self.target_rows, profile=self.profile) as sink:
+                for key in sorted(groups):
+                    frames = []
+                    for n in groups[key]:
+                        if n not in cache:
+                            if len(cache) >= 2:
+                                cache.pop(next(iter(cache)))
+                            cache[n] = pl.from_arrow(file.read_row_group(n))
+                        game = cache[n]
+                        for col, (_, value) in zip(self.order[:2], key):
+                            game = game.filter(pl.col(col).is_null() if value is None else pl.col(col) == value)
+                        frames.append(game)
+                    sink.write(pl.concat(frames))
+
+    def abort(self):
+        """Close and delete the temp file, leaving any existing file at path untouched"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+
+### END PARQUET LAYOUT ###
+
+### PUSHDOWN READERS - DEFINE ###
+
+# 6) FUNCTION: Season File Paths
+def pbp_paths(seasons, path_dir=pbp_dir):
+    """This function will return the stored season file for each starting year (e.g. 2023 -> API_RAW_PBP_Data_2023.parquet)"""
+    return [os.path.join(path_dir, f"API_RAW_PBP_Data_{s}.parquet") for s in seasons]
+
+# 7) FUNCTION: Lazy Scan With Projection + Predicate Pushdown
+def scan_pbp(seasons, columns=None, season_type=None, game_ids=None, teams=None, event_types=None, path_dir=pbp_dir):
+    """This function will return a LazyFrame over the season files with every filter applied before collect, so polars
+    reads only the requested columns and skips row groups whose game_id statistics rule them out.
+
+    teams matches event_team_abbr, event_types matches event_type (both dictionary encoded, so cheap to filter)
+    """
+    lazy = pl.scan_parquet([p for p in pbp_paths(seasons, path_dir) if os.path.exists(p)])
+    predicates = []
+    if season_type is not None:
+        predicates.append(pl.col('season_type').is_in([season_type] if isinstance(season_type, str) else season_type))
+    if game_ids is not None:
+        game_ids = list(game_ids)
+        # Range First So Row Group Statistics Skip Other Games (An Empty List Matches Nothing)
+        predicates.append((pl.col('game_id').is_between(min(game_ids), max(game_ids)) & pl.col('game_id').is_in(game_ids)) if game_ids else pl.lit(False))
+    if teams is not None:
+        predicates.append(pl.col('event_team_abbr').is_in([teams] if isinstance(teams, str) else teams))
+    if event_types is not None:
+        predicates.append(pl.col('event_type').is_in(event_types))
+    for predicate in predicates:
+        lazy = lazy.filter(predicate)
+    if columns is not None:
+        lazy = lazy.select(columns)
+    return lazy
+
+# 8) FUNCTION: One Team's Shots Across Seasons
+def read_team_shots(team, seasons, columns=None, event_types=['GOAL', 'SHOT', 'MISSED_SHOT', 'BLOCKED_SHOT'], season_type=None, path_dir=pbp_dir):
+    """This function will collect one team's shot attempts (a handful of columns if passed) across every season in seasons"""
+    return scan_pbp(seasons, columns=columns, season_type=season_type, teams=team, event_types=event_types, path_dir=path_dir).collect()
+
+### END PUSHDOWN READERS ###
@@ -0,0 +1,244 @@
+# Tools
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from datetime import datetime
+
+# Stdlib Only At Import - Load_All_PBP Imports record_payload From Here, And requests Is Only Imported By revalidate
+
+
+### PAYLOAD FINGERPRINTS - DEFINE ###
+
+# Path
+fingerprint_file = 'Data/Fingerprints/payload_fingerprints.sqlite'
+
+# Endpoints (Same As The Loaders)
+PAYLOAD_URLS = {
+    'pbp': 'https://api-web.nhle.com/v1/gamecenter/{game_id}/play-by-play',
+    'shifts': 'https://api.nhle.com/stats/rest/en/shiftcharts?cayenneExp=gameId={game_id}'
+}
+
+# Top-Level Play-By-Play Keys That Change Without The Game Data Changing (Broadcast Links, Clock Display)
+VOLATILE_KEYS = ['tvBroadcasts', 'gameVideo', 'clock', 'odds']
+
+fingerprint_schema = """
+CREATE TABLE IF NOT EXISTS fingerprints (
+    game_id INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    season INTEGER NOT NULL,
+    sha256 TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    bytes INTEGER,
+    fetched_at TEXT,
+    checked_at TEXT,
+    PRIMARY KEY (game_id, kind)
+);
+CREATE INDEX IF NOT EXISTS fingerprints_season ON fingerprints (season, checked_at);
+"""
+
+# 1) FUNCTION: Canonical Hash Of A Payload
+def payload_fingerprint(kind, content):
+    """This function will hash the parsed payload with sorted keys (so key order and whitespace do not matter). Play-by-play
+    drops VOLATILE_KEYS; shift charts hash only the shift rows sorted by shift id"""
+    payload = json.loads(content) if isinstance(content, (bytes, str)) else content
+    if kind == 'pbp':
+        payload = {k: v for k, v in payload.items() if k not in VOLATILE_KEYS}
+    else:
+        payload = sorted(payload.get('data', []), key=lambda row: row.get('id', 0))
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':')).encode()).hexdigest()
+
+# 2) CLASS: Fingerprint Store (SQLite - Safe For Concurrent Backfill Workers)
+class FingerprintStore:
+    """One row per (game_id, kind) with the payload hash, HTTP validators (ETag/Last-Modified) and when it was last fetched
+    and checked"""
+
+    def __init__(self, path=fingerprint_file, timeout=60):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.conn.executescript(fingerprint_schema)
+
+    def close(self):
+        self.conn.close()
+
+    def upsert(self, rows):
+        """rows: dicts with game_id, kind, sha256, etag, last_modified, bytes"""
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.conn.executemany(
+            """INSERT INTO fingerprints (game_id, kind, season, sha256, etag, last_modified, bytes, fetched_at, checked_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+               ON CONFLICT (game_id, kind) DO UPDATE SET sha256 = excluded.sha256, etag = excluded.etag,
+               last_modified = excluded.last_modified, bytes = excluded.bytes, fetched_at = excluded.fetched_at, checked_at = excluded.checked_at""",
+            [(int(r['game_id']), r['kind'], int(str(r['game_id'])[:4]), r['sha256'], r.get('etag'), r.get('last_modified'), r.get('bytes'), now, now) for r in rows]
+        )
+
+    def mark_checked(self, game_id, kind):
+        self.conn.execute('UPDATE fingerprints SET checked_at = ? WHERE game_id = ? AND kind = ?',
+                          (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), int(game_id), kind))
+
+    def season_games(self, season, limit=None):
+        """{game_id: {kind: row}} for a season, least recently checked games first"""
+        rows = self.conn.execute(
+            'SELECT game_id, kind, sha256, etag, last_modified, checked_at FROM fingerprints WHERE season = ? ORDER BY checked_at, game_id', (season,)
+        ).fetchall()
+        games = {}
+        for game_id, kind, sha, etag, last_modified, checked_at in rows:
+            games.setdefault(game_id, {})[kind] = {'sha256': sha, 'etag': etag, 'last_modified': last_modified, 'checked_at': checked_at}
+        return dict(list(games.items())[:limit]) if limit else games
+
+# 3) FUNCTION: Ingest Hook - Remember The Fingerprint Of Every Payload The Loaders Fetch
+_PENDING = {}
+_PENDING_LOCK = threading.Lock()
+
+def record_payload(game_id, kind, response):
+    """Called by ping_nhl_api / append_shift_data with the requests.Response. The fingerprint waits in memory until the game
+    is persisted (save_pending), so a game that fails to load never gets a fingerprint"""
+    try:
+        row = {
+            'game_id': int(game_id), 'kind': kind, 'sha256': payload_fingerprint(kind, response.content),
+            'etag': response.headers.get('ETag'), 'last_modified': response.headers.get('Last-Modified'), 'bytes': len(response.content)
+        }
+    except (ValueError, AttributeError):
+        return
+    with _PENDING_LOCK:
+        _PENDING[(int(game_id), kind)] = row
+
+def save_pending(game_ids=None, path=fingerprint_file):
+    """Write the pending fingerprints of game_ids (None = all) to the store"""
+    with _PENDING_LOCK:
+        keys = [k for k in _PENDING if game_ids is None or k[0] in {int(g) for g in game_ids}]
+        rows = [_PENDING.pop(k) for k in keys]
+    if rows:
+        store = FingerprintStore(path)
+        store.upsert(rows)
+        store.close()
+    return len(rows)
+
+def discard_pending(game_ids):
+    """Forget the pending fingerprints of games that failed to load, so no later save_pending stores them"""
+    with _PENDING_LOCK:
+        for key in [k for k in _PENDING if k[0] in {int(g) for g in game_ids}]:
+            del _PENDING[key]
+
+### END PAYLOAD FINGERPRINTS ###
+
+### REVALIDATION - DEFINE ###
+
+# 4) FUNCTION: Conditional Re-Fetch And Compare
+def revalidate(season, path=fingerprint_file, max_games=None, min_request_seconds=0.2, timeout=30):
+    """This function will re-request the payloads of stored games (least recently checked first), sending the stored
+    ETag/Last-Modified so an unchanged payload comes back as an empty 304 when the server supports it, and compare the
+    canonical hash otherwise.
+
+    Returns {game_id: {'pbp': bytes or None, 'shifts': bytes or None}} for games with any changed payload (the new bytes,
+    so reprocessing does not fetch them again). Changed fingerprints are stored only after the game is reprocessed"""
+    import requests
+
+    start_time = time.time()
+    store = FingerprintStore(path)
+    games = store.season_games(season, limit=max_games)
+    changed, n_304 = {}, 0
+    for game_id, kinds in games.items():
+        for kind, stored in kinds.items():
+            tic = time.time()
+            headers = {}
+            if stored['etag']:
+                headers['If-None-Match'] = stored['etag']
+            if stored['last_modified']:
+                headers['If-Modified-Since'] = stored['last_modified']
+            try:
+                response = requests.get(PAYLOAD_URLS[kind].format(game_id=game_id), headers=headers, timeout=timeout)
+            except requests.RequestException as e:
+                print(f"Revalidation Request Failed For GameID: {game_id} ({kind}) | {e}")
+                continue
+            if response.status_code == 304:
+                n_304 += 1
+                store.mark_checked(game_id, kind)
+            elif response.status_code == 200:
+                if payload_fingerprint(kind, response.content) == stored['sha256']:
+                    store.mark_checked(game_id, kind)
+                else:
+                    changed.setdefault(game_id, {'pbp': None, 'shifts': None})[kind] = response.content
+                    record_payload(game_id, kind, response)
+            time.sleep(max(0.0, min_request_seconds - (time.time() - tic)))
+    store.close()
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"Revalidated {season}-{season+1}: {len(games)} Games | {n_304} Not Modified (304) | {len(changed)} Changed in {elap_time} Seconds | Path: {path}")
+    return changed
+
+# 5) FUNCTION: Re-Run Only The Changed Games Through The Loader And Swap Them Into The Season File
+def reprocess_changed(season, changed, path=fingerprint_file):
+    """This function will rebuild each changed game with reconcile_api_data + append_shift_data from the revalidated bytes
+    (fetching the other payload only if it was not modified), replace those games in the season file (plus stints and on-ice
+    bridge) and store their new fingerprints. Returns (reprocessed ids, failed ids)"""
+    import Load_All_PBP as loader
+
+    ok_ids, bad_ids = [], []
+    for i, payloads in sorted(changed.items()):
+        try:
+            game_stints = []
+            raw = loader.decode_pbp_payload(payloads['pbp'], i) if payloads['pbp'] is not None else loader.ping_nhl_api(i=i)
+            result_df = loader.append_shift_data(loader.reconcile_api_data(loader.align_and_cast_columns(data=raw, sch=loader.raw_schema)),
+                                                 shift_response=payloads['shifts'], stint_list=game_stints)
+            loader.write_game_checkpoint(season, i, result_df, game_stints)
+            ok_ids.append(i)
+        except ValueError as e:
+            print(f"Error Reprocessing GameID: {i} | {e}")
+            discard_pending([i])
+            bad_ids.append(i)
+    if ok_ids:
+        loader.replace_season_games(season, ok_ids)
+        save_pending(ok_ids, path)
+    return ok_ids, bad_ids
+
+# 6) FUNCTION: Periodic Pass - Revalidate, Reprocess, Patch Downstream
+def revalidate_season(season, path=fingerprint_file, max_games=None, min_request_seconds=0.2, pipeline=None, **patch_kwargs):
+    """This function will revalidate a season's stored games, reprocess the changed ones and patch features, scores and
+    aggregates for those games only (xG_Pipeline.patch_games; pipeline = the Pipeline from build_pipeline, so its manifest
+    records the patched outputs as current). Returns the reprocessed game ids"""
+    changed = revalidate(season, path, max_games=max_games, min_request_seconds=min_request_seconds)
+    if not changed:
+        return []
+    ok_ids, bad_ids = reprocess_changed(season, changed, path)
+    if bad_ids:
+        print(f"{len(bad_ids)} Changed Games Failed To Reprocess (Retried Next Pass): {bad_ids}")
+    if ok_ids:
+        from xG_Pipeline import patch_games
+
+        patch_games(season, ok_ids, pipeline=pipeline, **patch_kwargs)
+    return ok_ids
+
+### END REVALIDATION ###
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point:
+
+    python Payload_Fingerprints.py --season 2023 [--max-games 200] [--seasons 2021 2022 2023 --current 2023]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Re-check stored games against the API and reprocess only revised ones")
+    parser.add_argument('--season', type=int, required=True, help="Season (starting year) to revalidate")
+    parser.add_argument('--max-games', type=int, default=None, help="Games checked this pass (least recently checked first)")
+    parser.add_argument('--min-request-seconds', type=float, default=0.2, help="Minimum seconds between requests")
+    parser.add_argument('--seasons', nargs='+', type=int, default=None, help="Pipeline seasons (marks patched outputs current in its manifest)")
+    parser.add_argument('--current', type=int, default=None, help="Pipeline current season")
+    args = parser.parse_args(argv)
+
+    pipeline = None
+    if args.seasons:
+        from xG_Pipeline import build_pipeline
+
+        pipeline = build_pipeline(args.seasons, args.current or max(args.seasons))
+    revalidate_season(args.season, max_games=args.max_games, min_request_seconds=args.min_request_seconds, pipeline=pipeline)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+# Tools
+import time
+import json
+import os
+import uuid
+import functools
+import inspect
+import threading
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# System Stats (psutil Is Imported When A Run Starts, So Importing This Module Stays Cheap With Profiling Off)
+
+
+### RUN TELEMETRY - DEFINE ###
+
+# Path
+run_log_file = 'Data/Logs/pipeline_run_log.jsonl'
+
+# Currently Active Profiler (None = Profiling Off, Every Hook Below Is A No-Op)
+ACTIVE_PROFILER = None
+
+# 1) FUNCTION: Count Rows Of Any Frame-Like Object Passed Through A Stage
+def count_rows(obj):
+    """This function will return the number of rows in a polars/pandas frame, numpy array or xgboost DMatrix (first element of a tuple)"""
+    if isinstance(obj, (tuple, list)) and len(obj) > 0:
+        obj = obj[0]
+    if hasattr(obj, 'height'):
+        return obj.height
+    if hasattr(obj, 'num_row'):
+        return obj.num_row()
+    if hasattr(obj, 'shape') and len(obj.shape) > 0:
+        return obj.shape[0]
+    return None
+
+# 2) CLASS: Profile Each Stage Of A Single Run And Write Records To The Run Log
+class RunProfiler:
+    """Records wall time, CPU time, rows in/out, peak RSS and HTTP bytes for every stage of a pipeline run.
+
+    Stages nest (e.g. 'game' -> 'fetch_pbp' -> 'reconcile_api_data') and child stages inherit the tags
+    (game_id, season) of their parent. Each finished stage is appended as one JSON line to the run log.
+    """
+
+    def __init__(self, run_name, log_path=run_log_file, rss_interval=0.05, sample_game=None, profile_dir='Data/Logs/profiles'):
+        """
+        Parameters:
+        - run_name (str): Label for the run (e.g. 'load_games_2012_2024').
+        - log_path (str): JSONL file every stage record is appended to.
+        - rss_interval (float): Seconds between RSS samples used for per-stage peak memory (None = start/end only).
+        - sample_game (int): Optional game_id to run under a sampling profiler (pyinstrument if installed, else cProfile).
+        - profile_dir (str): Folder the sampling profiler output is written to.
+        """
+        self.run_id = datetime.now().strftime('%Y%m%d%H%M%S') + '-' + uuid.uuid4().hex[:6]
+        self.run_name = run_name
+        self.log_path = log_path
+        self.sample_game = sample_game
+        self.profile_dir = profile_dir
+        import psutil
+
+        self._process = psutil.Process(os.getpid())
+        self._open = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher = None
+
+        log_dir = os.path.dirname(log_path)
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+        self._log_file = open(log_path, 'a')
+
+        if rss_interval:
+            self._watcher = threading.Thread(target=self._watch_rss, args=(rss_interval,), daemon=True)
+            self._watcher.start()
+
+    def _rss_mb(self):
+        return self._process.memory_info().rss / (1024 ** 2)
+
+    def _watch_rss(self, interval):
+        """Background sampler - pushes the current RSS into the peak of every open stage"""
+        while not self._stop.wait(interval):
+            rss = self._rss_mb()
+            with self._lock:
+                for rec in self._open:
+                    if rss > rec['peak_rss_mb']:
+                        rec['peak_rss_mb'] = rss
+
+    @contextmanager
+    def stage(self, name, rows_in=None, **tags):
+        """Context manager timing one stage. Set rec['rows_out'] inside the block to record output rows."""
+        with self._lock:
+            parent_tags = dict(self._open[-1]['tags']) if self._open else {}
+        parent_tags.update(tags)
+        rss = self._rss_mb()
+        rec = {
+            'stage': name,
+            'tags': parent_tags,
+            'rows_in': rows_in,
+            'rows_out': None,
+            'http_requests': 0,
+            'http_bytes': 0,
+            'rss_start_mb': rss,
+            'peak_rss_mb': rss
+        }
+        with self._lock:
+            self._open.append(rec)
+
+        sampler = None
+        if (self.sample_game is not None) and (name == 'game') and (parent_tags.get('game_id') == self.sample_game):
+            sampler = self._start_sampler()
+
+        started_at = datetime.now()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        status = 'ok'
+        try:
+            yield rec
+        except BaseException as e:
+            status = type(e).__name__
+            raise
+        finally:
+            wall_s = time.perf_counter() - wall_start
+            cpu_s = time.process_time() - cpu_start
+            rss_end = self._rss_mb()
+            with self._lock:
+                self._open.remove(rec)
+                # HTTP bytes roll up into every enclosing stage
+                for parent in self._open:
+                    parent['http_requests'] += rec['http_requests']
+                    parent['http_bytes'] += rec['http_bytes']
+            if sampler is not None:
+                self._stop_sampler(sampler, parent_tags.get('game_id'))
+            self._write({
+                'run_id': self.run_id,
+                'run_name': self.run_name,
+                'stage': name,
+                'game_id': parent_tags.get('game_id'),
+                'season': parent_tags.get('season'),
+                'started_at': started_at.strftime('%Y-%m-%d %H:%M:%S.%f'),
+                'wall_s': round(wall_s, 6),
+                'cpu_s': round(cpu_s, 6),
+                'rows_in': rec['rows_in'],
+                'rows_out': rec['rows_out'],
+                'rss_start_mb': round(rec['rss_start_mb'], 2),
+                'rss_end_mb': round(rss_end, 2),
+                'peak_rss_mb': round(max(rec['peak_rss_mb'], rss_end), 2),
+                'http_requests': rec['http_requests'],
+                'http_bytes': rec['http_bytes'],
+                'status': status
+            })
+
+    def record_http(self, response):
+        """Add a requests.Response's payload size to the innermost open stage"""
+        with self._lock:
+            if self._open:
+                self._open[-1]['http_requests'] += 1
+                self._open[-1]['http_bytes'] += len(response.content)
+
+    def _write(self, record):
+        self._log_file.write(json.dumps(record) + '\n')
+        self._log_file.flush()
+
+    def _start_sampler(self):
+        """Start pyinstrument (sampling) if installed, otherwise fall back to cProfile"""
+        try:
+            from pyinstrument import Profiler
+            sampler = Profiler(interval=0.001)
+        except ImportError:
+            import cProfile
+            sampler = cProfile.Profile()
+            sampler.enable()
+            return sampler
+        sampler.start()
+        return sampler
+
+    def _stop_sampler(self, sampler, game_id):
+        os.makedirs(self.profile_dir, exist_ok=True)
+        out_path = os.path.join(self.profile_dir, f"{self.run_id}_{game_id}")
+        if hasattr(sampler, 'output_html'):
+            sampler.stop()
+            with open(out_path + '.html', 'w') as file:
+                file.write(sampler.output_html())
+            print(f"Sampling Profile For GameID: {game_id} Saved | Path: {out_path}.html")
+        else:
+            sampler.disable()
+            sampler.dump_stats(out_path + '.prof')
+            print(f"cProfile Stats For GameID: {game_id} Saved | Path: {out_path}.prof")
+
+    def close(self):
+        self._stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+        self._log_file.close()
+
+# 3) FUNCTION: Start/Stop The Active Run
+def start_run(run_name, **kwargs):
+    """This function will start profiling every wrapped stage until end_run() is called. kwargs are passed to RunProfiler"""
+    global ACTIVE_PROFILER
+    if ACTIVE_PROFILER is not None:
+        end_run()
+    ACTIVE_PROFILER = RunProfiler(run_name, **kwargs)
+    return ACTIVE_PROFILER
+
+def end_run():
+    """This function will close the active run log and turn profiling back off"""
+    global ACTIVE_PROFILER
+    if ACTIVE_PROFILER is not None:
+        ACTIVE_PROFILER.close()
+        print(f"Run {ACTIVE_PROFILER.run_id} ({ACTIVE_PROFILER.run_name}) Logged | Path: {ACTIVE_PROFILER.log_path}")
+    ACTIVE_PROFILER = None
+
+# 4) FUNCTION: Stage Hooks Used By The Loaders And Notebooks (No-Ops When No Run Is Active)
+def stage(name, rows_in=None, **tags):
+    """Context manager for a block of code - `with stage('game', game_id=i):`"""
+    if ACTIVE_PROFILER is None:
+        return nullcontext({})
+    return ACTIVE_PROFILER.stage(name, rows_in=rows_in, **tags)
+
+def record_http(response):
+    """Count the bytes of an API response against the current stage"""
+    if ACTIVE_PROFILER is not None:
+        ACTIVE_PROFILER.record_http(response)
+    return response
+
+def profile_stage(name):
+    """Decorator that records a function as a stage. Rows in are taken from the first frame-like argument, rows out from the return value"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if ACTIVE_PROFILER is None:
+                return func(*args, **kwargs)
+            rows_in = None
+            for arg in list(args) + list(kwargs.values()):
+                rows_in = count_rows(arg)
+                if rows_in is not None:
+                    break
+            with ACTIVE_PROFILER.stage(name, rows_in=rows_in) as rec:
+                result = func(*args, **kwargs)
+                rec['rows_out'] = count_rows(result)
+            return result
+        return wrapper
+    return decorator
+
+# 4b) FUNCTION: Decorator - A Loader Called With profile=True Logs Its Own Run
+def profiled_run(name_template):
+    """Decorator for functions with a profile argument. profile=True starts a run named name_template.format(**arguments)
+    (with sample_game if the function takes one) and ends it when the function returns or raises. When the caller already
+    has a run active (a notebook or benchmark) the call is recorded as one stage of that run instead, and the run is left
+    active. profile=False leaves any run the caller started running"""
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            if not bound.arguments.get('profile'):
+                return func(*args, **kwargs)
+            run_name = name_template.format(**bound.arguments)
+            if ACTIVE_PROFILER is not None:
+                with ACTIVE_PROFILER.stage(run_name):
+                    return func(*args, **kwargs)
+            extra = {'sample_game': bound.arguments['sample_game']} if 'sample_game' in bound.arguments else {}
+            start_run(run_name, **extra)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                end_run()
+        return wrapper
+    return decorator
+
+### END RUN TELEMETRY ###
+
+### RUN LOG QUERIES - DEFINE ###
+
+# 5) FUNCTION: Load The Run Log As A Polars DataFrame
+def load_run_log(path=run_log_file):
+    """This function will read every run in the JSONL run log into one polars DataFrame (one row per stage call)"""
+    import polars as pl
+
+    return (
+        pl.read_ndjson(path)
+        .with_columns(pl.col('started_at').str.to_datetime('%Y-%m-%d %H:%M:%S%.f'))
+    )
+
+# 6) FUNCTION: Export The Run Log To Parquet
+def export_run_log(path=run_log_file, save_path='Data/Logs/pipeline_run_log.parquet'):
+    """This function will convert the JSONL run log to parquet for faster cross-run queries"""
+    data = load_run_log(path)
+    data.write_parquet(save_path, use_pyarrow=True)
+    print(f"Run Log Exported: {data['run_id'].n_unique()} Runs | {data.height} Stage Records | Path: {save_path}")
+    return data
+
+# 7) FUNCTION: Summarize Stages Per Run
+def summarize_runs(data, run_ids=None):
+    """This function will aggregate wall/CPU time, rows, memory and HTTP bytes by run and stage so runs can be compared"""
+    import polars as pl
+
+    if run_ids is not None:
+        data = data.filter(pl.col('run_id').is_in(run_ids))
+
+    return (
+        data
+        .group_by(['run_id', 'run_name', 'stage'])
+        .agg([
+            pl.col('started_at').min().alias('run_start'),
+            pl.count().alias('calls'),
+            pl.col('wall_s').sum().alias('wall_s'),
+            pl.col('cpu_s').sum().alias('cpu_s'),
+            pl.col('wall_s').mean().alias('mean_wall_s'),
+            pl.col('wall_s').quantile(0.95).alias('p95_wall_s'),
+            pl.col('rows_in').sum().alias('rows_in'),
+            pl.col('rows_out').sum().alias('rows_out'),
+            pl.col('peak_rss_mb').max().alias('peak_rss_mb'),
+            pl.col('http_bytes').sum().alias('http_bytes'),
+            (pl.col('status') != 'ok').sum().alias('errors')
+        ])
+        .with_columns((pl.col('rows_out') / pl.col('wall_s')).alias('rows_per_s'))
+        .sort(['run_start', 'wall_s'], descending=[True, True])
+    )
+
+### END RUN LOG QUERIES ###
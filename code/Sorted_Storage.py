@@ -0,0 +1,72 @@
+# Polars (Arrow)
+import polars as pl
+import pyarrow.parquet as pq
+
+# Tools
+import json
+
+
+### SORT-ONCE STORAGE - DEFINE ###
+
+# Canonical Event Order - Season Files Are Written In It And Feature Stages Expect It
+PBP_ORDER = ['season', 'game_id', 'period', 'event_idx']
+
+# Parquet Schema Metadata Key Holding The Column Order A File Was Written In
+sort_meta_key = b'nhl_xg.sort_order'
+
+# Set False To Force Every sort_if_needed To Sort (Benchmark The Skipped Sorts With run_benchmarks.py --compare-sort)
+SKIP_SORTED = True
+
+# 1) FUNCTION: Check Lexicographic Order In One Pass (No Sort, No Gather Of The Other Columns)
+def is_sorted_by(data, cols):
+    """This function will return True when rows are already ordered by cols (ascending, nulls first like .sort), comparing
+    each row with the one before it instead of sorting"""
+    if data.height < 2:
+        return True
+
+    # Row i Is In Order If Its Key Is >= The Previous Key, Deciding Column By Column From The Last Key Outwards (Row 0 Compares To Nulls And Passes)
+    in_order = pl.lit(True)
+    for col in reversed(cols):
+        cur, prev = pl.col(col), pl.col(col).shift(1)
+        greater = (cur > prev).fill_null(False) | (prev.is_null() & cur.is_not_null())
+        equal = (cur == prev).fill_null(False) | (prev.is_null() & cur.is_null())
+        in_order = greater | (equal & in_order)
+    return bool(data.select(in_order.all()).item())
+
+# 2) FUNCTION: Sort Only When The Frame Is Not Already In Order
+def sort_if_needed(data, cols=PBP_ORDER):
+    """This function will skip the sort when data is already ordered by cols (e.g. read from a sorted season file or
+    left in order by the previous stage) and sort otherwise. Used with .pipe(sort_if_needed, [...]) in place of .sort(...)"""
+    cols = [cols] if isinstance(cols, str) else list(cols)
+    if SKIP_SORTED and is_sorted_by(data, cols):
+        return data.with_columns(pl.col(cols[0]).set_sorted())
+    return data.sort(cols)
+
+# 3) FUNCTION: Write A Frame Physically Ordered With The Order Recorded In The File
+def write_sorted_parquet(data, path, order=PBP_ORDER, **kwargs):
+    """This function will put data in order (sorting only if needed), record the order in the parquet schema metadata and
+    write it with pyarrow. kwargs are passed to pyarrow.parquet.write_table"""
+    data = sort_if_needed(data, order)
+    table = data.to_arrow()
+    metadata = dict(table.schema.metadata or {})
+    metadata[sort_meta_key] = json.dumps(list(order)).encode()
+    pq.write_table(table.replace_schema_metadata(metadata), path, **kwargs)
+    return data
+
+# 4) FUNCTION: Read The Recorded Order Without Reading Any Data
+def stored_sort_order(path):
+    """This function will return the column order a parquet file was written in (None if it was not written sorted)"""
+    metadata = pq.read_schema(path).metadata or {}
+    return json.loads(metadata[sort_meta_key]) if sort_meta_key in metadata else None
+
+# 5) FUNCTION: Read A File And Flag Its Recorded Order
+def read_sorted_parquet(path, columns=None):
+    """This function will read a parquet file and, when it was written sorted, flag the leading sort column as sorted so
+    polars can use fast paths (group_by/join on sorted keys) and sort_if_needed skips the sort"""
+    data = pl.read_parquet(path, columns=columns, use_pyarrow=True)
+    order = stored_sort_order(path)
+    if order and order[0] in data.columns:
+        data = data.with_columns(pl.col(order[0]).set_sorted())
+    return data
+
+### END SORT-ONCE STORAGE ###
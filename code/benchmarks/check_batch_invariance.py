@@ -0,0 +1,112 @@
+# Tools
+import argparse
+import hashlib
+import io
+import os
+import random
+import sys
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+sys.path.insert(0, bench_dir)
+
+from synthetic_games import synthetic_games
+from record_fixtures import load_fixtures, fixture_dir
+
+
+### BATCH INVARIANCE CHECK - DEFINE ###
+
+# 1) FUNCTION: Parquet Bytes Digest Of A Frame (Byte-Identical Means Same Values, Types And Row Order)
+def frame_digest(df):
+    """This function will hash the frame written to an in-memory parquet file (one chunk, no statistics)"""
+    buffer = io.BytesIO()
+    df.rechunk().write_parquet(buffer, statistics=False)
+    return hashlib.sha256(buffer.getvalue()).hexdigest()
+
+# 2) FUNCTION: Games Whose Output Depends On Their Own Rows Only When Windows Stay Inside The Game
+def boundary_cases(decoded):
+    """This function will return the decoded games changed so that an unpartitioned reconcile gives a different answer:
+
+    - the first 3 plays of every game have a null situationCode (a whole-frame forward fill takes the previous game's code)
+    - homeTeamDefendingSide is null and x is pushed to one side of the ice, alternating by game, so each game's flipped_coords
+      depends on its own x mean (a whole-frame mean mixes the games)"""
+    import polars as pl
+
+    cases = []
+    for n, df in enumerate(sorted(decoded, key=lambda d: d['id'][0])):
+        sign = 1 if n % 2 == 0 else -1
+        cases.append(
+            df
+            .sort('period', 'sortOrder')
+            .with_row_index('_row')
+            .with_columns([
+                pl.when(pl.col('_row') < 3).then(pl.lit(None)).otherwise(pl.col('situationCode')).alias('situationCode'),
+                pl.lit(None).cast(pl.Utf8).alias('homeTeamDefendingSide'),
+                (sign * (pl.col('xCoord').abs() + 30)).cast(pl.Float32).alias('xCoord')
+            ])
+            .drop('_row')
+        )
+    return cases
+
+# 3) FUNCTION: Reconcile Games One By One, All Together And In Shuffled Batches
+def check_reconcile(games, batch_sizes=(1, 7, None), seed=0, partition_by='default', edge_cases=True):
+    """This function will decode every game, run reconcile_api_data on batches of each size (None = all games at once, batches
+    built from a shuffled game order) and compare every result, sorted by game, with the one-game-at-a-time output.
+    edge_cases = True runs on boundary_cases(games) instead, where batching only stays invisible if the windows are partitioned.
+    partition_by is passed to the batched runs ('default' = reconcile_api_data's own). Returns {batch_size: True/False}"""
+    import polars as pl
+    import Load_All_PBP as loader
+
+    decoded = [loader.align_and_cast_columns(loader.decode_pbp_payload(pbp_payload, i), loader.raw_schema) for i, pbp_payload, _ in games]
+    if edge_cases:
+        decoded = boundary_cases(decoded)
+    kwargs = {} if partition_by == 'default' else {'partition_by': partition_by}
+    order = ['season', 'game_id', 'period', 'event_idx']
+
+    def run(batch_size):
+        frames = decoded[:]
+        random.Random(seed).shuffle(frames)
+        size = len(frames) if batch_size is None else batch_size
+        out = [loader.reconcile_api_data(pl.concat(frames[n:n + size], how='diagonal'), **kwargs) for n in range(0, len(frames), size)]
+        return pl.concat(out, how='diagonal').sort(order)
+
+    expected = pl.concat([loader.reconcile_api_data(df) for df in decoded], how='diagonal').sort(order)
+    expected_digest = frame_digest(expected)
+    results = {}
+    for batch_size in batch_sizes:
+        actual = run(batch_size)
+        same = actual.columns == expected.columns and frame_digest(actual.select(expected.columns)) == expected_digest
+        results[batch_size] = same
+        print(f"Partition: {partition_by} | Batch Size: {batch_size or 'All'} | Games: {len(decoded)} | Rows: {actual.height} | Byte-Identical: {same}")
+    return results
+
+# 4) FUNCTION: The Check Passes Partitioned And Fails On The Old Whole-Frame Windows
+def check_sensitivity(games, seed=0):
+    """This function will run check_reconcile on the raw games and on boundary_cases with the default partitioning (every batch
+    size must match) and on boundary_cases with partition_by = None (some batch must differ, else the check could never fail).
+    Returns {check: True/False}"""
+    results = {
+        'raw_games_partitioned': all(check_reconcile(games, seed=seed, edge_cases=False).values()),
+        'boundary_cases_partitioned': all(check_reconcile(games, seed=seed).values()),
+        'boundary_cases_unpartitioned_differ': not all(check_reconcile(games, seed=seed, partition_by=None).values())
+    }
+    print("================== Batch Invariance Check ==================")
+    for name, ok in results.items():
+        print(f"{name:<38}{'PASS' if ok else 'FAIL'}")
+    return results
+
+### END BATCH INVARIANCE CHECK ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check reconcile_api_data gives byte-identical output for any batching of games")
+    parser.add_argument('--synthetic', type=int, default=0, help="Use this many synthetic games instead of the saved fixtures")
+    parser.add_argument('--data-root', default=os.path.dirname(os.path.dirname(bench_dir)), help="Folder holding Data/NHL_Rosters_2014_2024.csv")
+    args = parser.parse_args()
+
+    # Synthetic Games Read The Roster From Data/ - Move To The Data Folder First
+    os.chdir(args.data_root)
+    games = list(synthetic_games(args.synthetic)) if args.synthetic else list(load_fixtures(fixture_dir))
+    results = check_sensitivity(games)
+    sys.exit(0 if all(results.values()) else 1)
@@ -0,0 +1,84 @@
+# Tools
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+sys.path.insert(0, bench_dir)
+
+from stub_schedule_server import StubSchedule, DEFAULT_SCRIPT
+
+
+### FINALIZER CHECK - DEFINE ###
+
+# 1) FUNCTION: Drive The Finalizer Against The Stub Schedule With A Recording Ingest
+def check_finalizer(cycles=10, fail_once=2023020102):
+    """This function will run GameFinalizer cycles against the scripted stub schedule with an ingest that records calls
+    (and fails fail_once on its first try), then check:
+
+    - every regular season/playoff game that reached OFF was ingested exactly once, and only after the poll that saw OFF
+    - postponed and preseason games were never ingested
+    - the failed game was retried and ingested on a later cycle
+    - a restarted finalizer (same state file) ingests nothing again
+    Returns {check: True/False}"""
+    from Game_Finalizer import GameFinalizer
+
+    stub = StubSchedule(DEFAULT_SCRIPT)
+    server, url = stub.serve()
+    calls, after = [], []
+    failed_once = set()
+
+    def ingest(season, game_ids):
+        calls.append((season, list(game_ids)))
+        bad = [g for g in game_ids if g == fail_once and g not in failed_once]
+        failed_once.update(bad)
+        return [g for g in game_ids if g not in bad], bad
+
+    today = lambda: datetime(2023, 11, 1, 23, 30)
+    with tempfile.TemporaryDirectory() as tmp:
+        state_path = os.path.join(tmp, 'finalizer_state.json')
+        finalizer = GameFinalizer(ingest=ingest, after_ingest=lambda s, ids: after.append((s, ids)), state_path=state_path,
+                                  schedule_url=url, max_games_per_cycle=2, today=today)
+        per_cycle = []
+        for _ in range(cycles):
+            per_cycle.append(finalizer.run_cycle()['ingested'])
+
+        restarted = GameFinalizer(ingest=ingest, state_path=state_path, schedule_url=url, today=today)
+        again = restarted.run_cycle()['ingested']
+    server.shutdown()
+
+    # Expected: Every gameType 2/3 Game Scheduled OK Whose Script Ends In OFF
+    expected = sorted(g for g, (_, game_type, sched, states) in DEFAULT_SCRIPT.items() if game_type in [2, 3] and sched == 'OK' and states[-1] == 'OFF')
+    ingested = sorted(g for ids in per_cycle for g in ids)
+    first_off = {g: states.index('OFF') for g, (_, _, _, states) in DEFAULT_SCRIPT.items() if 'OFF' in states}
+    ingest_cycle = {g: n for n, ids in enumerate(per_cycle) for g in ids}
+
+    results = {
+        'all_final_games_ingested_once': ingested == expected,
+        'never_before_off': all(ingest_cycle[g] >= first_off[g] for g in ingest_cycle),
+        'skipped_postponed_and_preseason': not ({2023020104, 2023010105} & set(ingested)),
+        'failed_game_retried': fail_once in failed_once and fail_once in ingested,
+        'per_cycle_bound_respected': all(len(ids) <= 2 for _, ids in calls),
+        'restart_ingests_nothing': again == [],
+        'after_ingest_called': sorted(g for _, ids in after for g in ids) == expected
+    }
+    print("================== Game Finalizer Check (Stub Schedule) ==================")
+    for name, ok in results.items():
+        print(f"{name:<36}{'PASS' if ok else 'FAIL'}")
+    print(f"Ingest Calls: {calls}")
+    return results
+
+### END FINALIZER CHECK ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check the post-game finalizer against a local stub schedule server")
+    parser.add_argument('--cycles', type=int, default=10, help="Finalizer cycles to run")
+    args = parser.parse_args()
+
+    results = check_finalizer(args.cycles)
+    sys.exit(0 if all(results.values()) else 1)
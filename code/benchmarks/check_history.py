@@ -0,0 +1,131 @@
+# Tools
+import argparse
+import os
+import random
+import sys
+import tempfile
+from datetime import date, timedelta
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+
+
+### HISTORY CHECK - DEFINE ###
+
+# 1) FUNCTION: Random Shots For A Few Shooters/Goalies Over Two Seasons
+def history_shots(n_games=30, seed=0):
+    """This function will return a shot frame with the columns update_history reads - game ids and dates increase together,
+    the first half of the games in 2022 and the rest in 2023"""
+    import polars as pl
+
+    rng = random.Random(seed)
+    rows = []
+    for n in range(n_games):
+        season = 2022 if n < n_games // 2 else 2023
+        game_id = season * 1000000 + 20000 + n + 1
+        game_date = (date(season, 10, 10) + timedelta(days=2 * n)).isoformat()
+        for _ in range(rng.randint(3, 12)):
+            rows.append({
+                'season': season * 10000 + season + 1, 'game_id': game_id, 'game_date': game_date,
+                'event_type': rng.choice(['SHOT', 'SHOT', 'MISSED_SHOT', 'GOAL', 'BLOCKED_SHOT']),
+                'event_player_1_id': str(rng.randint(1, 6)), 'event_team_type': rng.choice(['home', 'away']),
+                'home_goalie': str(rng.choice([90, 91])), 'away_goalie': str(rng.choice([92, 93]))
+            })
+    return pl.DataFrame(rows)
+
+# 2) FUNCTION: Incremental Builds Must Equal A Full Rebuild
+def check_history(n_games=30, roll_games=3, batch_games=4, seed=0):
+    """This function will build the history state three ways and compare them:
+
+    - full: every game of each season in one update_history call (starting from nothing stored)
+    - incremental: the same games added batch_games at a time
+    - one game: the same games added one at a time
+    Returns {check: True/False}"""
+    import polars as pl
+    from xG_History import update_history
+
+    shots = history_shots(n_games, seed)
+    games = shots['game_id'].unique().sort().to_list()
+    order = ['role', 'player_id', 'game_date', 'game_id']
+
+    def build(step):
+        with tempfile.TemporaryDirectory() as tmp:
+            states = []
+            for season in [2022, 2023]:
+                season_games = [g for g in games if g // 1000000 == season]
+                for start in range(0, len(season_games), step):
+                    batch = season_games[:start + step]
+                    update_history(shots.filter(pl.col('game_id').is_in(batch)), season, save_dir=tmp, roll_games=roll_games)
+                states.append(pl.read_parquet(os.path.join(tmp, f"Player_History_{season}.parquet")).sort(order))
+            return pl.concat(states)
+
+    full, incremental, one_game = build(len(games)), build(batch_games), build(1)
+    results = {
+        'first_build_runs': full.height > 0,
+        'incremental_matches_full': incremental.to_dicts() == full.to_dicts(),
+        'one_game_matches_full': one_game.to_dicts() == full.to_dicts(),
+        'roll_within_window': full.select((pl.col('roll_shots') <= pl.col('cum_shots')).all()).item(),
+        'no_own_game_history': check_features(shots, roll_games)
+    }
+    print("================== History Check (Incremental vs Full Build) ==================")
+    for name, ok in results.items():
+        print(f"{name:<28}{'PASS' if ok else 'FAIL'}")
+    return results
+
+# 3) FUNCTION: As-Of Features Only See Games Dated Before The Shot's Game
+def check_features(shots, roll_games=3):
+    """This function will build the full history state, join history_features onto every shot and compare each shot's
+    career attempts/games (shooter and goalie) with a direct count over the games dated strictly before its own game.
+    Returns True when every shot matches (a shot picking up its own game's rows would count too many)"""
+    import polars as pl
+    from xG_History import update_history, history_features, history_events
+
+    events = (
+        shots
+        .with_row_index('event_idx')
+        .with_columns([
+            pl.col('event_idx').cast(pl.Int64),
+            pl.when(pl.col('event_team_type') == 'home').then(pl.col('away_goalie')).otherwise(pl.col('home_goalie')).alias('goalie')
+        ])
+    )
+    attempts = events.filter(pl.col('event_type').is_in(history_events))
+    with tempfile.TemporaryDirectory() as tmp:
+        features = []
+        for season in [2022, 2023]:
+            season_shots = events.filter(pl.col('game_id') // 1000000 == season)
+            update_history(season_shots, season, save_dir=tmp, roll_games=roll_games)
+            features.append(history_features(season_shots, season, save_dir=tmp))
+        features = pl.concat(features)
+
+    ok = True
+    for prefix, id_col in [('sh', 'event_player_1_id'), ('gk', 'goalie')]:
+        prior = (
+            events
+            .select('event_idx', 'game_date', pl.col(id_col).alias('player_id'))
+            .join(attempts.select(pl.col(id_col).alias('player_id'), pl.col('game_date').alias('prior_date'), 'game_id'), on='player_id', how='left')
+            .filter(pl.col('prior_date') < pl.col('game_date'))
+            .group_by('event_idx')
+            .agg([pl.col('game_id').count().alias('expected_shots'), pl.col('game_id').n_unique().alias('expected_games')])
+        )
+        compared = (
+            features
+            .join(prior, on='event_idx', how='left')
+            .with_columns([pl.col('expected_shots').fill_null(0), pl.col('expected_games').fill_null(0)])
+        )
+        ok &= compared.select(
+            ((pl.col(f"{prefix}_cum_shots") == pl.col('expected_shots')) & (pl.col(f"{prefix}_games") == pl.col('expected_games'))).all()
+        ).item()
+    return ok
+
+### END HISTORY CHECK ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that incremental shooter/goalie history builds equal a full rebuild")
+    parser.add_argument('--games', type=int, default=30, help="Games over the two seasons")
+    parser.add_argument('--roll-games', type=int, default=3, help="Rolling window (small so it wraps)")
+    args = parser.parse_args()
+
+    results = check_history(args.games, args.roll_games)
+    sys.exit(0 if all(results.values()) else 1)
@@ -0,0 +1,157 @@
+# Tools
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+sys.path.insert(0, bench_dir)
+
+from synthetic_games import synthetic_games
+from record_fixtures import load_fixtures, fixture_dir
+
+
+### ENCODING COMPARISON - DEFINE ###
+
+# Strength Models (Same Order As split_by_strength)
+MODEL_TYPES = ['EV', 'PP', 'SH', 'EN']
+
+# Fixed Training Parameters (Same For Both Encodings - Only The Feature Matrix Changes)
+XGB_PARAMS = {
+    'objective': 'binary:logistic',
+    'eval_metric': 'logloss',
+    'tree_method': 'hist',
+    'n_estimators': 300,
+    'max_depth': 4,
+    'learning_rate': 0.05,
+    'subsample': 0.85,
+    'seed': 87
+}
+
+# Path
+results_dir = os.path.join(bench_dir, 'results')
+
+# 1) FUNCTION: Pipeline Up To split_by_strength (Once, Shared By Both Encodings)
+def build_splits(games=None, seasons=None):
+    """This function will return (EV, PP, SH, EN) frames from decoded payloads (fixtures/synthetic) or from stored season
+    files in Data/PBP (seasons), plus the local roster model_prep joins on"""
+    import polars as pl
+    import Load_All_PBP as loader
+    from Build_xG_Features import clean_pbp_data, index_input_data, split_by_strength
+    from Parquet_Store import scan_pbp
+
+    roster = (
+        loader.ROSTER_DF
+        .select([pl.col('player_id').cast(pl.Utf8).alias('event_player_1_id'), 'hand_R', 'hand_L', 'pos_F', 'pos_D', 'pos_G'])
+        .unique()
+    )
+
+    if seasons:
+        data = scan_pbp(seasons).collect()
+        stints = None
+    else:
+        frames, stints = [], []
+        for i, pbp_payload, shift_payload in games:
+            df = loader.reconcile_api_data(loader.align_and_cast_columns(loader.decode_pbp_payload(pbp_payload, i), loader.raw_schema))
+            frames.append(loader.append_shift_data(df, shift_response=json.dumps(shift_payload).encode(), stint_list=stints))
+        data = pl.concat(frames, how='diagonal')
+        stints = pl.concat(stints) if stints else None
+
+    data = index_input_data(clean_pbp_data(data), stints=stints)
+    return split_by_strength(data), roster
+
+# 2) FUNCTION: Model Frame For One Encoding (Same Steps As The Notebook's Season Loop)
+def encoded_frame(split, prep_type, encoding, roster):
+    """This function will run model_prep + imp_sec_type with the encoding, drop the same columns as the notebook and
+    return a pandas frame with null rows removed"""
+    from Build_xG_Features import model_prep, imp_sec_type
+
+    data = imp_sec_type(model_prep(split, prep_type, roster=roster, encoding=encoding), encoding=encoding)
+    return data.drop('event_detail', 'event_team_toi', 'def_team_toi').to_pandas().dropna(how='any')
+
+# 3) FUNCTION: Train + Score One Model
+def fit_and_score(df, encoding, params=XGB_PARAMS, test_frac=0.2):
+    """This function will train an XGBClassifier on a random 80/20 split (random_state=87, as create_matricies) and return
+    feature count, matrix bytes, fit/predict seconds, log loss and AUC"""
+    import xgboost as xgb
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    target = 'is_goal'
+    features = [col for col in df.columns if col not in ['season', 'game_id', 'event_idx', target]]
+    test_df = df.sample(frac=test_frac, random_state=87)
+    train_df = df.drop(test_df.index)
+
+    x_train, x_test = train_df[features], test_df[features]
+    model = xgb.XGBClassifier(**params, enable_categorical=(encoding == 'categorical'))
+
+    tic = time.perf_counter()
+    model.fit(x_train, train_df[target])
+    fit_s = time.perf_counter() - tic
+
+    tic = time.perf_counter()
+    y_pred = model.predict_proba(x_test)[:, 1]
+    predict_s = time.perf_counter() - tic
+
+    both_classes = test_df[target].nunique() == 2
+    return {
+        'encoding': encoding,
+        'rows': len(df),
+        'features': len(features),
+        'matrix_mb': round(float(df[features].memory_usage(deep=True).sum()) / 1e6, 3),
+        'fit_s': round(fit_s, 3),
+        'predict_s': round(predict_s, 4),
+        'log_loss': round(float(log_loss(test_df[target], y_pred, labels=[0, 1])), 5),
+        'auc': round(float(roc_auc_score(test_df[target], y_pred)), 5) if both_classes else None
+    }
+
+# 4) FUNCTION: One Hot vs Categorical For Every Strength Model
+def compare_encodings(splits, roster, encodings=['onehot', 'categorical'], min_rows=200):
+    """This function will return {model_type: [result per encoding]} for EV/PP/SH/EN (models under min_rows are skipped)"""
+    results = {}
+    for split, prep_type in zip(splits, MODEL_TYPES):
+        if split.height < min_rows:
+            print(f"Skipping {prep_type}: {split.height} Rows (Min {min_rows})")
+            continue
+        results[prep_type] = [fit_and_score(encoded_frame(split, prep_type, encoding, roster), encoding) for encoding in encodings]
+    return results
+
+def print_comparison(results):
+    print("================== One Hot vs Categorical Encoding ==================")
+    print(f"{'model':<7}{'encoding':<13}{'rows':>9}{'features':>10}{'matrix_mb':>11}{'fit_s':>9}{'log_loss':>11}{'auc':>9}")
+    for prep_type, runs in results.items():
+        for r in runs:
+            print(f"{prep_type:<7}{r['encoding']:<13}{r['rows']:>9}{r['features']:>10}{r['matrix_mb']:>11.3f}{r['fit_s']:>9.3f}{r['log_loss']:>11.5f}{str(r['auc']):>9}")
+        base, cat = runs[0], runs[-1]
+        if base['fit_s'] > 0 and base['matrix_mb'] > 0:
+            print(f"{prep_type:<7}{'change':<13}{'':>9}{cat['features'] - base['features']:>10}"
+                  f"{(cat['matrix_mb'] / base['matrix_mb'] - 1) * 100:>10.1f}%{(cat['fit_s'] / base['fit_s'] - 1) * 100:>8.1f}%"
+                  f"{cat['log_loss'] - base['log_loss']:>11.5f}")
+
+### END ENCODING COMPARISON ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare one hot and native categorical feature encodings for the EV/PP/SH/EN models")
+    parser.add_argument('--synthetic', type=int, default=0, help="Use this many synthetic games instead of the saved fixtures")
+    parser.add_argument('--seasons', nargs='+', type=int, help="Use stored season files in Data/PBP instead (starting years, e.g. 2022 2023)")
+    parser.add_argument('--data-root', default=os.path.dirname(os.path.dirname(bench_dir)), help="Folder holding Data/")
+    args = parser.parse_args()
+
+    # Synthetic Games And Stored Seasons Read From Data/ - Move To The Data Folder First
+    os.chdir(args.data_root)
+    games = None
+    if not args.seasons:
+        games = list(synthetic_games(args.synthetic)) if args.synthetic else list(load_fixtures(fixture_dir))
+    splits, roster = build_splits(games, args.seasons)
+    results = compare_encodings(splits, roster)
+    print_comparison(results)
+
+    os.makedirs(results_dir, exist_ok=True)
+    save_path = os.path.join(results_dir, f"encodings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(save_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results Saved | Path: {save_path}")
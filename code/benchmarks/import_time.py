@@ -0,0 +1,89 @@
+# Tools
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+code_dir = os.path.dirname(bench_dir)
+
+
+### IMPORT TIME CHECK - DEFINE ###
+
+# Every Pipeline Module (Each Must Import With No Data/ Folder And No Network)
+MODULES = [
+    'Sorted_Storage', 'Parquet_Store', 'Arrow_Catalog', 'On_Ice', 'PipelineProfiler', 'Load_All_PBP', 'Backfill_Queue', 'Game_Finalizer', 'Payload_Fingerprints', 'xG_Sample', 'LoadRosters', 'LoadSchedule', 'Build_xG_Features',
+    'xG_Cube', 'xG_Players', 'xG_Spatial', 'xG_Simulator', 'xG_Explain', 'xG_Monitor', 'xG_History', 'xG_Pipeline'
+]
+
+# Budget Per Module (Milliseconds Of Cumulative Import Time, Interpreter Startup Excluded)
+IMPORT_BUDGET_MS = 1000
+
+# 1) FUNCTION: Cumulative Import Time Of One Module In A Fresh Interpreter
+def import_time(module, repeat=3):
+    """This function will import module in a fresh python (-X importtime) run from an empty temporary folder, so any
+    import-time file read (Data/..., game_ids.pkl) fails the check. Returns the best of repeat runs with the module's
+    cumulative import time and its five heaviest direct imports"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([code_dir, os.environ.get('PYTHONPATH', '')]).rstrip(os.pathsep))
+    best = None
+    with tempfile.TemporaryDirectory() as empty_dir:
+        for _ in range(repeat):
+            tic = time.perf_counter()
+            proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', f"import {module}"], cwd=empty_dir, env=env, capture_output=True, text=True)
+            wall_ms = (time.perf_counter() - tic) * 1000
+            if proc.returncode != 0:
+                error = [line for line in proc.stderr.splitlines() if not line.startswith('import time:')]
+                return {'module': module, 'ok': False, 'error': error[-1] if error else f"exit {proc.returncode}"}
+
+            # "import time: self [us] | cumulative | imported package" - Children Are Printed (Indented) Before Their Parent
+            import_ms, children, direct = 0.0, [], []
+            for line in proc.stderr.splitlines():
+                if not line.startswith('import time:') or 'imported package' in line:
+                    continue
+                _, cumulative, name = line[len('import time:'):].split('|')
+                depth = (len(name) - len(name.lstrip(' '))) // 2
+                if depth == 1:
+                    children.append((name.strip(), int(cumulative) / 1000))
+                elif depth == 0:
+                    if name.strip() == module:
+                        import_ms, direct = int(cumulative) / 1000, children
+                    children = []
+            if (best is None) or (import_ms < best['import_ms']):
+                heaviest = sorted(direct, key=lambda t: t[1], reverse=True)[:5]
+                best = {'module': module, 'ok': True, 'import_ms': round(import_ms, 1), 'wall_ms': round(wall_ms, 1),
+                        'heaviest': [f"{name} {ms:.0f}ms" for name, ms in heaviest]}
+    return best
+
+# 2) FUNCTION: Check Every Module Against The Budget
+def check_imports(modules=MODULES, budget_ms=IMPORT_BUDGET_MS, repeat=3):
+    """This function will print import time per module and return the modules that failed to import or went over budget"""
+    print(f"================== Import Time (Budget {budget_ms} ms) ==================")
+    print(f"{'module':<20}{'import_ms':>11}{'wall_ms':>10}  heaviest imports")
+    failures = []
+    for module in modules:
+        result = import_time(module, repeat)
+        if not result['ok']:
+            failures.append(module)
+            print(f"{module:<20}{'FAILED':>11}{'':>10}  {result['error']}")
+            continue
+        flag = '  <-- OVER BUDGET' if result['import_ms'] > budget_ms else ''
+        if flag:
+            failures.append(module)
+        print(f"{module:<20}{result['import_ms']:>11.1f}{result['wall_ms']:>10.1f}  {', '.join(result['heaviest'])}{flag}")
+    return failures
+
+### END IMPORT TIME CHECK ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check every pipeline module imports without I/O and within the startup budget")
+    parser.add_argument('--modules', nargs='+', default=MODULES, help="Modules to check")
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS, help="Max cumulative import time per module")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per module (best is kept)")
+    args = parser.parse_args()
+
+    failures = check_imports(args.modules, args.budget_ms, args.repeat)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,61 @@
+# Tools
+import argparse
+import gzip
+import json
+import os
+
+from synthetic_games import synthetic_games
+
+
+### GAME FIXTURES - DEFINE ###
+
+# Path
+fixture_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 1) FUNCTION: Save One Game's Raw Payloads
+def save_fixture(game_id, pbp_payload, shift_payload, out_dir=fixture_dir):
+    """This function will write the gamecenter and shiftcharts payloads for one game as gzipped JSON"""
+    os.makedirs(out_dir, exist_ok=True)
+    for name, payload in [('pbp', pbp_payload), ('shifts', shift_payload)]:
+        with gzip.open(os.path.join(out_dir, f"{game_id}_{name}.json.gz"), 'wt', encoding='utf-8') as file:
+            json.dump(payload, file, separators=(',', ':'))
+
+# 2) FUNCTION: Record Real Games From The NHL API
+def record_games(game_ids, out_dir=fixture_dir):
+    """This function will request the play-by-play and shift chart payloads for each game_id and save them untouched"""
+    import requests
+
+    for i in game_ids:
+        pbp_link = 'https://api-web.nhle.com/v1/gamecenter/'+str(i)+'/play-by-play'
+        shift_link = "https://api.nhle.com/stats/rest/en/shiftcharts?cayenneExp=gameId="+str(i)
+        save_fixture(i, requests.get(pbp_link).json(), requests.get(shift_link).json(), out_dir)
+        print(f"GameID: {i} Recorded | Path: {out_dir}")
+
+# 3) FUNCTION: Read Every Saved Fixture
+def load_fixtures(in_dir=fixture_dir):
+    """This function will yield (game_id, pbp_payload, shift_payload) for every game saved in the fixture folder"""
+    game_ids = sorted({int(f.split('_')[0]) for f in os.listdir(in_dir) if f.endswith('_pbp.json.gz')})
+    for i in game_ids:
+        with gzip.open(os.path.join(in_dir, f"{i}_pbp.json.gz"), 'rt', encoding='utf-8') as file:
+            pbp_payload = json.load(file)
+        with gzip.open(os.path.join(in_dir, f"{i}_shifts.json.gz"), 'rt', encoding='utf-8') as file:
+            shift_payload = json.load(file)
+        yield i, pbp_payload, shift_payload
+
+### END GAME FIXTURES ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Save raw NHL API payloads (or synthetic stand-ins) as benchmark fixtures")
+    parser.add_argument('game_ids', nargs='*', type=int, help="Game IDs to record from the NHL API")
+    parser.add_argument('--synthetic', type=int, default=0, help="Write this many synthetic games instead (no network needed)")
+    parser.add_argument('--season', type=int, default=2023, help="First season of the synthetic games")
+    parser.add_argument('--out', default=fixture_dir, help="Fixture folder")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        for i, pbp_payload, shift_payload in synthetic_games(args.synthetic, season=args.season):
+            save_fixture(i, pbp_payload, shift_payload, args.out)
+            print(f"GameID: {i} Synthetic Fixture Saved | Plays: {len(pbp_payload['plays'])} | Shifts: {shift_payload['total']}")
+    else:
+        record_games(args.game_ids, args.out)
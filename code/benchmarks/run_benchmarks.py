@@ -0,0 +1,260 @@
+# Tools
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(bench_dir))
+sys.path.insert(0, bench_dir)
+
+from synthetic_games import synthetic_games, GAMES_PER_SEASON
+from record_fixtures import load_fixtures, fixture_dir
+
+
+### BENCHMARK SETTINGS ###
+
+# Sizes (Number Of Games - 'fixtures' Replays Every Saved Fixture)
+SIZES = {
+    'fixtures': None,
+    '1': 1,
+    '10': 10,
+    '100': 100,
+    'season': GAMES_PER_SEASON,
+    'ten_seasons': GAMES_PER_SEASON * 10
+}
+
+# Stages In Pipeline Order (Each Timed Separately, end_to_end Is Their Sum)
+STAGES = ['parse', 'reconcile_api_data', 'append_shift_data', 'concat', 'clean_pbp_data', 'index_input_data', 'split_by_strength', 'model_prep']
+
+# Paths
+results_dir = os.path.join(bench_dir, 'results')
+baseline_file = os.path.join(bench_dir, 'baseline.json')
+
+# Games Ingested Per Chunk (Payloads For Ten Seasons Do Not Fit In Memory At Once)
+CHUNK_GAMES = 100
+
+### END BENCHMARK SETTINGS ###
+
+### BENCHMARK RUNNER - DEFINE ###
+
+# 1) FUNCTION: Run Every Stage For One Size
+def run_size(size, data_root, chunk_games=CHUNK_GAMES, skip_sorted=True):
+    """This function will push n games through every pipeline stage and return one summary per stage.
+
+    skip_sorted = False makes every sort_if_needed sort (the pre sort-once behaviour) to measure the sorts it skips.
+
+    Ingest stages (parse -> reconcile_api_data -> append_shift_data) run per game in chunks. Feature stages run once per season
+    on the concatenated chunks, the same way the notebook builds its training frames. Payload generation is not timed.
+    """
+    os.chdir(data_root)
+    import polars as pl
+    import Load_All_PBP as loader
+    from Build_xG_Features import clean_pbp_data, index_input_data, split_by_strength, model_prep
+    from PipelineProfiler import start_run, end_run, stage
+    import Sorted_Storage
+
+    Sorted_Storage.SKIP_SORTED = skip_sorted
+
+    # Local Roster For model_prep (Same Columns As load_model_roster, No Network Read)
+    bench_roster = (
+        loader.ROSTER_DF
+        .select([pl.col('player_id').cast(pl.Utf8).alias('event_player_1_id'), 'hand_R', 'hand_L', 'pos_F', 'pos_D', 'pos_G'])
+        .unique()
+    )
+
+    if SIZES[size] is None:
+        games = load_fixtures(fixture_dir)
+    else:
+        games = synthetic_games(SIZES[size])
+
+    os.makedirs(results_dir, exist_ok=True)
+    run_name = f"benchmark_{size}" if skip_sorted else f"benchmark_{size}_always_sort"
+    profiler = start_run(run_name, log_path=os.path.join(results_dir, 'benchmark_stage_log.jsonl'), rss_interval=0.01)
+    run_id = profiler.run_id
+
+    def features(season_frames, season_stints):
+        stints = pl.concat(season_stints) if season_stints else None
+        with stage('bench.concat', rows_in=sum(df.height for df in season_frames)) as rec:
+            data = pl.concat(season_frames, how='diagonal')
+            rec['rows_out'] = data.height
+        with stage('bench.clean_pbp_data', rows_in=data.height) as rec:
+            data = clean_pbp_data(data)
+            rec['rows_out'] = data.height
+        with stage('bench.index_input_data', rows_in=data.height) as rec:
+            data = index_input_data(data, stints=stints)
+            rec['rows_out'] = data.height
+        with stage('bench.split_by_strength', rows_in=data.height) as rec:
+            splits = split_by_strength(data)
+            rec['rows_out'] = sum(df.height for df in splits)
+        with stage('bench.model_prep', rows_in=sum(df.height for df in splits)) as rec:
+            prepped = [model_prep(df, prep_type, roster=bench_roster) for df, prep_type in zip(splits, ['EV', 'PP', 'SH', 'EN'])]
+            rec['rows_out'] = sum(df.height for df in prepped)
+
+    n_games = 0
+    season_frames = []
+    season_stints = []
+    current_season = None
+    chunk = []
+    games = iter(games)
+    try:
+        while True:
+            chunk = [g for _, g in zip(range(chunk_games), games)]
+            if not chunk:
+                break
+            for i, pbp_payload, shift_payload in chunk:
+                season = int(str(i)[:4])
+                if (current_season is not None) and (season != current_season) and season_frames:
+                    features(season_frames, season_stints)
+                    season_frames = []
+                    season_stints = []
+                current_season = season
+
+                # Raw Bytes As They Come Off The Wire (Encoding Is Not Timed)
+                pbp_bytes = json.dumps(pbp_payload).encode()
+                shift_bytes = json.dumps(shift_payload).encode()
+
+                with stage('bench.parse', rows_in=len(pbp_payload.get('plays', [])), game_id=i) as rec:
+                    df = loader.align_and_cast_columns(loader.decode_pbp_payload(pbp_bytes, i), loader.raw_schema)
+                    rec['rows_out'] = df.height
+                with stage('bench.reconcile_api_data', rows_in=df.height, game_id=i) as rec:
+                    df = loader.reconcile_api_data(df)
+                    rec['rows_out'] = df.height
+                with stage('bench.append_shift_data', rows_in=df.height, game_id=i) as rec:
+                    df = loader.append_shift_data(df, shift_response=shift_bytes, stint_list=season_stints)
+                    rec['rows_out'] = df.height
+                season_frames.append(df)
+                n_games += 1
+        if season_frames:
+            features(season_frames, season_stints)
+    finally:
+        log_path = profiler.log_path
+        end_run()
+
+    return summarize_size(size, n_games, run_id, log_path)
+
+# 2) FUNCTION: Collapse The Stage Log Into One Row Per Stage
+def summarize_size(size, n_games, run_id, log_path):
+    """This function will sum wall time and rows and take the max peak RSS of every bench.* stage record for one run"""
+    stages = {}
+    with open(log_path) as file:
+        for line in file:
+            rec = json.loads(line)
+            if (rec['run_id'] != run_id) or (not rec['stage'].startswith('bench.')):
+                continue
+            name = rec['stage'][len('bench.'):]
+            agg = stages.setdefault(name, {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'rows_in': 0, 'rows_out': 0, 'peak_rss_mb': 0.0})
+            agg['calls'] += 1
+            agg['wall_s'] += rec['wall_s']
+            agg['cpu_s'] += rec['cpu_s']
+            agg['rows_in'] += rec['rows_in'] or 0
+            agg['rows_out'] += rec['rows_out'] or 0
+            agg['peak_rss_mb'] = max(agg['peak_rss_mb'], rec['peak_rss_mb'])
+
+    stages['end_to_end'] = {
+        'calls': 1,
+        'wall_s': sum(s['wall_s'] for s in stages.values()),
+        'cpu_s': sum(s['cpu_s'] for s in stages.values()),
+        'rows_in': stages.get('parse', {}).get('rows_in', 0),
+        'rows_out': stages.get('model_prep', {}).get('rows_out', 0),
+        'peak_rss_mb': max([s['peak_rss_mb'] for s in stages.values()] or [0.0])
+    }
+    for s in stages.values():
+        s['wall_s'] = round(s['wall_s'], 4)
+        s['cpu_s'] = round(s['cpu_s'], 4)
+        s['rows_per_s'] = round(s['rows_in'] / s['wall_s'], 1) if s['wall_s'] > 0 else None
+
+    return {
+        'size': size,
+        'n_games': n_games,
+        'run_id': run_id,
+        'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'stages': {name: stages[name] for name in STAGES + ['end_to_end'] if name in stages}
+    }
+
+# 3) FUNCTION: Flag Throughput/Memory Regressions Against The Baseline
+def compare_to_baseline(result, baseline, tolerance=0.15):
+    """This function will return (stage, metric, baseline, current) for every stage whose throughput dropped or
+    peak RSS grew by more than the tolerance versus the saved baseline for the same size"""
+    regressions = []
+    base = baseline.get(result['size'])
+    if base is None:
+        return regressions
+    for name, cur in result['stages'].items():
+        old = base['stages'].get(name)
+        if old is None:
+            continue
+        if old.get('rows_per_s') and cur.get('rows_per_s') and (cur['rows_per_s'] < old['rows_per_s'] * (1 - tolerance)):
+            regressions.append((name, 'rows_per_s', old['rows_per_s'], cur['rows_per_s']))
+        if old.get('peak_rss_mb') and (cur['peak_rss_mb'] > old['peak_rss_mb'] * (1 + tolerance)):
+            regressions.append((name, 'peak_rss_mb', old['peak_rss_mb'], cur['peak_rss_mb']))
+    return regressions
+
+# 4) FUNCTION: End-To-End Time Saved By Skipping Sorts
+def compare_sort_runs(always_sort, skip_sorted):
+    """This function will print wall time per stage with every sort forced vs with already-ordered sorts skipped"""
+    print(f"================== Sort-Once Savings: {skip_sorted['size']} ({skip_sorted['n_games']} Games) ==================")
+    print(f"{'stage':<22}{'always_sort_s':>16}{'skip_sorted_s':>16}{'saved_s':>12}{'saved_pct':>11}")
+    for name, cur in skip_sorted['stages'].items():
+        old = always_sort['stages'].get(name)
+        if old is None:
+            continue
+        saved = old['wall_s'] - cur['wall_s']
+        pct = (saved / old['wall_s'] * 100) if old['wall_s'] > 0 else 0.0
+        print(f"{name:<22}{old['wall_s']:>16.3f}{cur['wall_s']:>16.3f}{saved:>12.3f}{pct:>10.1f}%")
+
+def print_result(result, regressions):
+    flagged = {name for name, _, _, _ in regressions}
+    print(f"================== Benchmark: {result['size']} ({result['n_games']} Games) | Run: {result['run_id']} ==================")
+    print(f"{'stage':<22}{'calls':>7}{'wall_s':>12}{'rows_in':>12}{'rows/s':>14}{'peak_mb':>10}")
+    for name, s in result['stages'].items():
+        flag = '  <-- REGRESSION' if name in flagged else ''
+        print(f"{name:<22}{s['calls']:>7}{s['wall_s']:>12.3f}{s['rows_in']:>12}{str(s['rows_per_s']):>14}{s['peak_rss_mb']:>10.1f}{flag}")
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION | Stage: {name} | {metric}: {old} -> {new}")
+
+### END BENCHMARK RUNNER ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark each pipeline stage on fixtures or synthetic games")
+    parser.add_argument('--sizes', nargs='+', default=['fixtures', '10'], choices=list(SIZES), help="Sizes to run")
+    parser.add_argument('--data-root', default=os.path.dirname(os.path.dirname(bench_dir)), help="Folder holding Data/NHL_Rosters_2014_2024.csv")
+    parser.add_argument('--baseline', default=baseline_file, help="Baseline results (JSON keyed by size)")
+    parser.add_argument('--tolerance', type=float, default=0.15, help="Allowed throughput drop / peak memory growth before flagging")
+    parser.add_argument('--update-baseline', action='store_true', help="Save these results as the new baseline for each size")
+    parser.add_argument('--compare-sort', action='store_true', help="Also run each size with every sort forced and print the time skipped sorts save (e.g. --sizes season)")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    any_regressions = False
+    for size in args.sizes:
+        if args.compare_sort:
+            always_sort = run_size(size, args.data_root, skip_sorted=False)
+        result = run_size(size, args.data_root)
+        if args.compare_sort:
+            compare_sort_runs(always_sort, result)
+        regressions = compare_to_baseline(result, baseline, args.tolerance)
+        any_regressions = any_regressions or bool(regressions)
+        print_result(result, regressions)
+
+        save_path = os.path.join(results_dir, f"{result['run_id']}_{size}.json")
+        with open(save_path, 'w') as file:
+            json.dump(result, file, indent=2)
+        print(f"Results Saved | Path: {save_path}")
+
+        if args.update_baseline:
+            baseline[size] = result
+
+    if args.update_baseline:
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=2)
+        print(f"Baseline Updated | Path: {args.baseline}")
+
+    sys.exit(1 if (any_regressions and not args.update_baseline) else 0)
@@ -0,0 +1,82 @@
+# Tools
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+
+# Pipeline Modules Live One Folder Up (code/)
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+code_dir = os.path.dirname(bench_dir)
+sys.path.insert(0, code_dir)
+
+
+### SHARED TABLE MEMORY - DEFINE ###
+
+# Path
+results_dir = os.path.join(bench_dir, 'results')
+
+# Child Process: Open The Table One Way, Touch Every Numeric Column, Report Memory
+child_code = """
+import json, sys, psutil, polars as pl
+sys.path.insert(0, {code_dir!r})
+from Arrow_Catalog import open_table
+mode, name, parquet = sys.argv[1], sys.argv[2], sys.argv[3]
+data = pl.read_parquet(parquet) if mode == 'parquet' else open_table(name)
+total = sum(float(data[c].sum() or 0) for c, t in data.schema.items() if t.is_numeric())
+mem = psutil.Process().memory_full_info()
+print(json.dumps({{'rss_mb': mem.rss / 1e6, 'uss_mb': mem.uss / 1e6, 'check': total}}))
+input()
+"""
+
+# 1) FUNCTION: Memory Of n Processes Holding The Same Table At Once
+def process_memory(mode, name, parquet_path, n_procs):
+    """This function will start n_procs processes that each open the table (mode 'parquet' = private read_parquet copy,
+    'arrow' = mapped catalog file), wait until all of them hold it and return their rss/uss (uss = memory only that process
+    owns - shared mapped pages are not in it)"""
+    cmd = [sys.executable, '-c', child_code.format(code_dir=code_dir), mode, name, parquet_path]
+    procs = [subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True) for _ in range(n_procs)]
+    stats = [json.loads(proc.stdout.readline()) for proc in procs]
+    for proc in procs:
+        proc.communicate('\n')
+    return {
+        'mode': mode,
+        'procs': n_procs,
+        'rss_mb_total': round(sum(s['rss_mb'] for s in stats), 1),
+        'uss_mb_total': round(sum(s['uss_mb'] for s in stats), 1),
+        'uss_mb_per_proc': round(sum(s['uss_mb'] for s in stats) / n_procs, 1)
+    }
+
+# 2) FUNCTION: Private Copies vs Shared Mapped File
+def compare_sharing(parquet_path, name='bench_shared', n_procs=4):
+    import polars as pl
+    from Arrow_Catalog import publish_table
+
+    publish_table(name, pl.read_parquet(parquet_path))
+    results = [process_memory(mode, name, parquet_path, n_procs) for mode in ['parquet', 'arrow']]
+    print("================== Private read_parquet Copies vs Shared Arrow Map ==================")
+    print(f"{'mode':<9}{'procs':>7}{'rss_mb_total':>14}{'uss_mb_total':>14}{'uss_mb_per_proc':>17}")
+    for r in results:
+        print(f"{r['mode']:<9}{r['procs']:>7}{r['rss_mb_total']:>14.1f}{r['uss_mb_total']:>14.1f}{r['uss_mb_per_proc']:>17.1f}")
+    return results
+
+### END SHARED TABLE MEMORY ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare memory of processes reading private parquet copies vs one shared mapped Arrow file")
+    parser.add_argument('--parquet', required=True, help="Parquet file to share (e.g. Data/PBP/API_RAW_PBP_Data_2023.parquet)")
+    parser.add_argument('--procs', type=int, default=4, help="Processes holding the table at once")
+    parser.add_argument('--data-root', default=os.path.dirname(code_dir), help="Folder holding Data/")
+    args = parser.parse_args()
+
+    parquet_path = os.path.abspath(args.parquet)
+    os.chdir(args.data_root)
+    results = compare_sharing(parquet_path, n_procs=args.procs)
+
+    os.makedirs(results_dir, exist_ok=True)
+    save_path = os.path.join(results_dir, f"shared_tables_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    with open(save_path, 'w') as file:
+        json.dump(results, file, indent=2)
+    print(f"Results Saved | Path: {save_path}")
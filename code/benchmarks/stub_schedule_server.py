@@ -0,0 +1,77 @@
+# Tools
+import argparse
+import json
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+### STUB SCHEDULE SERVER - DEFINE ###
+
+# Default Script: game_id -> (date, gameType, gameScheduleState, gameState per poll - the last state repeats)
+DEFAULT_SCRIPT = {
+    2023020101: ('2023-11-01', 2, 'OK', ['LIVE', 'CRIT', 'FINAL', 'OFF']),
+    2023020102: ('2023-11-01', 2, 'OK', ['CRIT', 'OFF']),
+    2023020103: ('2023-11-01', 2, 'OK', ['FUT', 'PRE', 'LIVE', 'LIVE', 'CRIT', 'FINAL', 'OFF']),
+    2023020104: ('2023-11-01', 2, 'PPD', ['FUT']),
+    2023010105: ('2023-11-01', 1, 'OK', ['OFF']),
+    2023020090: ('2023-10-31', 2, 'OK', ['OFF'])
+}
+
+# 1) CLASS: Serves /v1/schedule/{date} Like api-web.nhle.com, Advancing Each Game One State Per Poll Of Its Date
+class StubSchedule:
+    """Scripted schedule - every request for a date moves that date's games one step along their gameState list, so a
+    finalizer polling it sees games go live and then final over a few cycles"""
+
+    def __init__(self, script=DEFAULT_SCRIPT):
+        self.script = script
+        self.polls = {}
+        self.lock = threading.Lock()
+
+    def payload(self, date):
+        with self.lock:
+            n = self.polls.get(date, 0)
+            self.polls[date] = n + 1
+        games = [
+            {'id': game_id, 'gameType': game_type, 'gameScheduleState': sched_state, 'gameState': states[min(n, len(states) - 1)]}
+            for game_id, (game_date, game_type, sched_state, states) in sorted(self.script.items()) if game_date == date
+        ]
+        return {'gameWeek': [{'date': date, 'games': games}]}
+
+    def serve(self, port=0):
+        """Start the server on a background thread. Returns (server, base url with a {date} placeholder)"""
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parts = self.path.strip('/').split('/')
+                if len(parts) != 3 or parts[:2] != ['v1', 'schedule']:
+                    self.send_error(404)
+                    return
+                body = json.dumps(stub.payload(parts[2])).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://127.0.0.1:{server.server_address[1]}/v1/schedule/{{date}}"
+
+### END STUB SCHEDULE SERVER ###
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a scripted NHL schedule for finalizer testing")
+    parser.add_argument('--port', type=int, default=8765, help="Port to listen on")
+    args = parser.parse_args()
+
+    server, url = StubSchedule().serve(args.port)
+    print(f"Stub Schedule Serving | URL: {url} (Ctrl+C To Stop)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
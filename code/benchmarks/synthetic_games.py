@@ -0,0 +1,334 @@
+# Tools
+import csv
+import os
+import random
+from datetime import date, timedelta
+
+
+### SYNTHETIC NHL API PAYLOADS - DEFINE ###
+
+# Path (Same Roster File Load_All_PBP.py Reads - Real Player IDs So Goalies/Shooters Join ROSTER_DF)
+roster_file = 'Data/NHL_Rosters_2014_2024.csv'
+
+# Teams (NHL API Team IDs)
+TEAMS = {
+    'NJD': 1, 'NYI': 2, 'NYR': 3, 'PHI': 4, 'PIT': 5, 'BOS': 6, 'BUF': 7, 'MTL': 8,
+    'OTT': 9, 'TOR': 10, 'CAR': 12, 'FLA': 13, 'TBL': 14, 'WSH': 15, 'CHI': 16, 'DET': 17,
+    'NSH': 18, 'STL': 19, 'CGY': 20, 'COL': 21, 'EDM': 22, 'VAN': 23, 'ANA': 24, 'DAL': 25,
+    'LAK': 26, 'SJS': 28, 'CBJ': 29, 'MIN': 30, 'WPG': 52, 'ARI': 53, 'VGK': 54, 'SEA': 55
+}
+
+# Games Per Regular Season (32 Teams x 82 Games / 2)
+GAMES_PER_SEASON = 1312
+
+# API Event Type Codes
+TYPE_CODES = {
+    'faceoff': 502, 'hit': 503, 'giveaway': 504, 'goal': 505, 'shot-on-goal': 506,
+    'missed-shot': 507, 'blocked-shot': 508, 'penalty': 509, 'stoppage': 516,
+    'period-start': 520, 'period-end': 521, 'game-end': 524, 'takeaway': 525
+}
+
+# Share Of Live Events (Roughly The Mix Seen In 2022-2023 PBP)
+EVENT_WEIGHTS = {
+    'shot-on-goal': 0.22, 'missed-shot': 0.11, 'blocked-shot': 0.12, 'hit': 0.18,
+    'giveaway': 0.07, 'takeaway': 0.05, 'stoppage': 0.23, 'penalty': 0.02
+}
+
+SHOT_TYPES = ['wrist', 'wrist', 'wrist', 'snap', 'snap', 'slap', 'backhand', 'tip-in', 'deflected', 'wrap-around']
+STOPPAGE_REASONS = ['icing', 'offside', 'puck-in-netting', 'goalie-stopped-after-sog', 'puck-frozen', 'tv-timeout']
+PENALTY_KEYS = ['tripping', 'hooking', 'slashing', 'holding', 'interference', 'roughing', 'high-sticking']
+FACEOFF_DOTS = [(0, 0), (69, 22), (69, -22), (-69, 22), (-69, -22), (20, 22), (20, -22), (-20, 22), (-20, -22)]
+
+# 1) FUNCTION: Read The Roster File Into Position Pools
+def load_player_pools(path=roster_file):
+    """This function will split the roster file into forward, defense and goalie pools of (player_id, first_name, last_name)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Roster file not found: {path} - run from the folder holding Data/ (see run_benchmarks.py --data-root)")
+    pools = {'F': [], 'D': [], 'G': []}
+    with open(path, newline='') as file:
+        for row in csv.DictReader(file):
+            player = (int(row['player_id']), row['first_name'], row['last_name'])
+            if row['pos_G'] == '1':
+                pools['G'].append(player)
+            elif row['pos_D'] == '1':
+                pools['D'].append(player)
+            else:
+                pools['F'].append(player)
+    return pools
+
+# 2) FUNCTION: Deal Players Out To All 32 Teams For A Season
+def build_team_rosters(pools, season, n_forwards=12, n_defense=6, n_goalies=2):
+    """This function will deal (seeded by season) 12 forwards, 6 defense and 2 goalies to every team"""
+    rng = random.Random(season)
+    dealt = {}
+    for pos, n in [('F', n_forwards), ('D', n_defense), ('G', n_goalies)]:
+        pool = list(pools[pos])
+        rng.shuffle(pool)
+        for t, abbrev in enumerate(TEAMS):
+            dealt.setdefault(abbrev, {})[pos] = [pool[(t * n + k) % len(pool)] for k in range(n)]
+    return dealt
+
+def mmss(seconds):
+    return f"{seconds // 60:02d}:{seconds % 60:02d}"
+
+# 3) CLASS: One Team's Bench - Rotates Lines And Tracks Penalties/Pulled Goalie
+class _Bench:
+    def __init__(self, rng, roster):
+        self.rng = rng
+        self.f_lines = [roster['F'][k:k + 3] for k in range(0, 12, 3)]
+        self.d_pairs = [roster['D'][k:k + 2] for k in range(0, 6, 2)]
+        self.goalie = roster['G'][0]
+        self.f_idx, self.d_idx = 0, 0
+        self.next_f, self.next_d = 0, 0
+        self.penalties = []
+        self.goalie_pulled = False
+
+    def reset_period(self):
+        self.f_idx, self.d_idx = 0, 0
+        self.next_f = self.rng.randint(35, 60)
+        self.next_d = self.rng.randint(40, 70)
+
+    def tick(self, s):
+        """Change lines on their shift clock and let expired penalties run out"""
+        if s >= self.next_f:
+            self.f_idx = (self.f_idx + self.rng.choice([1, 1, 1, 2])) % 4
+            self.next_f = s + self.rng.randint(35, 60)
+        if s >= self.next_d:
+            self.d_idx = (self.d_idx + 1) % 3
+            self.next_d = s + self.rng.randint(40, 70)
+        self.penalties = [end for end in self.penalties if end > s]
+
+    def on_ice(self, overtime=False):
+        """Skaters (list) and goalie (or None) currently on the ice"""
+        forwards = list(self.f_lines[self.f_idx])
+        defense = list(self.d_pairs[self.d_idx])
+        if overtime:
+            forwards, defense = forwards[:2], defense[:1]
+        n_down = min(len(self.penalties), 2)
+        if n_down:
+            forwards = forwards[:max(len(forwards) - n_down, 1)]
+        if self.goalie_pulled:
+            forwards.append(self.f_lines[(self.f_idx + 1) % 4][0])
+        return forwards + defense, (None if self.goalie_pulled else self.goalie)
+
+# 4) FUNCTION: Build One Game's Gamecenter + Shiftcharts Payloads
+def synthetic_game(game_id, seed=None, pools=None, rosters=None, event_gap=11.0):
+    """This function will simulate one game second by second and return (pbp_payload, shift_payload) shaped like the
+    api-web.nhle.com gamecenter play-by-play and api.nhle.com shiftcharts responses.
+
+    Every play carries on-ice players that match the shift chart (line changes, penalties, pulled goalies, 3v3 overtime)
+    so reconcile_api_data and append_shift_data exercise the same paths as real games.
+    event_gap is the mean number of seconds between live events (~11 gives ~320 plays per game, close to a real game).
+    """
+    rng = random.Random(game_id if seed is None else seed)
+    season_start = int(str(game_id)[:4])
+    game_type = int(str(game_id)[4:6])
+    if pools is None:
+        pools = load_player_pools()
+    if rosters is None:
+        rosters = build_team_rosters(pools, season_start)
+
+    home_abbr, away_abbr = rng.sample(list(TEAMS), 2)
+    teams = {'home': (TEAMS[home_abbr], home_abbr), 'away': (TEAMS[away_abbr], away_abbr)}
+    benches = {side: _Bench(rng, rosters[teams[side][1]]) for side in teams}
+    names = {p[0]: (p[1], p[2]) for side in teams for pos in ('F', 'D', 'G') for p in rosters[teams[side][1]][pos]}
+
+    plays = []
+    shifts = []
+    shift_counts = {}
+    score = {'home': 0, 'away': 0}
+    sog = {'home': 0, 'away': 0}
+    first_side = rng.choice(['left', 'right'])
+
+    def add_shift(side, player_id, period, start, end):
+        first, last = names[player_id]
+        shift_counts[player_id] = shift_counts.get(player_id, 0) + 1
+        shifts.append({
+            'id': game_id * 10000 + len(shifts), 'detailCode': 0, 'duration': mmss(end - start), 'endTime': mmss(end),
+            'eventDescription': None, 'eventDetails': None, 'eventNumber': None, 'firstName': first, 'gameId': game_id,
+            'hexValue': '#000000', 'lastName': last, 'period': period, 'playerId': player_id,
+            'shiftNumber': shift_counts[player_id], 'startTime': mmss(start),
+            'teamAbbrev': teams[side][1], 'teamId': teams[side][0], 'teamName': teams[side][1], 'typeCode': 517
+        })
+
+    def add_play(key, period, s, state, defending, **details):
+        period_type = 'REG' if period <= 3 else 'OT'
+        length = 300 if (period > 3 and game_type == 2) else 1200
+        plays.append({
+            'eventId': len(plays) + 1,
+            'period': period,
+            'periodDescriptor': {'number': period, 'periodType': period_type, 'maxRegulationPeriods': 3},
+            'timeInPeriod': mmss(s),
+            'timeRemaining': mmss(length - s),
+            'situationCode': state,
+            'homeTeamDefendingSide': defending,
+            'typeCode': TYPE_CODES[key],
+            'typeDescKey': key,
+            'sortOrder': (len(plays) + 1) * 10,
+            'details': details
+        })
+
+    # Regular Season: One 5 Minute 3v3 OT (No Shootout Plays). Playoffs: 20 Minute 5v5 OT Until A Goal
+    period = 0
+    while (period < 3) or ((score['home'] == score['away']) and (period < (4 if game_type == 2 else 8))):
+        period += 1
+        overtime = (period > 3) and (game_type == 2)
+        length = 300 if overtime else 1200
+        defending = first_side if period % 2 == 1 else ('right' if first_side == 'left' else 'left')
+        attack_dir = {'home': 1 if defending == 'left' else -1}
+        attack_dir['away'] = -attack_dir['home']
+
+        for bench in benches.values():
+            bench.reset_period()
+            bench.penalties = []
+            bench.goalie_pulled = False
+        open_shifts = {'home': {}, 'away': {}}
+
+        add_play('period-start', period, 0, '1551', defending)
+        sudden_death = False
+        for s in range(length + 1):
+            # a) Update Benches (Line Changes, Penalties, Late Goalie Pull)
+            for side, bench in benches.items():
+                bench.tick(s)
+                other = 'away' if side == 'home' else 'home'
+                bench.goalie_pulled = (period == 3) and (s >= 1140) and (0 < score[other] - score[side] <= 2)
+
+            # b) Open/Close Shifts Where The On-Ice Group Changed
+            on_ice = {}
+            for side, bench in benches.items():
+                skaters, goalie = bench.on_ice(overtime)
+                on_ice[side] = (skaters, goalie)
+                current = set(skaters) | ({goalie} if goalie else set())
+                current = {p[0] for p in current}
+                for pid in [p for p in open_shifts[side] if p not in current or s == length]:
+                    start = open_shifts[side].pop(pid)
+                    if s > start:
+                        add_shift(side, pid, period, start, s)
+                if s < length:
+                    for pid in current:
+                        open_shifts[side].setdefault(pid, s)
+            if s == length:
+                break
+
+            state = (f"{0 if on_ice['away'][1] is None else 1}{len(on_ice['away'][0])}"
+                     f"{len(on_ice['home'][0])}{0 if on_ice['home'][1] is None else 1}")
+
+            # c) Events At This Second
+            if s == 0:
+                home_c, away_c = on_ice['home'][0][0][0], on_ice['away'][0][0][0]
+                winner = rng.choice(['home', 'away'])
+                add_play('faceoff', period, s, state, defending, eventOwnerTeamId=teams[winner][0], xCoord=0, yCoord=0, zoneCode='N',
+                         winningPlayerId=home_c if winner == 'home' else away_c, losingPlayerId=away_c if winner == 'home' else home_c)
+                continue
+            if rng.random() > 1 / event_gap:
+                continue
+
+            key = rng.choices(list(EVENT_WEIGHTS), weights=list(EVENT_WEIGHTS.values()))[0]
+            side = rng.choice(['home', 'away'])
+            other = 'away' if side == 'home' else 'home'
+            team_id = teams[side][0]
+            shooter = rng.choice(on_ice[side][0])[0]
+            opponent = rng.choice(on_ice[other][0])[0]
+            goalie = on_ice[other][1][0] if on_ice[other][1] else None
+
+            if key in ('shot-on-goal', 'missed-shot', 'blocked-shot'):
+                x = attack_dir[side] * rng.randint(30, 88)
+                y = rng.randint(-38, 38)
+                shot_type = rng.choice(SHOT_TYPES)
+                if key == 'shot-on-goal' and rng.random() < (0.09 if goalie else 0.6):
+                    key = 'goal'
+                    score[side] += 1
+                    sog[side] += 1
+                    assists = rng.sample([p[0] for p in on_ice[side][0] if p[0] != shooter], k=min(rng.choice([0, 1, 2, 2]), len(on_ice[side][0]) - 1))
+                    add_play('goal', period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode='O', shotType=shot_type,
+                             scoringPlayerId=shooter, scoringPlayerTotal=rng.randint(1, 40),
+                             assist1PlayerId=assists[0] if len(assists) > 0 else None, assist1PlayerTotal=rng.randint(1, 40) if len(assists) > 0 else None,
+                             assist2PlayerId=assists[1] if len(assists) > 1 else None, assist2PlayerTotal=rng.randint(1, 40) if len(assists) > 1 else None,
+                             goalieInNetId=goalie, awayScore=score['away'], homeScore=score['home'])
+                    shifts.append({
+                        'id': game_id * 10000 + len(shifts), 'detailCode': 803, 'duration': None, 'endTime': mmss(s),
+                        'eventDescription': 'EVG', 'eventDetails': None, 'eventNumber': len(plays), 'firstName': names[shooter][0],
+                        'gameId': game_id, 'hexValue': '#000000', 'lastName': names[shooter][1], 'period': period, 'playerId': shooter,
+                        'shiftNumber': 0, 'startTime': mmss(s), 'teamAbbrev': teams[side][1], 'teamId': team_id, 'teamName': teams[side][1], 'typeCode': 505
+                    })
+                    if period > 3:
+                        sudden_death = True
+                        break
+                    add_play('faceoff', period, s, state, defending, eventOwnerTeamId=teams[side][0], xCoord=0, yCoord=0, zoneCode='N',
+                             winningPlayerId=on_ice[side][0][0][0], losingPlayerId=on_ice[other][0][0][0])
+                elif key == 'shot-on-goal':
+                    sog[side] += 1
+                    add_play(key, period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode='O', shotType=shot_type,
+                             shootingPlayerId=shooter, goalieInNetId=goalie, awaySOG=sog['away'], homeSOG=sog['home'])
+                elif key == 'missed-shot':
+                    add_play(key, period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode='O', shotType=shot_type,
+                             reason=rng.choice(['wide-of-net', 'high-and-wide', 'hit-crossbar']), shootingPlayerId=shooter, goalieInNetId=goalie)
+                else:
+                    add_play(key, period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode='O',
+                             shootingPlayerId=shooter, blockingPlayerId=opponent)
+            elif key in ('hit', 'giveaway', 'takeaway'):
+                x, y = rng.randint(-99, 99), rng.randint(-42, 42)
+                zone = 'O' if x * attack_dir[side] >= 25 else ('D' if x * attack_dir[side] <= -25 else 'N')
+                if key == 'hit':
+                    add_play(key, period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode=zone,
+                             hittingPlayerId=shooter, hitteePlayerId=opponent)
+                else:
+                    add_play(key, period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode=zone, playerId=shooter)
+            else:
+                if key == 'penalty':
+                    if overtime or len(benches[side].penalties) >= 2:
+                        continue
+                    x, y = rng.randint(-99, 99), rng.randint(-42, 42)
+                    zone = 'O' if x * attack_dir[side] >= 25 else ('D' if x * attack_dir[side] <= -25 else 'N')
+                    add_play(key, period, s, state, defending, eventOwnerTeamId=team_id, xCoord=x, yCoord=y, zoneCode=zone,
+                             typeCode='MIN', descKey=rng.choice(PENALTY_KEYS), duration=2, committedByPlayerId=shooter, drawnByPlayerId=opponent)
+                    benches[side].penalties.append(s + 120)
+                else:
+                    add_play(key, period, s, state, defending, reason=rng.choice(STOPPAGE_REASONS))
+                dot_x, dot_y = rng.choice(FACEOFF_DOTS)
+                winner = rng.choice(['home', 'away'])
+                loser = 'away' if winner == 'home' else 'home'
+                zone = 'O' if dot_x * attack_dir[winner] >= 25 else ('D' if dot_x * attack_dir[winner] <= -25 else 'N')
+                add_play('faceoff', period, s, state, defending, eventOwnerTeamId=teams[winner][0], xCoord=dot_x, yCoord=dot_y, zoneCode=zone,
+                         winningPlayerId=on_ice[winner][0][0][0], losingPlayerId=on_ice[loser][0][0][0])
+
+        # d) Close Shifts Cut Short By A Sudden Death Goal
+        if sudden_death:
+            for side in open_shifts:
+                for pid, start in open_shifts[side].items():
+                    if s > start:
+                        add_shift(side, pid, period, start, s)
+        end_s = s if sudden_death else length
+        add_play('period-end', period, end_s, '1551', defending)
+        if sudden_death:
+            break
+
+    add_play('game-end', period, end_s, '1551', defending)
+
+    pbp_payload = {
+        'id': game_id,
+        'season': int(f"{season_start}{season_start + 1}"),
+        'gameType': game_type,
+        'gameDate': (date(season_start, 10, 10) + timedelta(days=((game_id % 10000) - 1) * 180 // GAMES_PER_SEASON)).strftime('%Y-%m-%d'),
+        'awayTeam': {'id': teams['away'][0], 'abbrev': teams['away'][1]},
+        'homeTeam': {'id': teams['home'][0], 'abbrev': teams['home'][1]},
+        'plays': plays
+    }
+    shift_payload = {'data': shifts, 'total': len(shifts)}
+    return pbp_payload, shift_payload
+
+# 5) FUNCTION: Yield Many Games (A Season Is GAMES_PER_SEASON Games)
+def synthetic_games(n_games, season=2023, seed=0, path=roster_file):
+    """This function will yield (game_id, pbp_payload, shift_payload) for n_games regular season games,
+    rolling into the next season every GAMES_PER_SEASON games (n_games=13120 is ten full seasons)"""
+    pools = load_player_pools(path)
+    rosters = {}
+    for k in range(n_games):
+        season_start = season + k // GAMES_PER_SEASON
+        game_id = int(f"{season_start}02{(k % GAMES_PER_SEASON) + 1:04d}")
+        if season_start not in rosters:
+            rosters = {season_start: build_team_rosters(pools, season_start)}
+        pbp_payload, shift_payload = synthetic_game(game_id, seed=game_id + seed * (10 ** 10), pools=pools, rosters=rosters[season_start])
+        yield game_id, pbp_payload, shift_payload
+
+### END SYNTHETIC NHL API PAYLOADS ###
@@ -0,0 +1,224 @@
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import time
+
+
+### TEAM xG CUBE - DEFINE ###
+
+# Path
+cube_file = 'Data/Cube/Team_xG_Cube.parquet'
+
+# One Row Per Team x Game x Strength Model x Period (Home/Away Rides Along With The Game)
+cube_keys = ['season', 'season_type', 'game_id', 'game_date', 'team', 'opponent', 'is_home', 'model_type', 'period']
+
+# xG/Goals/Shots On Goal/Fenwick (Unblocked Attempts) For + Against And Time On Ice (Seconds)
+cube_measures = ['xGF', 'xGA', 'GF', 'GA', 'SF', 'SA', 'FF', 'FA', 'toi_for_s', 'toi_against_s']
+
+# 1) FUNCTION: Team-Perspective Rows From Scored Shots (PBP_xG)
+def shot_rows(pbp_xg):
+    """This function will turn every scored shot into one 'for' row (shooting team) and one 'against' row (defending team)"""
+    shots = (
+        pbp_xg
+        .select('season', 'season_type', 'game_id', 'game_date', 'period', 'model_type', 'event_type', 'xG',
+                'event_team_abbr', 'home_abbreviation', 'away_abbreviation')
+        .with_columns([
+            pl.col('game_id').cast(pl.Int64),
+            pl.col('period').cast(pl.Int32),
+            pl.col('xG').cast(pl.Float64),
+            pl.when(pl.col('event_team_abbr') == pl.col('home_abbreviation')).then(pl.col('away_abbreviation')).otherwise(pl.col('home_abbreviation')).alias('defending_abbr'),
+            pl.when(pl.col('event_type') == 'GOAL').then(pl.lit(1)).otherwise(pl.lit(0)).cast(pl.Int32).alias('goal'),
+            pl.when(pl.col('event_type').is_in(['GOAL', 'SHOT'])).then(pl.lit(1)).otherwise(pl.lit(0)).cast(pl.Int32).alias('sog')
+        ])
+    )
+
+    zero_f, zero_i = pl.lit(0.0).cast(pl.Float64), pl.lit(0).cast(pl.Int32)
+    shots_for = shots.select(
+        'season', 'season_type', 'game_id', 'game_date',
+        pl.col('event_team_abbr').alias('team'), pl.col('defending_abbr').alias('opponent'),
+        (pl.col('event_team_abbr') == pl.col('home_abbreviation')).alias('is_home'), 'model_type', 'period',
+        pl.col('xG').alias('xGF'), zero_f.alias('xGA'), pl.col('goal').alias('GF'), zero_i.alias('GA'),
+        pl.col('sog').alias('SF'), zero_i.alias('SA'), pl.lit(1).cast(pl.Int32).alias('FF'), zero_i.alias('FA'),
+        zero_f.alias('toi_for_s'), zero_f.alias('toi_against_s')
+    )
+    shots_against = shots.select(
+        'season', 'season_type', 'game_id', 'game_date',
+        pl.col('defending_abbr').alias('team'), pl.col('event_team_abbr').alias('opponent'),
+        (pl.col('defending_abbr') == pl.col('home_abbreviation')).alias('is_home'), 'model_type', 'period',
+        zero_f.alias('xGF'), pl.col('xG').alias('xGA'), zero_i.alias('GF'), pl.col('goal').alias('GA'),
+        zero_i.alias('SF'), pl.col('sog').alias('SA'), zero_i.alias('FF'), pl.lit(1).cast(pl.Int32).alias('FA'),
+        zero_f.alias('toi_for_s'), zero_f.alias('toi_against_s')
+    )
+    return pl.concat([shots_for, shots_against])
+
+# 2) FUNCTION: Team-Perspective Time On Ice From The Stint Table (Data/Stints)
+def toi_rows(stints, games):
+    """This function will split stint seconds by the strength model each team was shooting in (for) or defending (against).
+    EN = opponent's goalie pulled, otherwise EV/PP/SH by skater counts - the same four states the xG models are split by"""
+    def state(team_sk, opp_sk, opp_goalie):
+        return (
+            pl.when(pl.col(opp_goalie).is_null()).then(pl.lit('EN'))
+              .when(pl.col(team_sk) == pl.col(opp_sk)).then(pl.lit('EV'))
+              .when(pl.col(team_sk) > pl.col(opp_sk)).then(pl.lit('PP'))
+              .otherwise(pl.lit('SH'))
+        )
+
+    data = (
+        stints
+        .select(pl.col('game_id').cast(pl.Int64), pl.col('period').cast(pl.Int32), pl.col('stint_seconds').cast(pl.Float64),
+                'home_skater_count', 'away_skater_count', 'home_goalie', 'away_goalie')
+        .join(games, on='game_id', how='inner')
+        .with_columns([
+            state('home_skater_count', 'away_skater_count', 'away_goalie').alias('home_state'),
+            state('away_skater_count', 'home_skater_count', 'home_goalie').alias('away_state')
+        ])
+    )
+
+    zero_f, zero_i = pl.lit(0.0).cast(pl.Float64), pl.lit(0).cast(pl.Int32)
+    frames = []
+    for side, other in [('home', 'away'), ('away', 'home')]:
+        for kind, model_col in [('for', f'{side}_state'), ('against', f'{other}_state')]:
+            frames.append(data.select(
+                'season', 'season_type', 'game_id', 'game_date',
+                pl.col(f'{side}_abbreviation').alias('team'), pl.col(f'{other}_abbreviation').alias('opponent'),
+                pl.lit(side == 'home').alias('is_home'), pl.col(model_col).alias('model_type'), 'period',
+                zero_f.alias('xGF'), zero_f.alias('xGA'), zero_i.alias('GF'), zero_i.alias('GA'),
+                zero_i.alias('SF'), zero_i.alias('SA'), zero_i.alias('FF'), zero_i.alias('FA'),
+                (pl.col('stint_seconds') if kind == 'for' else zero_f).alias('toi_for_s'),
+                (pl.col('stint_seconds') if kind == 'against' else zero_f).alias('toi_against_s')
+            ))
+    return pl.concat(frames)
+
+# 3) FUNCTION: Aggregate Shots (+ Optional Stints) Into Cube Rows
+def build_cube_rows(pbp_xg, stints=None):
+    """This function will aggregate scored shots (and stint TOI when passed) to one row per cube key"""
+    rows = [shot_rows(pbp_xg)]
+    if stints is not None:
+        games = (
+            pbp_xg
+            .select(pl.col('game_id').cast(pl.Int64), 'season', 'season_type', 'game_date', 'home_abbreviation', 'away_abbreviation')
+            .unique(subset=['game_id'])
+        )
+        rows.append(toi_rows(stints, games).select(rows[0].columns))
+
+    cube = (
+        pl.concat(rows)
+        .group_by(cube_keys)
+        .agg([pl.col(m).sum() for m in cube_measures])
+    )
+    if stints is None:
+        cube = cube.with_columns([pl.lit(None).cast(pl.Float64).alias(m) for m in ['toi_for_s', 'toi_against_s']])
+    return cube.sort('game_id', 'team', 'period', 'model_type')
+
+# 4) FUNCTION: Add Newly Scored Games To The Stored Cube
+def update_cube(pbp_xg, stints=None, cube_path=cube_file, rebuild_games=None):
+    """This function will aggregate only the games in pbp_xg that are not already in the cube, append them and save.
+
+    rebuild_games: Optional game_ids to drop from the cube and re-aggregate (e.g. after re-scoring a game with a new model)
+    """
+    start_time = time.time()
+    rebuild_games = list(rebuild_games or [])
+    cube = None
+    done_games = []
+    if os.path.exists(cube_path):
+        cube = pl.read_parquet(cube_path)
+        if rebuild_games:
+            cube = cube.filter(~pl.col('game_id').is_in(rebuild_games))
+        done_games = cube['game_id'].unique().to_list()
+
+    new_shots = pbp_xg.filter(~pl.col('game_id').cast(pl.Int64).is_in(done_games))
+    if new_shots.height == 0:
+        print(f"xG Cube Up To Date: {len(done_games)} Games | Path: {cube_path}")
+        return cube
+
+    new_games = new_shots['game_id'].cast(pl.Int64).unique()
+    new_stints = None if stints is None else stints.filter(pl.col('game_id').cast(pl.Int64).is_in(new_games))
+    rows = build_cube_rows(new_shots, new_stints)
+
+    cube = rows if cube is None else pl.concat([cube, rows.select(cube.columns)])
+    os.makedirs(os.path.dirname(cube_path), exist_ok=True)
+    cube.write_parquet(cube_path, use_pyarrow=True)
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"xG Cube Updated: {len(new_games)} New Games | {rows.height} Rows | {cube['game_id'].n_unique()} Total Games in {elap_time} Seconds | Path: {cube_path}")
+    return cube
+
+### END TEAM xG CUBE ###
+
+### CUBE QUERIES - DEFINE ###
+
+# 4b) FUNCTION: Cube Rows For A Season / Season Type / Each Team's Last N Games
+def filter_cube(cube, season=None, season_type='R', last_n_games=None, exclude_model_types=['EN']):
+    """This function will drop the excluded strength models, keep one season and season type (None keeps all) and, when
+    last_n_games is set, each team's most recent n games (rolling form). Shared by team_xg_table and xG_Simulator.team_rates"""
+    data = cube.filter(~pl.col('model_type').is_in(exclude_model_types))
+    if season is not None:
+        data = data.filter(pl.col('season') == season)
+    if season_type is not None:
+        data = data.filter(pl.col('season_type') == season_type)
+    if last_n_games is not None:
+        recent = (
+            data
+            .select('team', 'game_id', 'game_date')
+            .unique()
+            .with_columns(pl.col('game_date').rank('ordinal', descending=True).over('team').alias('game_rank'))
+            .filter(pl.col('game_rank') <= last_n_games)
+            .select('team', 'game_id')
+        )
+        data = data.join(recent, on=['team', 'game_id'], how='inner')
+    return data
+
+# 5) FUNCTION: Team xG Table (Off/Def/Pythagorean) From The Cube
+def team_xg_table(cube, season=None, season_type='R', last_n_games=None, exclude_model_types=['EN'], pythag_exp=1.86):
+    """This function will build the NHL_Stats team table (xG/goals for and against, differences and pythagorean win %)
+    from the cube. last_n_games limits each team to its most recent n games (rolling form)"""
+    data = filter_cube(cube, season, season_type, last_n_games, exclude_model_types)
+
+    return (
+        data
+        .group_by('team')
+        .agg([
+            pl.col('xGF').sum().alias('xGoals_For'),
+            pl.col('GF').sum().alias('Goals_For'),
+            pl.col('xGA').sum().alias('xGoals_Against'),
+            pl.col('GA').sum().alias('Goals_Against')
+        ])
+        .with_columns([
+            (pl.col('Goals_For') - pl.col('xGoals_For')).alias('O_Diff_Over_Under'),
+            (pl.col('Goals_Against') - pl.col('xGoals_Against')).alias('D_Diff_Over_Under'),
+            (pl.col('xGoals_For') - pl.col('xGoals_Against')).alias('xG_Difference'),
+            (pl.col('Goals_For') - pl.col('Goals_Against')).alias('G_Difference')
+        ])
+        .with_columns([
+            (pl.col('G_Difference') - (pl.col('xG_Difference'))).alias('Diff_Over_Under'),
+            ((pl.col('xGoals_For').pow(pythag_exp)) / ((pl.col('xGoals_For').pow(pythag_exp)) + (pl.col('xGoals_Against').pow(pythag_exp)))).alias('xGWin_Pct'),
+            ((pl.col('Goals_For').pow(pythag_exp)) / ((pl.col('Goals_For').pow(pythag_exp)) + (pl.col('Goals_Against').pow(pythag_exp)))).alias('GWin_Pct')
+        ])
+        .select('team', 'xGoals_For', 'Goals_For', 'O_Diff_Over_Under', 'xGoals_Against', 'Goals_Against', 'D_Diff_Over_Under',
+                'xG_Difference', 'G_Difference', 'Diff_Over_Under', 'xGWin_Pct', 'GWin_Pct')
+        .sort('xGWin_Pct', descending=True)
+    )
+
+# 6) FUNCTION: Per-Game Team Rates (Shots, xG And Goals Per 60 When TOI Is Stored)
+def team_game_log(cube, team, season=None, model_types=None):
+    """This function will return one row per game for a team with xGF/xGA/GF/GA/SF/SA and per-60 rates (if the cube has TOI)"""
+    data = cube.filter(pl.col('team') == team)
+    if season is not None:
+        data = data.filter(pl.col('season') == season)
+    if model_types is not None:
+        data = data.filter(pl.col('model_type').is_in(model_types))
+
+    return (
+        data
+        .group_by(['season', 'game_id', 'game_date', 'team', 'opponent', 'is_home'])
+        .agg([pl.col(m).sum() for m in cube_measures])
+        .with_columns([
+            (pl.col('xGF') * 3600 / pl.col('toi_for_s')).alias('xGF_60'),
+            (pl.col('xGA') * 3600 / pl.col('toi_against_s')).alias('xGA_60')
+        ])
+        .sort('game_date')
+    )
+
+### END CUBE QUERIES ###
@@ -0,0 +1,188 @@
+# Arrays
+import numpy as np
+
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+
+### PER-SHOT CONTRIBUTIONS - DEFINE ###
+
+# Path (One File Per Strength Model)
+contrib_dir = 'Data/Contributions'
+
+# Shot Key (Same As The Scored Shot Table)
+contrib_keys = ['season', 'game_id', 'event_idx']
+
+# Rows Per Worker Task (Bounds Memory: chunk_rows x (features + 1) float32 Per Task)
+CHUNK_ROWS = 50_000
+
+# Models Loaded Once Per Worker Process (Set By _init_worker)
+_WORKER_MODELS = {}
+
+# 1) FUNCTION: Booster Bytes + Feature Names (Picklable, Sent Once To Each Worker)
+def model_payload(model):
+    """This function will return (raw ubj bytes, feature names) for an XGBClassifier or Booster"""
+    booster = model.get_booster() if hasattr(model, 'get_booster') else model
+    return bytes(booster.save_raw('ubj')), list(booster.feature_names)
+
+def _init_worker(payloads, n_threads):
+    import xgboost as xgb
+
+    for model_type, (raw, names) in payloads.items():
+        booster = xgb.Booster()
+        booster.load_model(bytearray(raw))
+        booster.set_param({'nthread': n_threads})
+        _WORKER_MODELS[model_type] = (booster, names)
+
+def _contrib_chunk(model_type, features):
+    import xgboost as xgb
+
+    booster, names = _WORKER_MODELS[model_type]
+    dmat = xgb.DMatrix(features[names], feature_names=names, enable_categorical=True)
+    return booster.predict(dmat, pred_contribs=True).astype(np.float32)
+
+# 2) FUNCTION: Key + Feature Chunks From A Pandas Or Polars Frame
+def feature_chunks(data, names, chunk_rows=CHUNK_ROWS):
+    """This function will yield (polars keys, pandas features) per chunk. Pandas frames are sliced as is so category codes
+    match the ones the model was trained on"""
+    if isinstance(data, pl.DataFrame):
+        for offset in range(0, data.height, chunk_rows):
+            chunk = data.slice(offset, chunk_rows)
+            yield chunk.select(contrib_keys), chunk.select(names).to_pandas()
+    else:
+        for offset in range(0, len(data), chunk_rows):
+            chunk = data.iloc[offset:offset + chunk_rows]
+            yield pl.from_pandas(chunk[contrib_keys].reset_index(drop=True)), chunk[names]
+
+# 3) FUNCTION: SHAP Contributions For Every Shot, Chunked Across Worker Processes
+def shot_contributions(frames, models, n_workers=None, chunk_rows=CHUNK_ROWS, n_threads=1):
+    """This function will compute per-shot feature contributions (XGBoost pred_contribs, i.e. exact TreeSHAP in log-odds) for
+    every strength model at once.
+
+    frames: {model_type: feature frame with season/game_id/event_idx + the model's features (pandas or polars)}
+    models: {model_type: XGBClassifier or Booster}
+    Chunks from every model go to one process pool (spawned, each worker loads the models once and runs n_threads threads).
+    Returns {model_type: polars frame of keys + model_type + contrib_{feature} (Float32) + contrib_bias}. The contributions of a
+    shot sum to its log-odds, so xG = 1 / (1 + exp(-sum))
+    """
+    payloads = {model_type: model_payload(models[model_type]) for model_type in frames}
+    tasks = []
+    with ProcessPoolExecutor(max_workers=n_workers, mp_context=mp.get_context('spawn'), initializer=_init_worker, initargs=(payloads, n_threads)) as pool:
+        for model_type, data in frames.items():
+            for keys, features in feature_chunks(data, payloads[model_type][1], chunk_rows):
+                tasks.append((model_type, keys, pool.submit(_contrib_chunk, model_type, features)))
+
+        parts = {model_type: [] for model_type in frames}
+        for model_type, keys, future in tasks:
+            cols = [f"contrib_{name}" for name in payloads[model_type][1]] + ['contrib_bias']
+            contribs = pl.DataFrame(future.result(), schema=cols, orient='row')
+            parts[model_type].append(keys.with_columns(pl.lit(model_type).alias('model_type')).hstack(contribs))
+
+    return {model_type: pl.concat(p) for model_type, p in parts.items() if p}
+
+# 4) FUNCTION: Add Newly Scored Games To The Stored Contribution Files
+def update_contributions(frames, models, save_dir=contrib_dir, rebuild_games=None, **kwargs):
+    """This function will compute contributions only for games not already in Data/Contributions/Contrib_{model_type}.parquet,
+    append them and save. kwargs are passed to shot_contributions (n_workers, chunk_rows, n_threads).
+
+    rebuild_games: Optional game_ids to drop and recompute. A stored file whose columns no longer match the model's features
+    (e.g. after retraining with new features) is rebuilt from scratch
+    """
+    start_time = time.time()
+    rebuild_games = list(rebuild_games or [])
+    stored, new_frames = {}, {}
+    for model_type, data in frames.items():
+        path = os.path.join(save_dir, f"Contrib_{model_type}.parquet")
+        done_games = []
+        if os.path.exists(path):
+            cols = contrib_keys + ['model_type'] + [f"contrib_{name}" for name in model_payload(models[model_type])[1]] + ['contrib_bias']
+            stored[model_type] = pl.read_parquet(path)
+            if stored[model_type].columns != cols:
+                print(f"Stored Contributions Do Not Match The {model_type} Model Features - Rebuilding | Path: {path}")
+                del stored[model_type]
+            else:
+                stored[model_type] = stored[model_type].filter(~pl.col('game_id').is_in(rebuild_games))
+                done_games = stored[model_type]['game_id'].unique().to_list()
+
+        if isinstance(data, pl.DataFrame):
+            data = data.filter(~pl.col('game_id').is_in(done_games))
+            n_rows = data.height
+        else:
+            data = data[~data['game_id'].isin(done_games)]
+            n_rows = len(data)
+        if n_rows:
+            new_frames[model_type] = data
+        else:
+            print(f"{model_type} Contributions Up To Date: {len(done_games)} Games | Path: {path}")
+
+    out = dict(stored)
+    if new_frames:
+        new_rows = shot_contributions(new_frames, models, **kwargs)
+        os.makedirs(save_dir, exist_ok=True)
+        for model_type, rows in new_rows.items():
+            path = os.path.join(save_dir, f"Contrib_{model_type}.parquet")
+            out[model_type] = rows if model_type not in stored else pl.concat([stored[model_type], rows])
+            out[model_type].write_parquet(path, use_pyarrow=True)
+            print(f"{model_type} Contributions Updated: {rows['game_id'].n_unique()} New Games | {rows.height} Shots | {out[model_type].height} Total Shots | Path: {path}")
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"Shot Contributions Done in {elap_time} Seconds")
+    return out
+
+### END PER-SHOT CONTRIBUTIONS ###
+
+### CONTRIBUTION QUERIES - DEFINE ###
+
+# 5) FUNCTION: Why Was This Shot x xG (A Lookup, No Model Needed)
+def explain_shot(season, game_id, event_idx, model_types=['EV', 'PP', 'SH', 'EN'], save_dir=contrib_dir, top_n=None):
+    """This function will read one shot's stored contributions (row groups filtered by the key) and return one row per feature
+    sorted by absolute contribution, with the running log-odds and the shot's xG rebuilt from their sum"""
+    for model_type in model_types:
+        path = os.path.join(save_dir, f"Contrib_{model_type}.parquet")
+        if not os.path.exists(path):
+            continue
+        row = (
+            pl.scan_parquet(path)
+            .filter((pl.col('season') == season) & (pl.col('game_id') == game_id) & (pl.col('event_idx') == event_idx))
+            .collect()
+        )
+        if row.height == 0:
+            continue
+
+        contribs = (
+            row
+            .drop(contrib_keys + ['model_type'])
+            .melt(variable_name='feature', value_name='contribution')
+            .with_columns(pl.col('feature').str.replace('^contrib_', ''))
+        )
+        log_odds = float(contribs['contribution'].sum())
+        print(f"Shot {game_id}-{event_idx} | Model: {model_type} | xG: {1 / (1 + np.exp(-log_odds)):.3f} | Log-Odds: {log_odds:.3f}")
+        contribs = (
+            contribs
+            .sort(pl.col('contribution').abs(), descending=True)
+            .with_columns(pl.col('contribution').cum_sum().alias('cum_log_odds'))
+        )
+        return contribs.head(top_n) if top_n else contribs
+    raise ValueError(f"No stored contributions for shot {season}-{game_id}-{event_idx}")
+
+# 6) FUNCTION: Mean Absolute Contribution Per Feature (Global Importance From The Same Table)
+def contribution_summary(contribs, by=None):
+    """This function will average |contribution| per feature (optionally per group, e.g. by='season') across stored shots"""
+    cols = [c for c in contribs.columns if c.startswith('contrib_') and c != 'contrib_bias']
+    keys = [by] if isinstance(by, str) else list(by or [])
+    data = contribs.select(keys + [pl.col(c).abs().alias(c[len('contrib_'):]) for c in cols])
+    long = data.melt(id_vars=keys, variable_name='feature', value_name='mean_abs_contribution')
+    return (
+        long
+        .group_by(keys + ['feature'])
+        .agg(pl.col('mean_abs_contribution').mean())
+        .sort(keys + ['mean_abs_contribution'], descending=[False] * len(keys) + [True])
+    )
+
+### END CONTRIBUTION QUERIES ###
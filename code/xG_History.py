@@ -0,0 +1,216 @@
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import time
+
+
+### SHOOTER / GOALIE HISTORY - DEFINE ###
+
+# Path (One State File Per Season - Rows For The Games Of That Season, Carrying Career Totals Forward From Earlier Files)
+history_dir = 'Data/History'
+
+# Unblocked Attempts (Blocked Shots Are Credited To The Blocker, Not The Shooter)
+history_events = ['GOAL', 'SHOT', 'MISSED_SHOT']
+
+# Rolling Window (Last N Games The Player Shot / Faced A Shot In)
+ROLL_GAMES = 20
+
+# Shrinkage - Rates Are (Goals + K x League Rate) / (Attempts + K), So Small Samples Sit Near The League Rate
+SHOOTER_K = 100
+GOALIE_K = 300
+LEAGUE_FENWICK_SH_PCT = 0.065
+
+# One Row Per (role, player_id, game_id) - g_ = That Game, cum_ = Career Through It, szn_ = Season Through It, roll_ = Last ROLL_GAMES Through It
+history_keys = ['role', 'player_id', 'season', 'game_id', 'game_date']
+history_stats = ['shots', 'goals', 'xg']
+
+def history_path(season, save_dir=history_dir):
+    return os.path.join(save_dir, f"Player_History_{season}.parquet")
+
+def history_files(seasons, save_dir=history_dir):
+    """Stored season state files for the seasons passed (missing seasons are skipped)"""
+    return [history_path(s, save_dir) for s in sorted(seasons) if os.path.exists(history_path(s, save_dir))]
+
+def stored_seasons(save_dir=history_dir):
+    if not os.path.isdir(save_dir):
+        return []
+    return sorted(int(f[len('Player_History_'):-len('.parquet')]) for f in os.listdir(save_dir) if f.startswith('Player_History_') and f.endswith('.parquet'))
+
+# 1) FUNCTION: Shots -> Per-Game Shooter And Goalie Rows
+def history_game_rows(shots, xg_col=None):
+    """This function will total unblocked attempts, goals and xG (if xg_col is passed, else null) per shooter per game and per
+    goalie faced per game (the goalie in net for the other side). Needs season, game_id, game_date, event_type,
+    event_player_1_id, event_team_type, home_goalie, away_goalie"""
+    game_date = pl.col('game_date').str.to_date() if shots.schema['game_date'] == pl.Utf8 else pl.col('game_date').cast(pl.Date)
+    base = (
+        shots
+        .filter(pl.col('event_type').is_in(history_events))
+        .select([
+            'season', pl.col('game_id').cast(pl.Int64), game_date.alias('game_date'),
+            pl.col('event_player_1_id').cast(pl.Utf8).alias('shooter_id'),
+            pl.when(pl.col('event_team_type') == 'home').then(pl.col('away_goalie')).otherwise(pl.col('home_goalie')).cast(pl.Utf8).alias('goalie_id'),
+            (pl.col('event_type') == 'GOAL').cast(pl.Int32).alias('goal'),
+            (pl.col(xg_col).cast(pl.Float64) if xg_col else pl.lit(None).cast(pl.Float64)).alias('xg')
+        ])
+    )
+    frames = []
+    for role, id_col in [('shooter', 'shooter_id'), ('goalie', 'goalie_id')]:
+        frames.append(
+            base
+            .filter(pl.col(id_col).is_not_null() & (pl.col(id_col) != ''))
+            .group_by([pl.col(id_col).alias('player_id'), 'season', 'game_id', 'game_date'])
+            .agg([
+                pl.col('goal').count().cast(pl.Int32).alias('g_shots'),
+                pl.col('goal').sum().cast(pl.Int32).alias('g_goals'),
+                pl.col('xg').sum().alias('g_xg')
+            ])
+            .with_columns(pl.lit(role).alias('role'))
+        )
+    return pl.concat(frames).select(history_keys + [f"g_{s}" for s in history_stats])
+
+# 2) FUNCTION: Carry Cumulative / Season / Rolling State Onto New Game Rows
+def roll_history(prior, new_rows, roll_games=ROLL_GAMES):
+    """This function will compute cum_/szn_/roll_ columns and game_n for new_rows using only each player's last roll_games
+    stored rows (prior = earlier state rows, any seasons). Cost grows with the new games, not with career length.
+
+    prior rows are never changed - new games dated on or before a player's last stored game are a backfill and should go
+    through a rebuild of the season (update_history(..., rebuild=True))"""
+    group = ['role', 'player_id']
+    state_cols = history_keys + ['game_n'] + [f"{p}_{s}" for p in ['g', 'cum', 'szn', 'roll'] for s in history_stats]
+    tail = (
+        prior
+        .join(new_rows.select(group).unique(), on=group, how='semi')
+        .sort(group + ['game_date', 'game_id'])
+        .group_by(group, maintain_order=True)
+        .tail(roll_games)
+    ) if prior is not None else None
+
+    work = pl.concat(
+        ([tail.select(state_cols).with_columns(pl.lit(False).alias('_new'))] if tail is not None else [])
+        + [new_rows.with_columns(pl.lit(True).alias('_new'))],
+        how='diagonal'
+    ).sort(group + ['game_date', 'game_id'])
+
+    # First Build (Nothing Stored) - Empty State Columns So The Carried Values Are 0
+    work = work.with_columns([
+        pl.lit(None).cast(pl.Int32 if c == 'game_n' else work.schema[f"g_{c.split('_', 1)[1]}"]).alias(c)
+        for c in state_cols if c not in work.columns
+    ])
+
+    # New Rows Continue From The Player's Last Stored Row - Stored (Tail) Rows Keep Their Own Values
+    is_new = pl.col('_new').cast(pl.Int32)
+    carried = lambda col, over: pl.col(col).filter(~pl.col('_new')).last().over(over).fill_null(0)
+    continued = lambda col, value: pl.when(pl.col('_new')).then(value).otherwise(pl.col(col)).alias(col)
+    work = (
+        work
+        .with_columns(
+            [continued('game_n', (is_new.cum_sum().over(group) + carried('game_n', group)).cast(pl.Int32))]
+            + [continued(f"cum_{s}", (pl.col(f"g_{s}") * is_new).cum_sum().over(group) + carried(f"cum_{s}", group)) for s in history_stats]
+            + [continued(f"szn_{s}", (pl.col(f"g_{s}") * is_new).cum_sum().over(group + ['season']) + carried(f"szn_{s}", group + ['season'])) for s in history_stats]
+        )
+        # Last roll_games Games = Career Through This Game - Career Through The Game roll_games Back (The Tail Holds Exactly Those Rows)
+        .with_columns([(pl.col(f"cum_{s}") - pl.col(f"cum_{s}").shift(roll_games).over(group).fill_null(0)).alias(f"roll_{s}") for s in history_stats])
+    )
+    return work.filter(pl.col('_new')).select(state_cols)
+
+# 3) FUNCTION: Add Newly Loaded Games To A Season's History State
+def update_history(shots, season, save_dir=history_dir, xg_col=None, roll_games=ROLL_GAMES, rebuild=False):
+    """This function will load Data/History/Player_History_{season}.parquet (if it exists), compute rows only for games not
+    already in it (state carried from the stored rows of this and every earlier season file) and save.
+
+    rebuild = True recomputes the whole season (e.g. after an earlier season file changed or games were backfilled)"""
+    start_time = time.time()
+    path = history_path(season, save_dir)
+    stored = pl.read_parquet(path) if (os.path.exists(path) and not rebuild) else None
+    done_games = stored['game_id'].unique().to_list() if stored is not None else []
+
+    new_rows = history_game_rows(shots.filter(~pl.col('game_id').cast(pl.Int64).is_in(done_games)), xg_col=xg_col)
+    if new_rows.height == 0:
+        print(f"History {season} Up To Date: {len(done_games)} Games | Path: {path}")
+        return stored
+
+    earlier = history_files([s for s in stored_seasons(save_dir) if s < season], save_dir)
+    prior = pl.concat([pl.read_parquet(p) for p in earlier] + ([stored] if stored is not None else []), how='diagonal') if (earlier or stored is not None) else None
+
+    rows = roll_history(prior, new_rows, roll_games)
+    stored = rows if stored is None else pl.concat([stored, rows.select(stored.columns)])
+    os.makedirs(save_dir, exist_ok=True)
+    stored.sort('role', 'player_id', 'game_date', 'game_id').write_parquet(path, use_pyarrow=True)
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"History {season} Updated: {rows['game_id'].n_unique()} New Games | {rows.height} Rows | {stored['player_id'].n_unique()} Players in {elap_time} Seconds | Path: {path}")
+    return stored
+
+### END SHOOTER / GOALIE HISTORY ###
+
+### AS-OF HISTORY FEATURES - DEFINE ###
+
+# Feature Prefixes (sh_ = Shooter, gk_ = Goalie Faced)
+role_prefix = {'shooter': 'sh', 'goalie': 'gk'}
+
+# 4) FUNCTION: Prior-To-Game Shooter And Goalie Features For Every Shot
+def history_features(shots, season, save_dir=history_dir, with_xg=False):
+    """This function will as-of join each shot to the shooter's and the goalie's latest history row dated strictly before the
+    shot's game (nothing from the shot's own game leaks in) and return season/game_id/event_idx + per role:
+    games, career/season/last ROLL_GAMES attempts and goals, and shrunk finishing rates (save rate for goalies).
+    with_xg adds goals-above-expected per attempt (needs history built with xg_col)"""
+    files = history_files([s for s in stored_seasons(save_dir) if s <= season], save_dir)
+    history = pl.concat([pl.read_parquet(p) for p in files], how='diagonal') if files else None
+    game_date = pl.col('game_date').str.to_date() if shots.schema['game_date'] == pl.Utf8 else pl.col('game_date').cast(pl.Date)
+    events = (
+        shots
+        .select([
+            'season', 'game_id', 'event_idx', game_date.alias('game_date'),
+            pl.col('event_player_1_id').cast(pl.Utf8).alias('shooter'),
+            pl.when(pl.col('event_team_type') == 'home').then(pl.col('away_goalie')).otherwise(pl.col('home_goalie')).cast(pl.Utf8).alias('goalie')
+        ])
+        .sort('game_date')
+    )
+
+    out = events.select('season', 'game_id', 'event_idx')
+    for role, prefix in role_prefix.items():
+        id_col = 'shooter' if role == 'shooter' else 'goalie'
+        k = SHOOTER_K if role == 'shooter' else GOALIE_K
+        if history is None:
+            state = pl.DataFrame(schema={'player_id': pl.Utf8, 'game_date': pl.Date, 'season': pl.Int64, 'game_n': pl.Int32,
+                                         **{f"{p}_{s}": pl.Float64 for p in ['cum', 'szn', 'roll'] for s in history_stats}})
+        else:
+            state = history.filter(pl.col('role') == role).drop('role').sort('game_date')
+        # A State Row Dated D Is First Usable On D + 1, So A Backward Join Never Sees The Shot's Own Game
+        joined = events.select('season', 'game_id', 'event_idx', 'game_date', pl.col(id_col).alias('player_id')).join_asof(
+            state
+            .rename({'season': '_hist_season'})
+            .select(['player_id', (pl.col('game_date') + pl.duration(days=1)).alias('game_date'), '_hist_season', 'game_n'] + [f"{p}_{s}" for p in ['cum', 'szn', 'roll'] for s in history_stats]),
+            on='game_date', by='player_id', strategy='backward'
+        )
+        same_season = pl.col('_hist_season') == pl.col('season')
+        feats = [pl.col('game_n').fill_null(0).alias(f"{prefix}_games")]
+        for window in ['cum', 'szn', 'roll']:
+            shots_c = pl.col(f"{window}_shots").fill_null(0)
+            goals_c = pl.col(f"{window}_goals").fill_null(0)
+            if window == 'szn':
+                shots_c = pl.when(same_season).then(shots_c).otherwise(0)
+                goals_c = pl.when(same_season).then(goals_c).otherwise(0)
+            rate = (goals_c + k * LEAGUE_FENWICK_SH_PCT) / (shots_c + k)
+            feats += [
+                shots_c.cast(pl.Float64).alias(f"{prefix}_{window}_shots"),
+                goals_c.cast(pl.Float64).alias(f"{prefix}_{window}_goals"),
+                (rate if role == 'shooter' else 1 - rate).alias(f"{prefix}_{window}_{'sh_pct' if role == 'shooter' else 'sv_pct'}")
+            ]
+            if with_xg:
+                xg_c = pl.col(f"{window}_xg").fill_null(0)
+                if window == 'szn':
+                    xg_c = pl.when(same_season).then(xg_c).otherwise(0)
+                sign = 1 if role == 'shooter' else -1
+                feats.append((sign * (goals_c - xg_c) / (shots_c + k)).alias(f"{prefix}_{window}_gax_per_shot"))
+        out = out.join(joined.select(['season', 'game_id', 'event_idx'] + feats), on=['season', 'game_id', 'event_idx'], how='left')
+    return out
+
+# 5) FUNCTION: Join History Features Onto A Model Frame
+def add_history_features(data, features):
+    """This function will left join history_features onto a model_prep/imp_sec_type frame by season/game_id/event_idx"""
+    return data.join(features, on=['season', 'game_id', 'event_idx'], how='left')
+
+### END AS-OF HISTORY FEATURES ###
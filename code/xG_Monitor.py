@@ -0,0 +1,255 @@
+# Arrays
+import numpy as np
+
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import json
+
+
+### MODEL MONITOR - DEFINE ###
+
+# Path
+monitor_file = 'Data/Monitor/Model_Monitor.npz'
+
+# Fine xG Bins (Width 0.005) - AUC Comes From These Histograms, Calibration Merges Them Into CALIB_EDGES
+N_BINS = 200
+CALIB_EDGES = [0.0, 0.02, 0.04, 0.06, 0.08, 0.10, 0.15, 0.20, 0.30, 0.50, 1.0]
+
+# Sums Kept Per (Model Type, Week) x Bin - Every Report Is Built From Sums, So Two Monitors Merge By Adding Arrays
+monitor_stats = ['shots', 'goals', 'xg', 'logloss']
+
+# Probability Clip For Log Loss (Same As sklearn)
+EPS = 1e-15
+
+# 1) CLASS: Mergeable Log Loss / Calibration / AUC Accumulators Per Strength Model x Week
+class ModelMonitor:
+    """Keeps shots, goals, xG sum and log loss sum per fine xG bin for every (model_type, week) key.
+
+    Scored games are added once (game_ids already added are skipped) and every log loss, AUC, calibration table or drift
+    report afterwards is a sum over stored bins, so nothing is re-predicted and the season is never rescanned. A re-scored
+    game is patched by remove_scored (its old rows) then add_scored (its new rows).
+    """
+
+    def __init__(self, n_bins=N_BINS):
+        """
+        Parameters:
+        - n_bins (int): Equal-width xG bins on [0, 1] (200 = 0.005 wide, AUC error well under 0.001).
+        """
+        self.n_bins = n_bins
+        self.keys = []
+        self._key_idx = {}
+        self.arrays = {stat: np.zeros((0, n_bins), dtype=np.int64 if stat in ['shots', 'goals'] else np.float64) for stat in monitor_stats}
+        self.game_ids = set()
+
+    def _grow(self, new_keys):
+        for key in new_keys:
+            self._key_idx[key] = len(self.keys)
+            self.keys.append(key)
+        for stat in monitor_stats:
+            pad = np.zeros((len(new_keys), self.n_bins), dtype=self.arrays[stat].dtype)
+            self.arrays[stat] = np.concatenate([self.arrays[stat], pad])
+
+    def add_scored(self, shots, xg_col='xG'):
+        """Accumulate every scored shot from games not already added. Needs game_id, game_date, model_type, xG, event_type (or is_goal)"""
+        new_games = self._accumulate(shots.filter(~pl.col('game_id').is_in(list(self.game_ids))), xg_col, 1)
+        self.game_ids |= new_games
+        return len(new_games)
+
+    def remove_scored(self, shots, xg_col='xG'):
+        """Subtract the scored shots of games already added (pass the same rows they were added with) and forget those games,
+        so add_scored of their re-scored rows patches revised games in place. Returns the games removed"""
+        old_games = self._accumulate(shots.filter(pl.col('game_id').is_in(list(self.game_ids))), xg_col, -1)
+        self.game_ids -= old_games
+        return len(old_games)
+
+    def _accumulate(self, shots, xg_col, sign):
+        """Add (sign = 1) or subtract (sign = -1) the shots' bins and return their game_ids"""
+        data = shots.filter(pl.col(xg_col).is_not_null())
+        if data.height == 0:
+            return set()
+        goal = (pl.col('event_type') == 'GOAL') if 'event_type' in data.columns else (pl.col('is_goal') == 1)
+        game_date = pl.col('game_date').str.to_date() if data.schema['game_date'] == pl.Utf8 else pl.col('game_date').cast(pl.Date)
+        data = data.select([
+            pl.col('model_type').cast(pl.Utf8),
+            game_date.dt.truncate('1w').dt.strftime('%Y-%m-%d').alias('week'),
+            goal.cast(pl.Int64).alias('goal'),
+            pl.col(xg_col).cast(pl.Float64).clip(EPS, 1 - EPS).alias('xg'),
+            pl.col('game_id')
+        ])
+
+        # a) Key Index Per Shot (New Keys Get New Rows)
+        key_rows = list(zip(data['model_type'].to_list(), data['week'].to_list()))
+        new_keys = sorted({k for k in key_rows if k not in self._key_idx})
+        if new_keys:
+            self._grow(new_keys)
+        key_idx = np.fromiter((self._key_idx[k] for k in key_rows), dtype=np.int64, count=len(key_rows))
+
+        # b) Bin Index + Per-Shot Log Loss
+        xg = data['xg'].to_numpy()
+        goals = data['goal'].to_numpy()
+        bins = np.minimum((xg * self.n_bins).astype(np.int64), self.n_bins - 1)
+        logloss = -(goals * np.log(xg) + (1 - goals) * np.log(1 - xg))
+        flat = key_idx * self.n_bins + bins
+        size = len(self.keys) * self.n_bins
+
+        # c) One bincount Per Stat
+        shape = (len(self.keys), self.n_bins)
+        self.arrays['shots'] += sign * np.bincount(flat, minlength=size).reshape(shape)
+        self.arrays['goals'] += sign * np.bincount(flat, weights=goals, minlength=size).reshape(shape).astype(np.int64)
+        self.arrays['xg'] += sign * np.bincount(flat, weights=xg, minlength=size).reshape(shape)
+        self.arrays['logloss'] += sign * np.bincount(flat, weights=logloss, minlength=size).reshape(shape)
+        return set(data['game_id'].unique().to_list())
+
+    def merge(self, other):
+        """Add another ModelMonitor (same bins) into this one - e.g. monitors built per season or per worker"""
+        if other.n_bins != self.n_bins:
+            raise ValueError(f"Cannot merge monitors with different bins ({self.n_bins} vs {other.n_bins})")
+        new_keys = [k for k in other.keys if k not in self._key_idx]
+        if new_keys:
+            self._grow(new_keys)
+        idx = np.array([self._key_idx[k] for k in other.keys], dtype=np.int64)
+        for stat in monitor_stats:
+            np.add.at(self.arrays[stat], idx, other.arrays[stat])
+        self.game_ids |= other.game_ids
+        return self
+
+    def select(self, model_type=None, weeks=None, start_week=None, end_week=None):
+        """Indices of stored keys matching every filter (None = all). Weeks are 'YYYY-MM-DD' Mondays, start/end inclusive"""
+        def match(value, wanted):
+            if wanted is None:
+                return True
+            if isinstance(wanted, (list, tuple, set)):
+                return value in wanted
+            return value == wanted
+        return [i for i, (m, w) in enumerate(self.keys)
+                if match(m, model_type) and match(w, weeks)
+                and (start_week is None or w >= start_week) and (end_week is None or w <= end_week)]
+
+    def totals(self, idx):
+        """Per-bin sums over the selected keys"""
+        return {stat: self.arrays[stat][idx].sum(axis=0) if idx else np.zeros(self.n_bins) for stat in monitor_stats}
+
+    def metrics(self, idx):
+        """Shots, goals, xG, log loss, histogram AUC and goals/xG for the selected keys"""
+        t = self.totals(idx)
+        shots, goals = float(t['shots'].sum()), float(t['goals'].sum())
+        pos, neg = t['goals'].astype(np.float64), (t['shots'] - t['goals']).astype(np.float64)
+
+        # AUC: Each Goal Beats Every Non-Goal In A Lower Bin And Ties Half Of Those In Its Own Bin
+        neg_below = np.cumsum(neg) - neg
+        n_pos, n_neg = pos.sum(), neg.sum()
+        auc = float((pos * (neg_below + 0.5 * neg)).sum() / (n_pos * n_neg)) if (n_pos > 0 and n_neg > 0) else None
+        xg = float(t['xg'].sum())
+        return {
+            'shots': int(shots),
+            'goals': int(goals),
+            'xG': round(xg, 3),
+            'log_loss': round(float(t['logloss'].sum()) / shots, 5) if shots else None,
+            'auc': round(auc, 5) if auc is not None else None,
+            'goals_per_xg': round(goals / xg, 4) if xg > 0 else None
+        }
+
+    def weekly_report(self, model_type=None):
+        """One row per (model_type, week) with the metrics of that week alone"""
+        rows = [dict({'model_type': m, 'week': w}, **self.metrics([i])) for i, (m, w) in enumerate(self.keys) if model_type is None or m == model_type]
+        return pl.DataFrame(rows).sort('model_type', 'week') if rows else pl.DataFrame()
+
+    def calibration(self, model_type=None, edges=CALIB_EDGES, **filters):
+        """Calibration table (shots, mean xG, goal rate, goal rate - mean xG) per CALIB_EDGES bucket for the selected keys.
+        Edges must fall on fine bin boundaries (multiples of 1 / n_bins)"""
+        t = self.totals(self.select(model_type=model_type, **filters))
+        cuts = [int(round(e * self.n_bins)) for e in edges]
+        rows = []
+        for lo, hi, lo_e, hi_e in zip(cuts[:-1], cuts[1:], edges[:-1], edges[1:]):
+            shots = int(t['shots'][lo:hi].sum())
+            goals, xg = float(t['goals'][lo:hi].sum()), float(t['xg'][lo:hi].sum())
+            rows.append({
+                'bucket': f"{lo_e:.2f}-{hi_e:.2f}",
+                'shots': shots,
+                'mean_xG': round(xg / shots, 4) if shots else None,
+                'goal_rate': round(goals / shots, 4) if shots else None,
+                'gap': round((goals - xg) / shots, 4) if shots else None
+            })
+        return pl.DataFrame(rows)
+
+    def drift_report(self, baseline_end, recent_weeks=4, max_logloss_rise=0.01, max_auc_drop=0.01, max_calib_gap=0.10):
+        """Compare each model's baseline (every week up to baseline_end) with its last recent_weeks weeks.
+
+        A model is flagged when log loss rises or AUC drops by more than the limits, or recent goals/xG moves more than
+        max_calib_gap away from 1
+        """
+        rows = []
+        for model_type in sorted({m for m, _ in self.keys}):
+            weeks = sorted(w for m, w in self.keys if m == model_type)
+            recent = [w for w in weeks if w > baseline_end][-recent_weeks:]
+            base = self.metrics(self.select(model_type=model_type, end_week=baseline_end))
+            cur = self.metrics(self.select(model_type=model_type, weeks=recent)) if recent else None
+            if cur is None or base['shots'] == 0:
+                continue
+            d_logloss = cur['log_loss'] - base['log_loss']
+            d_auc = (cur['auc'] - base['auc']) if (cur['auc'] is not None and base['auc'] is not None) else None
+            calib_off = abs(cur['goals_per_xg'] - 1) if cur['goals_per_xg'] is not None else None
+            rows.append({
+                'model_type': model_type,
+                'recent_weeks': f"{recent[0]} - {recent[-1]}",
+                'base_shots': base['shots'], 'recent_shots': cur['shots'],
+                'base_log_loss': base['log_loss'], 'recent_log_loss': cur['log_loss'], 'log_loss_change': round(d_logloss, 5),
+                'base_auc': base['auc'], 'recent_auc': cur['auc'], 'auc_change': round(d_auc, 5) if d_auc is not None else None,
+                'base_goals_per_xg': base['goals_per_xg'], 'recent_goals_per_xg': cur['goals_per_xg'],
+                'drift': (d_logloss > max_logloss_rise) or (d_auc is not None and d_auc < -max_auc_drop) or (calib_off is not None and calib_off > max_calib_gap)
+            })
+        return pl.DataFrame(rows)
+
+    def save(self, path):
+        """Write arrays, keys and added game_ids to one .npz"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            shots=self.arrays['shots'], goals=self.arrays['goals'], xg=self.arrays['xg'], logloss=self.arrays['logloss'],
+            keys=np.array(json.dumps(self.keys)), game_ids=np.array(sorted(self.game_ids), dtype=np.int64),
+            n_bins=np.array(self.n_bins)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        stored = np.load(path)
+        monitor = cls(n_bins=int(stored['n_bins']))
+        monitor._grow([tuple(k) for k in json.loads(str(stored['keys']))])
+        for stat in monitor_stats:
+            monitor.arrays[stat] = stored[stat]
+        monitor.game_ids = set(stored['game_ids'].tolist())
+        return monitor
+
+# 2) FUNCTION: Add Newly Scored Games To The Stored Monitor
+def update_monitor(shots, path=monitor_file, n_bins=N_BINS, **kwargs):
+    """This function will load Data/Monitor/Model_Monitor.npz (if it exists), accumulate only games not already in it and save.
+    kwargs are passed to ModelMonitor.add_scored (xg_col)"""
+    monitor = ModelMonitor.load(path) if os.path.exists(path) else ModelMonitor(n_bins=n_bins)
+    n_new = monitor.add_scored(shots, **kwargs)
+    if n_new:
+        monitor.save(path)
+    print(f"Model Monitor: {n_new} New Games | {len(monitor.game_ids)} Total Games | {len(monitor.keys)} Model-Weeks | Path: {path}")
+    return monitor
+
+# 3) FUNCTION: One Monitor Per Season, Merged Into monitor_file
+def season_monitor_path(season, path=monitor_file):
+    """Data/Monitor/Model_Monitor_{season}.npz - the part of monitor_file built from one season's scored shots"""
+    return path.replace('.npz', f"_{season}.npz")
+
+def merge_season_monitors(seasons, path=monitor_file, n_bins=N_BINS):
+    """This function will add the stored per-season monitors into one and save it to path. A re-scored season then only
+    rebuilds its own part - the other seasons are summed from their stored arrays, never rescanned"""
+    monitor = ModelMonitor(n_bins=n_bins)
+    for season in seasons:
+        part_path = season_monitor_path(season, path)
+        if os.path.exists(part_path):
+            monitor.merge(ModelMonitor.load(part_path))
+    monitor.save(path)
+    print(f"Model Monitor: {len(seasons)} Seasons Merged | {len(monitor.game_ids)} Total Games | {len(monitor.keys)} Model-Weeks | Path: {path}")
+    return monitor
+
+### END MODEL MONITOR ###
@@ -0,0 +1,604 @@
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import json
+import time
+import hashlib
+import inspect
+import threading
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+### PIPELINE RUNNER - DEFINE ###
+
+# Path (Stage Keys + Output Hashes Of The Last Successful Run Of Every Task)
+manifest_file = 'Data/Pipeline/manifest.json'
+
+# Bytes Read Per Hash Update
+HASH_BLOCK = 1 << 20
+
+# 1) CLASS: One Stage Of The DAG (Optionally Split Into Partitions That Run Independently)
+class Stage:
+    """A pipeline step with declared outputs and dependencies.
+
+    outputs/inputs are path templates ('{p}' = partition). The stage key hashes the stage's own source, code_files, params,
+    external inputs and the content hashes of every upstream output, so a stage reruns only when something it reads changed
+    (and a rerun that writes identical bytes leaves everything downstream up to date).
+
+    deps: stage names, or (name, func) where func(partition) returns the upstream partitions read (default: the same
+    partition when both stages are partitioned by it, else every upstream partition). For an unpartitioned upstream stage
+    func returns [None] (reads it) or [] (does not).
+    volatile: partitions whose source is the live API (e.g. the current season) - their key includes the date, so they
+    rerun once a day. True = every partition.
+    serial: run this stage's partitions one at a time (they share files that are not their outputs, e.g. the loader's
+    game id list and load date).
+    """
+
+    def __init__(self, name, func, outputs, deps=(), partitions=None, inputs=(), code_files=(), params=None, volatile=(), serial=False):
+        self.name = name
+        self.func = func
+        self.outputs = list(outputs)
+        self.deps = [(d, None) if isinstance(d, str) else tuple(d) for d in deps]
+        self.partitions = list(partitions) if partitions is not None else None
+        self.inputs = list(inputs)
+        self.code_files = list(code_files)
+        self.params = dict(params or {})
+        self.volatile = volatile
+        self.serial = serial
+
+    def tasks(self):
+        return [(self.name, p) for p in self.partitions] if self.partitions is not None else [(self.name, None)]
+
+    def paths(self, templates, partition):
+        return [t.format(p=partition) for t in templates]
+
+    def is_volatile(self, partition):
+        return self.volatile is True or partition in (self.volatile or ())
+
+    def run(self, partition):
+        return self.func(partition, **self.params) if self.partitions is not None else self.func(**self.params)
+
+def task_id(name, partition):
+    return name if partition is None else f"{name}[{partition}]"
+
+# 2) FUNCTION: Content Hash Of A File (Reusing The Manifest Hash When Size + mtime Are Unchanged)
+def file_hash(path, known=None):
+    """This function will return sha256 of the file's bytes (None if missing). known is a manifest record
+    {'sha256', 'size', 'mtime_ns'} - when the file still has that size/mtime the stored hash is returned without reading it"""
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    if known and known.get('size') == st.st_size and known.get('mtime_ns') == st.st_mtime_ns:
+        return known['sha256']
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def file_record(path):
+    st = os.stat(path)
+    return {'sha256': file_hash(path), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+# 3) CLASS: Run The DAG - Skip Up-To-Date Tasks, Run Ready Tasks In Parallel
+class Pipeline:
+    """Holds the stages, the manifest of the last successful run of every task and a thread pool to run ready tasks.
+
+    Tasks run on threads: stage work is polars/pyarrow/xgboost (GIL released) or API requests, and every partition writes
+    its own files. The manifest is rewritten atomically after each finished task, so an interrupted run keeps its progress.
+    """
+
+    def __init__(self, stages, manifest_path=manifest_file):
+        self.stages = {s.name: s for s in stages}
+        self.manifest_path = manifest_path
+        self.manifest = self._load_manifest()
+        self._lock = threading.Lock()
+        self._serial_locks = {s.name: threading.Lock() for s in stages if s.serial}
+
+        missing = sorted({d for s in stages for d, _ in s.deps if d not in self.stages})
+        if missing:
+            raise ValueError(f"Unknown dependency stages: {missing}")
+
+    def _load_manifest(self):
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as file:
+                return json.load(file)
+        return {}
+
+    def _save_manifest(self):
+        os.makedirs(os.path.dirname(self.manifest_path) or '.', exist_ok=True)
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump(self.manifest, file, indent=1, sort_keys=True)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def upstream(self, name, partition):
+        """(stage, partition) tasks this task reads"""
+        stage = self.stages[name]
+        out = []
+        for dep, select in stage.deps:
+            dep_stage = self.stages[dep]
+            if select is not None:
+                out += [(dep, p) for p in select(partition)]
+            elif dep_stage.partitions is None:
+                out.append((dep, None))
+            elif partition is not None and partition in dep_stage.partitions:
+                out.append((dep, partition))
+            else:
+                out += dep_stage.tasks()
+        return out
+
+    def graph(self, targets=None):
+        """Every task needed for the target stages (all stages by default) -> its upstream tasks"""
+        todo = [t for name in (targets or self.stages) for t in self.stages[name].tasks()]
+        graph = {}
+        while todo:
+            task = todo.pop()
+            if task in graph:
+                continue
+            graph[task] = self.upstream(*task)
+            todo += graph[task]
+        return graph
+
+    def task_key(self, name, partition):
+        """Hash of everything the task's output depends on (call once its upstream tasks are finished)"""
+        stage = self.stages[name]
+        try:
+            source = inspect.getsource(stage.func)
+        except (OSError, TypeError):
+            source = getattr(stage.func, '__qualname__', repr(stage.func))
+        upstream = {}
+        for dep, p in sorted(self.upstream(name, partition), key=str):
+            record = self.manifest.get(task_id(dep, p), {})
+            upstream[task_id(dep, p)] = {path: rec['sha256'] for path, rec in record.get('outputs', {}).items()}
+        recorded = self.manifest.get(task_id(name, partition), {}).get('inputs', {})
+        ingredients = {
+            'stage': name,
+            'partition': partition,
+            'source': hashlib.sha256(source.encode()).hexdigest(),
+            'params': repr(sorted(stage.params.items())),
+            'code_files': {path: file_hash(path) for path in stage.code_files},
+            'inputs': {path: file_hash(path, recorded.get(path)) for path in stage.paths(stage.inputs, partition)},
+            'upstream': upstream,
+            'day': datetime.today().strftime('%Y-%m-%d') if stage.is_volatile(partition) else None
+        }
+        return hashlib.sha256(json.dumps(ingredients, sort_keys=True, default=str).encode()).hexdigest()
+
+    def is_current(self, name, partition, key):
+        """True when the last run had this key and every output still has the hash recorded for it"""
+        record = self.manifest.get(task_id(name, partition))
+        if record is None or record.get('key') != key:
+            return False
+        for path in self.stages[name].paths(self.stages[name].outputs, partition):
+            known = record['outputs'].get(path)
+            if known is None or file_hash(path, known) != known['sha256']:
+                return False
+        return True
+
+    def _record(self, name, partition, key, seconds):
+        stage = self.stages[name]
+        missing = [path for path in stage.paths(stage.outputs, partition) if not os.path.exists(path)]
+        if missing:
+            raise RuntimeError(f"{task_id(name, partition)} finished without writing: {missing}")
+        record = {
+            'key': key,
+            'outputs': {path: file_record(path) for path in stage.paths(stage.outputs, partition)},
+            'inputs': {path: file_record(path) for path in stage.paths(stage.inputs, partition) if os.path.exists(path)},
+            'seconds': seconds,
+            'finished_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        }
+        with self._lock:
+            self.manifest[task_id(name, partition)] = record
+            self._save_manifest()
+        return record
+
+    def _run_task(self, name, partition, key):
+        with self._serial_locks.get(name) or nullcontext():
+            start_time = time.time()
+            self.stages[name].run(partition)
+            seconds = round(time.time() - start_time, 2)
+        return self._record(name, partition, key, seconds)
+
+    def mark_current(self, tasks):
+        """Record the files on disk as the up-to-date outputs of tasks [(stage, partition)], in the order given (upstream
+        first), without running them - for outputs patched outside the runner (see patch_games)"""
+        for name, partition in tasks:
+            self._record(name, partition, self.task_key(name, partition), 0.0)
+
+    def run(self, targets=None, max_workers=4, force=(), dry_run=False):
+        """This function will bring the target stages (and everything upstream) up to date.
+
+        force: stage names to rerun even when current. dry_run prints what would run (treating every stale task as if it
+        reran with new output). Returns {task_id: 'current' | 'ran' | 'failed' | 'blocked' | 'stale'}
+        """
+        start_time = time.time()
+        graph = self.graph(targets)
+        status = {}
+        pending = dict(graph)
+        running = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while pending or running:
+                # a) Tasks Whose Upstream Tasks Have All Finished
+                for task in [t for t, ups in pending.items() if all(u in status for u in ups)]:
+                    ups = pending.pop(task)
+                    name, partition = task
+                    if any(status[u] in ['failed', 'blocked'] for u in ups):
+                        status[task] = 'blocked'
+                        print(f"Blocked (Upstream Failed): {task_id(*task)}")
+                        continue
+                    if dry_run and any(status[u] == 'stale' for u in ups):
+                        status[task] = 'stale'
+                        continue
+                    key = self.task_key(name, partition)
+                    if name not in force and self.is_current(name, partition, key):
+                        status[task] = 'current'
+                    elif dry_run:
+                        status[task] = 'stale'
+                    else:
+                        print(f"Running: {task_id(*task)}")
+                        running[pool.submit(self._run_task, name, partition, key)] = task
+
+                if not running:
+                    continue
+
+                # b) Wait For Any Running Task
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    task = running.pop(future)
+                    try:
+                        record = future.result()
+                        status[task] = 'ran'
+                        print(f"Finished: {task_id(*task)} in {record['seconds']} Seconds")
+                    except Exception as e:
+                        status[task] = 'failed'
+                        print(f"Failed: {task_id(*task)} | {type(e).__name__}: {e}")
+
+        counts = {s: sum(1 for v in status.values() if v == s) for s in ['current', 'ran', 'stale', 'failed', 'blocked']}
+        elap_time = round(time.time() - start_time, 2)
+        print(f"Pipeline {'Dry Run' if dry_run else 'Run'} Done in {elap_time} Seconds | " + ' | '.join(f"{k.title()}: {v}" for k, v in counts.items() if v) + f" | Manifest: {self.manifest_path}")
+        return {task_id(*t): s for t, s in sorted(status.items(), key=lambda kv: str(kv[0]))}
+
+### END PIPELINE RUNNER ###
+
+### xG PIPELINE STAGES - DEFINE ###
+
+# Strength Models
+MODEL_TYPES = ['EV', 'PP', 'SH', 'EN']
+
+# Paths
+features_dir = 'Data/Features'
+models_dir = 'Data/Models'
+scored_dir = 'Data/Scored'
+aggregated_file = 'Data/Pipeline/aggregated.json'
+
+# Shot Context Kept Next To The Features (Columns The Cube/Player/Grid/Monitor Accumulators Read From Scored Shots)
+shot_context_cols = [
+    'season', 'game_id', 'event_idx', 'season_type', 'game_date', 'period', 'event_type', 'secondary_type',
+    'event_team_abbr', 'event_team_type', 'home_abbreviation', 'away_abbreviation', 'event_player_1_id', 'x_abs', 'y_abs',
+    'home_1_on_id', 'home_2_on_id', 'home_3_on_id', 'home_4_on_id', 'home_5_on_id', 'home_6_on_id', 'home_goalie',
+    'away_1_on_id', 'away_2_on_id', 'away_3_on_id', 'away_4_on_id', 'away_5_on_id', 'away_6_on_id', 'away_goalie'
+]
+
+# 4) FUNCTION: Schedule Stage - Current Season Schedule Through Yesterday
+def schedule_stage(season):
+    from LoadSchedule import load_schedule
+
+    yday = (datetime.today() - timedelta(days=1)).strftime('%Y-%m-%d')
+    path = f"Data/Schedule/NHL_Schedule_{season}.parquet"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    load_schedule(start=f"{season}-10-01", end=min(yday, f"{season + 1}-06-30")).write_parquet(path)
+
+# 5) FUNCTION: Rosters Stage
+def rosters_stage(path):
+    from LoadRosters import load_rosters
+
+    load_rosters(path)
+
+# 6) FUNCTION: Games + Shifts Stage - One Season File, Its Stint Table And On-Ice Bridge
+def games_stage(season, current_season):
+    """The runner only calls this when the task key changed (loader code, or rosters / a new day for the current season), so
+    a past season whose last load finished is reloaded from scratch instead of being skipped as complete. A load that stopped
+    part way resumes from its checkpoints"""
+    import Load_All_PBP as loader
+
+    if season == current_season and os.path.exists(f"Data/PBP/API_RAW_PBP_Data_{season}.parquet"):
+        loader.update_pbp_file(current_season=season)
+    else:
+        loader.load_all_games(season_start=season, season_end=season + 1, resume=not loader.load_progress(season)['complete'])
+
+# 7) FUNCTION: History Stage - Rebuild One Season Of Shooter/Goalie State On Top Of The Earlier Seasons
+def history_stage(season):
+    from xG_History import update_history
+
+    cols = ['season', 'game_id', 'game_date', 'event_type', 'event_player_1_id', 'event_team_type', 'home_goalie', 'away_goalie']
+    update_history(pl.read_parquet(f"Data/PBP/API_RAW_PBP_Data_{season}.parquet", columns=cols), season, rebuild=True)
+
+# 8) FUNCTION: Features Stage - Notebook Feature Steps For One Season, One File Per Strength Model
+def season_features(season, encoding='onehot', game_ids=None):
+    """This function will return (shot context, {model_type: model frame}) for one season file (only game_ids when given -
+    the shot type imputer then trains on those games' shots, see xG_Sample)"""
+    import Load_All_PBP as loader
+    from Build_xG_Features import clean_pbp_data, index_input_data, split_by_strength, model_prep, imp_sec_type
+    from xG_History import history_features, add_history_features
+
+    roster = (
+        loader.load_roster()
+        .select([pl.col('player_id').cast(pl.Utf8).alias('event_player_1_id'), 'hand_R', 'hand_L', 'pos_F', 'pos_D', 'pos_G'])
+        .unique()
+    )
+    stint_path = f"Data/Stints/API_Stints_{season}.parquet"
+    stints = pl.read_parquet(stint_path) if os.path.exists(stint_path) else None
+    raw = pl.read_parquet(f"Data/PBP/API_RAW_PBP_Data_{season}.parquet")
+    if game_ids is not None:
+        in_games = pl.col('game_id').cast(pl.Int64).is_in([int(g) for g in game_ids])
+        raw = raw.filter(in_games)
+        stints = stints.filter(in_games) if stints is not None else None
+    data = index_input_data(clean_pbp_data(raw), stints=stints)
+    history = history_features(data, season)
+
+    frames = {}
+    for split, model_type in zip(split_by_strength(data), MODEL_TYPES):
+        frame = add_history_features(imp_sec_type(model_prep(split, model_type, roster=roster, encoding=encoding), encoding=encoding), history)
+        frames[model_type] = frame.drop('event_detail', 'event_team_toi', 'def_team_toi')
+    return data.select([c for c in shot_context_cols if c in data.columns]), frames
+
+def features_stage(season, encoding='onehot'):
+    context, frames = season_features(season, encoding)
+    os.makedirs(features_dir, exist_ok=True)
+    context.write_parquet(os.path.join(features_dir, f"Shots_{season}.parquet"))
+    for model_type, frame in frames.items():
+        frame.write_parquet(os.path.join(features_dir, f"{model_type}_{season}.parquet"))
+
+# 9) FUNCTION: Train Stage - One Model Per Strength State On The Training Seasons
+def train_stage(model_type, train_seasons, model_params=None):
+    import xgboost as xgb
+
+    data = pl.concat([pl.read_parquet(os.path.join(features_dir, f"{model_type}_{s}.parquet")) for s in train_seasons], how='diagonal')
+    df = data.to_pandas().dropna(how='any')
+    features = [col for col in df.columns if col not in ['season', 'game_id', 'event_idx', 'is_goal']]
+    model = xgb.XGBClassifier(**(model_params or {}).get(model_type, {}), enable_categorical=True)
+    model.fit(df[features], df['is_goal'])
+
+    os.makedirs(models_dir, exist_ok=True)
+    model.save_model(os.path.join(models_dir, f"xG_{model_type}.ubj"))
+
+# 10) FUNCTION: Score Stage - xG For Every Shot In A Season, Joined To Its Context
+def score_frames(frames, context):
+    """This function will predict every {model_type: model frame} with the stored models and join the shot context"""
+    import xgboost as xgb
+
+    scored = []
+    for model_type, data in frames.items():
+        if data.height == 0:
+            continue
+        booster = xgb.Booster()
+        booster.load_model(os.path.join(models_dir, f"xG_{model_type}.ubj"))
+        dmat = xgb.DMatrix(data.select(booster.feature_names).to_pandas(), enable_categorical=True)
+        scored.append(
+            data.select('season', 'game_id', 'event_idx', 'is_goal')
+            .with_columns([pl.lit(model_type).alias('model_type'), pl.Series('xG', booster.predict(dmat)).cast(pl.Float64)])
+        )
+    return pl.concat(scored).join(context, on=['season', 'game_id', 'event_idx'], how='left')
+
+def score_stage(season):
+    frames = {m: pl.read_parquet(os.path.join(features_dir, f"{m}_{season}.parquet")) for m in MODEL_TYPES}
+    context = pl.read_parquet(os.path.join(features_dir, f"Shots_{season}.parquet"))
+    os.makedirs(scored_dir, exist_ok=True)
+    score_frames(frames, context).write_parquet(os.path.join(scored_dir, f"PBP_xG_{season}.parquet"))
+
+# 11) FUNCTION: Aggregates Stage - Cube, Player Table, Shot Grids And Monitor From The Re-Scored Seasons
+def scored_path(season):
+    return os.path.join(scored_dir, f"PBP_xG_{season}.parquet")
+
+def aggregated_hashes(path=aggregated_file):
+    """{scored file: sha256} the aggregates were last built from"""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as file:
+        return json.load(file)
+
+def record_aggregated(seasons, path=aggregated_file):
+    """Store the current hash of each season's scored file as aggregated"""
+    done = aggregated_hashes(path)
+    done.update({scored_path(s): file_hash(scored_path(s)) for s in seasons})
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(done, file, indent=1, sort_keys=True)
+
+def aggregates_stage(seasons):
+    """Only seasons whose scored file changed since the last aggregation (or whose grid/monitor part is missing) are
+    re-aggregated: the cube and player table rebuild just their games, their shot grids and monitor parts are rebuilt and the
+    monitor is re-merged from the stored per-season parts. With no cube or player table yet every season is built"""
+    from xG_Cube import update_cube, cube_file
+    from xG_Players import update_player_games, player_games_file
+    from xG_Spatial import ShotGrids, grid_dir
+    from xG_Monitor import ModelMonitor, monitor_file, season_monitor_path, merge_season_monitors
+
+    done = aggregated_hashes()
+    build_all = not (os.path.exists(cube_file) and os.path.exists(player_games_file))
+    grid_path = lambda s: os.path.join(grid_dir, f"ShotGrid_{s}.npz")
+    changed = [
+        s for s in seasons
+        if build_all or done.get(scored_path(s)) != file_hash(scored_path(s))
+        or not os.path.exists(grid_path(s)) or not os.path.exists(season_monitor_path(s, monitor_file))
+    ]
+
+    if changed:
+        shots = pl.concat([pl.read_parquet(scored_path(s)) for s in changed], how='diagonal')
+        stint_paths = [f"Data/Stints/API_Stints_{s}.parquet" for s in changed if os.path.exists(f"Data/Stints/API_Stints_{s}.parquet")]
+        stints = pl.concat([pl.read_parquet(p) for p in stint_paths]) if stint_paths else None
+        games = shots['game_id'].cast(pl.Int64).unique().to_list()
+
+        # These Seasons' Scores Changed - Re-Aggregate Their Games Instead Of Appending
+        update_cube(shots, stints=stints, rebuild_games=games)
+        update_player_games(shots, rebuild_games=games)
+        for season in changed:
+            # Partitions Are Start Years, The season Column Is 20232024 - Match On The Game ID
+            season_shots = shots.filter(pl.col('game_id').cast(pl.Int64) // 1000000 == season)
+            grids = ShotGrids()
+            grids.add_shots(season_shots)
+            grids.save(grid_path(season))
+            part = ModelMonitor()
+            part.add_scored(season_shots)
+            part.save(season_monitor_path(season, monitor_file))
+    merge_season_monitors(seasons, monitor_file)
+    record_aggregated(changed)
+    print(f"Aggregates: {len(changed)} Of {len(seasons)} Seasons Re-Aggregated {changed}")
+
+# 12) FUNCTION: The End-To-End xG DAG
+def build_pipeline(seasons, current_season, train_seasons=None, model_params=None, encoding='onehot', roster_path='Data/NHL_Rosters_2014_2024.csv', manifest_path=manifest_file):
+    """This function will wire schedule -> rosters -> games (+ shifts) -> history -> features -> train -> score -> aggregates.
+
+    seasons: starting years to load, featurize and score. train_seasons defaults to every season before current_season.
+    Seasons and strength models are partitions, so different seasons featurize/score in parallel (loads run one season at a
+    time - the loader shares its game id list) and the four models train in parallel. Only the current season (and the roster/schedule) are re-pulled daily; past seasons rerun only when
+    the code or an upstream file they read changes - a past season's load does not read the daily roster (a call-up must not
+    re-download finished seasons), its features do. History is chained season to season (each season's state carries the
+    earlier seasons forward), so it is the one stage that runs in season order
+    """
+    from xG_Cube import cube_file
+    from xG_Players import player_games_file
+    from xG_Spatial import grid_dir
+    from xG_Monitor import monitor_file, season_monitor_path
+
+    seasons = sorted(seasons)
+    train_seasons = sorted(train_seasons or [s for s in seasons if s < current_season])
+    stages = [
+        Stage('schedule', schedule_stage, ['Data/Schedule/NHL_Schedule_{p}.parquet'], partitions=[current_season], volatile=True,
+              code_files=['LoadSchedule.py']),
+        Stage('rosters', rosters_stage, [roster_path], params={'path': roster_path}, volatile=True, code_files=['LoadRosters.py']),
+        Stage('games', games_stage, ['Data/PBP/API_RAW_PBP_Data_{p}.parquet', 'Data/Stints/API_Stints_{p}.parquet', 'Data/OnIce/API_OnIce_{p}.parquet'],
+              deps=[('rosters', lambda p: [None] if p == current_season else []), ('schedule', lambda p: [current_season] if p == current_season else [])], partitions=seasons,
+              params={'current_season': current_season}, volatile=[current_season], code_files=['Load_All_PBP.py', 'On_Ice.py'], serial=True),
+        Stage('history', history_stage, ['Data/History/Player_History_{p}.parquet'],
+              deps=['games', ('history', lambda p: [s for s in seasons if s < p][-1:])], partitions=seasons, code_files=['xG_History.py']),
+        Stage('features', features_stage, [os.path.join(features_dir, f"{m}_{{p}}.parquet") for m in MODEL_TYPES + ['Shots']],
+              deps=['games', 'rosters', 'history'], partitions=seasons, params={'encoding': encoding}, code_files=['Build_xG_Features.py', 'xG_History.py']),
+        Stage('train', train_stage, [os.path.join(models_dir, 'xG_{p}.ubj')],
+              deps=[('features', lambda p: train_seasons)], partitions=MODEL_TYPES,
+              params={'train_seasons': train_seasons, 'model_params': model_params or {}}),
+        Stage('score', score_stage, [os.path.join(scored_dir, 'PBP_xG_{p}.parquet')],
+              deps=['features', ('train', lambda p: MODEL_TYPES)], partitions=seasons),
+        Stage('aggregates', aggregates_stage, [cube_file, player_games_file, monitor_file] + [os.path.join(grid_dir, f"ShotGrid_{s}.npz") for s in seasons]
+              + [season_monitor_path(s) for s in seasons],
+              deps=['score'], params={'seasons': seasons}, code_files=['xG_Cube.py', 'xG_Players.py', 'xG_Spatial.py', 'xG_Monitor.py'])
+    ]
+    return Pipeline(stages, manifest_path=manifest_path)
+
+# 13) FUNCTION: Patch Features, Scores And Aggregates For A Few Reprocessed Games
+def patch_games(season, game_ids, pipeline=None, encoding='onehot'):
+    """This function will refresh only game_ids downstream of the season file (after Payload_Fingerprints or the finalizer
+    replaced them): season history is rebuilt, features are built with the season as context (shot type imputation and
+    history need it) but only these games' rows are replaced in Data/Features and re-scored into Data/Scored, the cube and
+    player table re-aggregate just these games, and the season's shot grid and the monitor (season part and merged file)
+    subtract these games' old scored rows and add the new ones.
+
+    pipeline: the Pipeline from build_pipeline - the patched season tasks are then recorded current in its manifest, so
+    the next run does not redo the season. Later seasons' history (career totals) is left for the next pipeline run"""
+    from xG_History import update_history
+    from xG_Cube import update_cube
+    from xG_Players import update_player_games
+    from xG_Spatial import ShotGrids, grid_dir
+    from xG_Monitor import ModelMonitor, monitor_file, season_monitor_path
+
+    start_time = time.time()
+    game_ids = [int(g) for g in game_ids]
+    in_games = pl.col('game_id').cast(pl.Int64).is_in(game_ids)
+
+    def replace_rows(path, rows):
+        stored = pl.read_parquet(path) if os.path.exists(path) else None
+        out = rows if stored is None else pl.concat([stored.filter(~in_games), rows.select(stored.columns)])
+        out.sort('season', 'game_id', 'event_idx').write_parquet(path)
+
+    # 1) History + Features (Season Context, Changed Games' Rows Only)
+    cols = ['season', 'game_id', 'game_date', 'event_type', 'event_player_1_id', 'event_team_type', 'home_goalie', 'away_goalie']
+    update_history(pl.read_parquet(f"Data/PBP/API_RAW_PBP_Data_{season}.parquet", columns=cols), season, rebuild=True)
+    context, frames = season_features(season, encoding)
+    context = context.filter(in_games)
+    frames = {m: f.filter(in_games) for m, f in frames.items()}
+    os.makedirs(features_dir, exist_ok=True)
+    replace_rows(os.path.join(features_dir, f"Shots_{season}.parquet"), context)
+    for model_type, frame in frames.items():
+        replace_rows(os.path.join(features_dir, f"{model_type}_{season}.parquet"), frame)
+
+    # 2) Score The Changed Games (Keeping Their Old Scored Rows To Take Back Out Of The Grid/Monitor Sums)
+    shots = score_frames(frames, context)
+    season_scored = scored_path(season)
+    old_shots = pl.read_parquet(season_scored).filter(in_games) if os.path.exists(season_scored) else shots.clear()
+    os.makedirs(scored_dir, exist_ok=True)
+    replace_rows(season_scored, shots)
+
+    # 3) Aggregates - Cube/Players Re-Aggregate These Games, Grids/Monitor Swap Their Old Rows For The New Ones
+    stint_path = f"Data/Stints/API_Stints_{season}.parquet"
+    stints = pl.read_parquet(stint_path).filter(in_games) if os.path.exists(stint_path) else None
+    update_cube(shots, stints=stints, rebuild_games=game_ids)
+    update_player_games(shots, rebuild_games=game_ids)
+    grid_path = os.path.join(grid_dir, f"ShotGrid_{season}.npz")
+    if os.path.exists(grid_path):
+        grids = ShotGrids.load(grid_path)
+        grids.remove_shots(old_shots)
+        grids.add_shots(shots)
+    else:
+        grids = ShotGrids()
+        grids.add_shots(pl.read_parquet(season_scored))
+    grids.save(grid_path)
+    for path in [season_monitor_path(season, monitor_file), monitor_file]:
+        if os.path.exists(path):
+            monitor = ModelMonitor.load(path)
+            monitor.remove_scored(old_shots)
+            monitor.add_scored(shots)
+            monitor.save(path)
+    record_aggregated([season])
+
+    # 4) Tell The Runner These Outputs Are Current
+    if pipeline is not None:
+        graph = pipeline.graph()
+        tasks = [t for t in [('games', season), ('history', season), ('features', season), ('score', season), ('aggregates', None)] if t in graph]
+        pipeline.mark_current(tasks)
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"Patched {len(game_ids)} Games In {season}-{season+1} Season ({shots.height} Shots Re-Scored) in {elap_time} Seconds")
+    return shots
+
+### END xG PIPELINE STAGES ###
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point - one command brings every stage current:
+
+    python xG_Pipeline.py --seasons 2021 2022 2023 --current 2023 [--target score] [--workers 4] [--force train] [--dry-run]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Bring the xG pipeline up to date, skipping stages whose inputs have not changed")
+    parser.add_argument('--seasons', nargs='+', type=int, required=True, help="Starting years to load, featurize and score")
+    parser.add_argument('--current', type=int, required=True, help="Current season (re-pulled from the API once a day)")
+    parser.add_argument('--train-seasons', nargs='+', type=int, default=None, help="Seasons to train on (default: every season before --current)")
+    parser.add_argument('--params', default=None, help="JSON file of XGBClassifier params keyed by model type (EV/PP/SH/EN)")
+    parser.add_argument('--encoding', default='onehot', choices=['onehot', 'categorical'], help="model_prep encoding")
+    parser.add_argument('--target', nargs='+', default=None, help="Only bring these stages (and their upstream) current")
+    parser.add_argument('--workers', type=int, default=4, help="Tasks run at once")
+    parser.add_argument('--force', nargs='+', default=[], help="Stages to rerun even if current")
+    parser.add_argument('--dry-run', action='store_true', help="Print what would run without running it")
+    args = parser.parse_args(argv)
+
+    model_params = None
+    if args.params:
+        with open(args.params) as file:
+            model_params = json.load(file)
+    pipeline = build_pipeline(args.seasons, args.current, train_seasons=args.train_seasons, model_params=model_params, encoding=args.encoding)
+    status = pipeline.run(targets=args.target, max_workers=args.workers, force=args.force, dry_run=args.dry_run)
+    for task, state in status.items():
+        print(f"{task:<24}{state}")
+    return 1 if any(state in ['failed', 'blocked'] for state in status.values()) else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
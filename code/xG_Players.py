@@ -0,0 +1,143 @@
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import time
+
+
+### PLAYER xG ACCUMULATORS - DEFINE ###
+
+# Path
+player_games_file = 'Data/Players/Player_xG_Games.parquet'
+
+# One Row Per Player x Game x Strength Model (model_type Is Always The Shooting Team's Model, Same As The Team Cube)
+player_keys = ['season', 'game_id', 'player_id', 'team_type', 'model_type']
+
+# Individual (Shooter) And On-Ice (Any Skater/Goalie On The Ice For The Shot) Sums
+player_measures = ['ixG', 'iG', 'iSF', 'iFF', 'oi_xGF', 'oi_xGA', 'oi_GF', 'oi_GA', 'oi_FF', 'oi_FA']
+
+# On-Ice Player Columns Written By append_shift_data
+on_ice_cols = {
+    'home': [f'home_{n}_on_id' for n in range(1, 7)] + ['home_goalie'],
+    'away': [f'away_{n}_on_id' for n in range(1, 7)] + ['away_goalie']
+}
+
+# 1) FUNCTION: Shots -> Player Rows (Shooter + Every On-Ice Player)
+def player_rows(shots):
+    """This function will turn scored shots (xG + event_player_1_id + on-ice id columns) into one individual row for the
+    shooter and one on-ice row for each player on the ice, then sum them per player_keys.
+
+    The 14 on-ice columns are stacked with one select each (no struct explode), so only the shots passed in are touched.
+    """
+    goal = (pl.col('event_type') == 'GOAL') if 'event_type' in shots.columns else (pl.col('is_goal') == 1)
+    sog = pl.col('event_type').is_in(['GOAL', 'SHOT']) if 'event_type' in shots.columns else pl.lit(None)
+    base = (
+        shots
+        .with_columns([
+            pl.col('game_id').cast(pl.Int64),
+            pl.col('xG').cast(pl.Float64),
+            goal.cast(pl.Int32).alias('_goal'),
+            sog.cast(pl.Int32).alias('_sog')
+        ])
+    )
+
+    zero_f, zero_i = pl.lit(0.0).cast(pl.Float64), pl.lit(0).cast(pl.Int32)
+    frames = [
+        base.select(
+            'season', 'game_id', pl.col('event_player_1_id').cast(pl.Utf8).alias('player_id'),
+            pl.col('event_team_type').alias('team_type'), 'model_type', pl.lit(False).alias('is_goalie'),
+            pl.col('xG').alias('ixG'), pl.col('_goal').alias('iG'), pl.col('_sog').alias('iSF'), pl.lit(1).cast(pl.Int32).alias('iFF'),
+            zero_f.alias('oi_xGF'), zero_f.alias('oi_xGA'), zero_i.alias('oi_GF'), zero_i.alias('oi_GA'), zero_i.alias('oi_FF'), zero_i.alias('oi_FA')
+        )
+    ]
+    for side, cols in on_ice_cols.items():
+        is_for = pl.col('event_team_type') == side
+        for col in cols:
+            if col not in base.columns:
+                continue
+            frames.append(base.select(
+                'season', 'game_id', pl.col(col).cast(pl.Utf8).alias('player_id'),
+                pl.lit(side).alias('team_type'), 'model_type', pl.lit(col.endswith('goalie')).alias('is_goalie'),
+                zero_f.alias('ixG'), zero_i.alias('iG'), zero_i.alias('iSF'), zero_i.alias('iFF'),
+                pl.when(is_for).then(pl.col('xG')).otherwise(0.0).alias('oi_xGF'),
+                pl.when(~is_for).then(pl.col('xG')).otherwise(0.0).alias('oi_xGA'),
+                pl.when(is_for).then(pl.col('_goal')).otherwise(0).cast(pl.Int32).alias('oi_GF'),
+                pl.when(~is_for).then(pl.col('_goal')).otherwise(0).cast(pl.Int32).alias('oi_GA'),
+                pl.when(is_for).then(1).otherwise(0).cast(pl.Int32).alias('oi_FF'),
+                pl.when(~is_for).then(1).otherwise(0).cast(pl.Int32).alias('oi_FA')
+            ))
+
+    return (
+        pl.concat(frames)
+        .filter(pl.col('player_id').is_not_null() & (pl.col('player_id') != ''))
+        .group_by(player_keys)
+        .agg([pl.col('is_goalie').max()] + [pl.col(m).sum() for m in player_measures])
+        .sort('game_id', 'team_type', 'player_id', 'model_type')
+    )
+
+# 2) FUNCTION: Add Newly Scored Games To The Stored Player Table
+def update_player_games(shots, save_path=player_games_file, rebuild_games=None):
+    """This function will explode only the games in shots that are not already stored, append their player rows and save.
+
+    rebuild_games: Optional game_ids to drop and re-aggregate (e.g. after re-scoring with a new model)
+    """
+    start_time = time.time()
+    rebuild_games = list(rebuild_games or [])
+    stored = None
+    done_games = []
+    if os.path.exists(save_path):
+        stored = pl.read_parquet(save_path)
+        if rebuild_games:
+            stored = stored.filter(~pl.col('game_id').is_in(rebuild_games))
+        done_games = stored['game_id'].unique().to_list()
+
+    new_shots = shots.filter(~pl.col('game_id').cast(pl.Int64).is_in(done_games))
+    if new_shots.height == 0:
+        print(f"Player Table Up To Date: {len(done_games)} Games | Path: {save_path}")
+        return stored
+
+    rows = player_rows(new_shots)
+    stored = rows if stored is None else pl.concat([stored, rows.select(stored.columns)])
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    stored.write_parquet(save_path, use_pyarrow=True)
+
+    elap_time = round(time.time() - start_time, 2)
+    print(f"Player Table Updated: {rows['game_id'].n_unique()} New Games | {rows.height} Rows | {stored['player_id'].n_unique()} Players in {elap_time} Seconds | Path: {save_path}")
+    return stored
+
+### END PLAYER xG ACCUMULATORS ###
+
+### PLAYER QUERIES - DEFINE ###
+
+# 3) FUNCTION: Season (Or Any Filter) Totals Per Player
+def player_xg_table(player_games, season=None, model_types=None, goalies=False, min_games=1):
+    """This function will total the stored player games and add goals above expected (iG - ixG), on-ice xGF% and,
+    for goalies, goals saved above expected (oi_xGA - oi_GA)"""
+    data = player_games.filter(pl.col('is_goalie') == goalies)
+    if season is not None:
+        data = data.filter(pl.col('season') == season)
+    if model_types is not None:
+        data = data.filter(pl.col('model_type').is_in(model_types))
+
+    data = (
+        data
+        .group_by('player_id')
+        .agg([pl.col('game_id').n_unique().alias('games')] + [pl.col(m).sum() for m in player_measures])
+        .filter(pl.col('games') >= min_games)
+        .with_columns([
+            (pl.col('iG') - pl.col('ixG')).alias('GAx'),
+            (pl.col('oi_xGF') / (pl.col('oi_xGF') + pl.col('oi_xGA'))).alias('oi_xGF_Pct'),
+            (pl.col('oi_GF') / (pl.col('oi_GF') + pl.col('oi_GA'))).alias('oi_GF_Pct')
+        ])
+    )
+    if goalies:
+        return (
+            data
+            .with_columns((pl.col('oi_xGA') - pl.col('oi_GA')).alias('GSAx'))
+            .select('player_id', 'games', 'oi_FA', 'oi_xGA', 'oi_GA', 'GSAx')
+            .sort('GSAx', descending=True)
+        )
+    return data.sort('ixG', descending=True)
+
+### END PLAYER QUERIES ###
@@ -0,0 +1,202 @@
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import json
+import math
+import time
+import hashlib
+from datetime import datetime
+
+
+### SAMPLE MODE - DEFINE ###
+
+# Path (One Folder Per Fraction + Seed, Same File Names As Data/Features)
+sample_dir = 'Data/Sample'
+
+# Season Type From Digits 5-6 Of The Game ID (Preseason Games Are Never Loaded)
+SEASON_TYPES = {'02': 'regular', '03': 'playoffs'}
+
+# Defaults
+SAMPLE_FRAC = 0.1
+SAMPLE_SEED = 87
+
+def sample_path(frac=SAMPLE_FRAC, seed=SAMPLE_SEED, save_dir=sample_dir):
+    return os.path.join(save_dir, f"frac{frac:g}_seed{seed}")
+
+# 1) FUNCTION: Deterministic Stratified Game Sample
+def sample_games(game_ids, frac=SAMPLE_FRAC, seed=SAMPLE_SEED, min_games=1):
+    """This function will return the sorted game ids kept in sample mode: within every (season, season type) stratum the
+    games are ranked by sha256(seed:game_id) and the first ceil(frac x games) (at least min_games) are kept.
+
+    The rank depends only on the seed and the game id - the same call always returns the same games, a larger fraction keeps
+    every game of a smaller one, and playoffs keep their share instead of being swamped by the regular season"""
+    strata = {}
+    for game_id in sorted({int(g) for g in game_ids}):
+        strata.setdefault((game_id // 1000000, str(game_id)[4:6]), []).append(game_id)
+
+    keep = []
+    for games in strata.values():
+        n_keep = min(len(games), max(min_games, math.ceil(frac * len(games))))
+        games.sort(key=lambda g: hashlib.sha256(f"{seed}:{g}".encode()).hexdigest())
+        keep.extend(games[:n_keep])
+    return sorted(keep)
+
+def strata_counts(game_ids):
+    """{'season season_type': games} for the sample manifest"""
+    counts = {}
+    for game_id in game_ids:
+        key = f"{int(game_id) // 1000000} {SEASON_TYPES.get(str(game_id)[4:6], str(game_id)[4:6])}"
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+# 2) FUNCTION: EV/PP/SH/EN Feature Tables For The Sampled Games Only
+def build_sample(seasons, frac=SAMPLE_FRAC, seed=SAMPLE_SEED, encoding='onehot', save_dir=sample_dir):
+    """This function will run the pipeline's feature steps (xG_Pipeline.season_features) on the sampled games of each season
+    and write {model_type}_{season}.parquet + Shots_{season}.parquet to sample_path(frac, seed), with sample.json recording
+    the games kept per stratum and the seconds per season.
+
+    History features are read from the full Data/History state (built by the full pipeline - sample mode never writes it),
+    so a sampled shot gets the same history as in the full tables. The shot type imputer trains on the sampled shots only"""
+    from xG_Pipeline import season_features
+
+    out_dir = sample_path(frac, seed, save_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = {'frac': frac, 'seed': seed, 'encoding': encoding, 'seasons': {}}
+    for season in seasons:
+        start_time = time.time()
+        all_games = pl.read_parquet(f"Data/PBP/API_RAW_PBP_Data_{season}.parquet", columns=['game_id'])['game_id'].cast(pl.Int64).unique().to_list()
+        keep = sample_games(all_games, frac, seed)
+
+        context, frames = season_features(season, encoding, game_ids=keep)
+        context.write_parquet(os.path.join(out_dir, f"Shots_{season}.parquet"))
+        for model_type, frame in frames.items():
+            frame.write_parquet(os.path.join(out_dir, f"{model_type}_{season}.parquet"))
+
+        elap_time = round(time.time() - start_time, 2)
+        manifest['seasons'][str(season)] = {
+            'games': len(keep), 'games_total': len(all_games), 'strata': strata_counts(keep),
+            'shots': {m: f.height for m, f in frames.items()}, 'seconds': elap_time
+        }
+        print(f"Sampled {len(keep)} Of {len(all_games)} Games From {season}-{season+1} Season in {elap_time} Seconds | Path: {out_dir}")
+
+    manifest['built_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(os.path.join(out_dir, 'sample.json'), 'w') as file:
+        json.dump(manifest, file, indent=2)
+    return out_dir
+
+# 3) FUNCTION: Train + Evaluate One Model From A Features Folder
+def fit_and_evaluate(model_type, train_seasons, test_season, train_dir, test_dir, model_params=None):
+    """This function will train the train_stage model (same XGBClassifier params) on train_dir's tables and score test_dir's
+    test season table. Returns rows, fit seconds, log loss, AUC and predicted xG / goals on the test season"""
+    import xgboost as xgb
+    from sklearn.metrics import log_loss, roc_auc_score
+
+    def frame(folder, seasons):
+        paths = [os.path.join(folder, f"{model_type}_{s}.parquet") for s in seasons]
+        return pl.concat([pl.read_parquet(p) for p in paths if os.path.exists(p)], how='diagonal').to_pandas().dropna(how='any')
+
+    train_df, test_df = frame(train_dir, train_seasons), frame(test_dir, [test_season])
+    features = [col for col in train_df.columns if col not in ['season', 'game_id', 'event_idx', 'is_goal']]
+    model = xgb.XGBClassifier(**(model_params or {}).get(model_type, {}), enable_categorical=True)
+
+    tic = time.perf_counter()
+    model.fit(train_df[features], train_df['is_goal'])
+    fit_s = time.perf_counter() - tic
+
+    # One Hot Columns Missing From A Small Sample Are All Zero
+    y_pred = model.predict_proba(test_df.reindex(columns=features, fill_value=0))[:, 1]
+    both_classes = test_df['is_goal'].nunique() == 2
+    return {
+        'train_rows': len(train_df),
+        'fit_s': round(fit_s, 3),
+        'log_loss': round(float(log_loss(test_df['is_goal'], y_pred, labels=[0, 1])), 5),
+        'auc': round(float(roc_auc_score(test_df['is_goal'], y_pred)), 5) if both_classes else None,
+        'xg_per_goal': round(float(y_pred.sum() / max(test_df['is_goal'].sum(), 1)), 4)
+    }
+
+# 4) FUNCTION: Sample Mode vs Full Data On The Same Held-Out Season
+def compare_sample(train_seasons, test_season, frac=SAMPLE_FRAC, seed=SAMPLE_SEED, model_params=None, save_dir=sample_dir):
+    """This function will train each strength model twice - on the sample tables and on the full Data/Features tables - and
+    evaluate both on the full test season, so a sample-mode result can be read against the full-data one. Full-data feature
+    seconds come from the pipeline manifest when it has them. Writes comparison.json next to the sample tables"""
+    from xG_Pipeline import MODEL_TYPES, features_dir, manifest_file
+
+    out_dir = sample_path(frac, seed, save_dir)
+    with open(os.path.join(out_dir, 'sample.json')) as file:
+        sample = json.load(file)
+    full_seconds = None
+    if os.path.exists(manifest_file):
+        with open(manifest_file) as file:
+            manifest = json.load(file)
+        tasks = [manifest.get(f"features[{s}]") for s in train_seasons]
+        full_seconds = round(sum(t['seconds'] for t in tasks), 2) if all(tasks) else None
+
+    results = {
+        'frac': frac, 'seed': seed, 'train_seasons': list(train_seasons), 'test_season': test_season,
+        'feature_seconds': {'sample': round(sum(sample['seasons'][str(s)]['seconds'] for s in train_seasons if str(s) in sample['seasons']), 2), 'full': full_seconds},
+        'models': {}
+    }
+    for model_type in MODEL_TYPES:
+        runs = {
+            'sample': fit_and_evaluate(model_type, train_seasons, test_season, out_dir, features_dir, model_params),
+            'full': fit_and_evaluate(model_type, train_seasons, test_season, features_dir, features_dir, model_params)
+        }
+        runs['change'] = {
+            'log_loss': round(runs['sample']['log_loss'] - runs['full']['log_loss'], 5),
+            'auc': round(runs['sample']['auc'] - runs['full']['auc'], 5) if runs['sample']['auc'] is not None and runs['full']['auc'] is not None else None,
+            'fit_speedup': round(runs['full']['fit_s'] / runs['sample']['fit_s'], 1) if runs['sample']['fit_s'] > 0 else None
+        }
+        results['models'][model_type] = runs
+
+    with open(os.path.join(out_dir, 'comparison.json'), 'w') as file:
+        json.dump(results, file, indent=2)
+    print_comparison(results)
+    return results
+
+def print_comparison(results):
+    print(f"================== Sample ({results['frac']:g} Of Games) vs Full Data | Test Season {results['test_season']} ==================")
+    print(f"{'model':<7}{'data':<8}{'train_rows':>12}{'fit_s':>10}{'log_loss':>11}{'auc':>9}{'xg_per_goal':>13}")
+    for model_type, runs in results['models'].items():
+        for data in ['sample', 'full']:
+            r = runs[data]
+            print(f"{model_type:<7}{data:<8}{r['train_rows']:>12}{r['fit_s']:>10.3f}{r['log_loss']:>11.5f}{str(r['auc']):>9}{r['xg_per_goal']:>13.4f}")
+        c = runs['change']
+        print(f"{model_type:<7}{'change':<8}{'':>12}{str(c['fit_speedup']) + 'x':>10}{c['log_loss']:>11.5f}{str(c['auc']):>9}")
+    secs = results['feature_seconds']
+    print(f"Feature Build Seconds | Sample: {secs['sample']} | Full: {secs['full']}")
+
+### END SAMPLE MODE ###
+
+
+## COMMAND LINE ##
+
+def main(argv = None):
+    """Command line entry point:
+
+    python xG_Sample.py --seasons 2021 2022 2023 [--frac 0.1] [--seed 87] [--compare --test-season 2023]
+    """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build EV/PP/SH/EN feature tables for a stratified sample of games")
+    parser.add_argument('--seasons', nargs='+', type=int, required=True, help="Starting years to sample")
+    parser.add_argument('--frac', type=float, default=SAMPLE_FRAC, help="Fraction of games kept per season and season type")
+    parser.add_argument('--seed', type=int, default=SAMPLE_SEED, help="Sample seed (same seed = same games)")
+    parser.add_argument('--encoding', default='onehot', choices=['onehot', 'categorical'], help="model_prep encoding")
+    parser.add_argument('--compare', action='store_true', help="Also compare sample vs full-data models (needs Data/Features)")
+    parser.add_argument('--test-season', type=int, default=None, help="Held-out season for --compare (default: last of --seasons)")
+    parser.add_argument('--params', default=None, help="JSON file of XGBClassifier params keyed by model type (EV/PP/SH/EN)")
+    args = parser.parse_args(argv)
+
+    build_sample(args.seasons, args.frac, args.seed, args.encoding)
+    if args.compare:
+        model_params = None
+        if args.params:
+            with open(args.params) as file:
+                model_params = json.load(file)
+        test_season = args.test_season or max(args.seasons)
+        compare_sample([s for s in args.seasons if s != test_season], test_season, args.frac, args.seed, model_params)
+
+if __name__ == "__main__":
+    main()
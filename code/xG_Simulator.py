@@ -0,0 +1,189 @@
+# Arrays
+import numpy as np
+
+# Polars (Arrow)
+import polars as pl
+
+
+### GAME SIMULATOR - DEFINE ###
+
+# Regulation/OT Lengths (Minutes) And OT Scoring Pace Relative To 5v5 (3v3 Is Roughly Twice As Fast)
+REG_MINUTES = 60.0
+OT_MINUTES = 5.0
+OT_RATE_MULT = 2.0
+
+# Simulations Drawn Per Batch (Bounds Memory: n_sims x n_games Ints Per Array)
+CHUNK_SIMS = 10000
+
+# 1) FUNCTION: Per-Team Expected Goal Rates From The Cube
+def team_rates(cube, season=None, season_type='R', last_n_games=None, exclude_model_types=['EN']):
+    """This function will turn the team cube into xGF and xGA per game for every team (same filters as team_xg_table)"""
+    from xG_Cube import filter_cube
+
+    data = filter_cube(cube, season, season_type, last_n_games, exclude_model_types)
+
+    return (
+        data
+        .group_by('team')
+        .agg([
+            pl.col('game_id').n_unique().alias('games'),
+            pl.col('xGF').sum(),
+            pl.col('xGA').sum()
+        ])
+        .with_columns([
+            (pl.col('xGF') / pl.col('games')).alias('xGF_pg'),
+            (pl.col('xGA') / pl.col('games')).alias('xGA_pg')
+        ])
+        .select('team', 'games', 'xGF_pg', 'xGA_pg')
+        .sort('team')
+    )
+
+# 2) FUNCTION: Matchup Goal Rates (Offense x Opponent Defense / League Average)
+def matchup_rates(games, rates, home_col='home_team', away_col='away_team', home_edge=1.0):
+    """This function will return (home_rate, away_rate) arrays of expected regulation goals for each game row.
+
+    rate = team xGF/game * opponent xGA/game / league xG/game, so an average offense against an average defense scores
+    the league average. home_edge multiplies the home rate and divides the away rate (1.0 = no home ice edge).
+    """
+    league = float(rates['xGF_pg'].mean())
+    lookup = {t: (f, a) for t, f, a in rates.select('team', 'xGF_pg', 'xGA_pg').iter_rows()}
+    missing = sorted({t for t in games[home_col].to_list() + games[away_col].to_list() if t not in lookup})
+    if missing:
+        raise ValueError(f"No xG rates for teams: {missing}")
+
+    home = np.array([lookup[t] for t in games[home_col].to_list()], dtype=np.float64).reshape(-1, 2)
+    away = np.array([lookup[t] for t in games[away_col].to_list()], dtype=np.float64).reshape(-1, 2)
+    home_rate = home[:, 0] * away[:, 1] / league * home_edge
+    away_rate = away[:, 0] * home[:, 1] / league / home_edge
+    return home_rate, away_rate
+
+# 3) FUNCTION: Regulation + OT/Shootout For Every (Simulation, Game) Pair
+def simulate_games(home_rate, away_rate, n_sims=20000, seed=None, chunk_sims=CHUNK_SIMS):
+    """This function will draw Poisson regulation goals for all games at once and settle ties with a sudden-death OT
+    (first goal wins, exponential waiting time at OT_RATE_MULT x the combined pace) then a 50/50 shootout.
+
+    Returns home_goals, away_goals (regulation), home_win (bool) and went_ot (bool), each shaped (n_sims, n_games)
+    """
+    rng = np.random.default_rng(seed)
+    home_rate = np.asarray(home_rate, dtype=np.float64)
+    away_rate = np.asarray(away_rate, dtype=np.float64)
+
+    out = {k: [] for k in ['home_goals', 'away_goals', 'home_win', 'went_ot']}
+    for start in range(0, n_sims, chunk_sims):
+        n = min(chunk_sims, n_sims - start)
+        hg = rng.poisson(home_rate, size=(n, home_rate.size)).astype(np.int16)
+        ag = rng.poisson(away_rate, size=(n, away_rate.size)).astype(np.int16)
+        for k, v in settle_games(hg, ag, home_rate, away_rate, seed=rng).items():
+            out[k].append(v)
+    return {k: np.concatenate(v) for k, v in out.items()}
+
+# 4) FUNCTION: Per-Shot Bernoulli Draws (Replay A Game's Actual Chances)
+def simulate_shots(shot_xg, shot_game, shot_is_home, n_games=None, n_sims=20000, seed=None, chunk_sims=CHUNK_SIMS):
+    """This function will score every shot with probability xG in every simulation and sum goals per game/side.
+
+    shot_game: integer game index per shot (0..n_games-1), shot_is_home: bool per shot. Goals are summed with one
+    bincount per batch over (sim, game, side), so any number of games is drawn in the same pass.
+    Returns home_goals, away_goals (n_sims, n_games) for use with settle_games
+    """
+    rng = np.random.default_rng(seed)
+    shot_xg = np.asarray(shot_xg, dtype=np.float64)
+    shot_game = np.asarray(shot_game, dtype=np.int64)
+    slot = shot_game * 2 + (~np.asarray(shot_is_home, dtype=bool)).astype(np.int64)
+    n_games = int(shot_game.max()) + 1 if n_games is None else n_games
+
+    home_goals, away_goals = [], []
+    for start in range(0, n_sims, chunk_sims):
+        n = min(chunk_sims, n_sims - start)
+        hits = rng.random((n, shot_xg.size)) < shot_xg
+        sim_idx, shot_idx = np.nonzero(hits)
+        goals = np.bincount(sim_idx * (n_games * 2) + slot[shot_idx], minlength=n * n_games * 2).reshape(n, n_games, 2)
+        home_goals.append(goals[:, :, 0].astype(np.int16))
+        away_goals.append(goals[:, :, 1].astype(np.int16))
+    return np.concatenate(home_goals), np.concatenate(away_goals)
+
+# 5) FUNCTION: Settle Ties From Already Drawn Regulation Goals
+def settle_games(home_goals, away_goals, home_rate=None, away_rate=None, seed=None):
+    """This function will decide OT/shootout winners for tied simulations and return the same dict as simulate_games.
+    seed may be a np.random.Generator to keep drawing from the caller's stream"""
+    rng = np.random.default_rng(seed)
+    n_games = home_goals.shape[1]
+    home_rate = np.ones(n_games) if home_rate is None else np.asarray(home_rate, dtype=np.float64)
+    away_rate = np.ones(n_games) if away_rate is None else np.asarray(away_rate, dtype=np.float64)
+    p_ot_goal = 1.0 - np.exp(-(home_rate + away_rate) * OT_RATE_MULT * OT_MINUTES / REG_MINUTES)
+    p_home_ot = np.divide(home_rate, home_rate + away_rate, out=np.full_like(home_rate, 0.5), where=(home_rate + away_rate) > 0)
+
+    tied = home_goals == away_goals
+    u_goal, u_side = rng.random(home_goals.shape), rng.random(home_goals.shape)
+    ot_winner_home = np.where(u_goal < p_ot_goal, u_side < p_home_ot, u_side < 0.5)
+    return {'home_goals': home_goals, 'away_goals': away_goals, 'home_win': np.where(tied, ot_winner_home, home_goals > away_goals), 'went_ot': tied}
+
+# 6) FUNCTION: Collapse Simulations To Per-Game Probabilities
+def summarize_games(sims, games, total_lines=[5.5, 6.5], id_col='id'):
+    """This function will add win/OT/goal-total probabilities (means over the simulation axis) to the games frame"""
+    # OT/Shootout Winner Counts As One Goal In The Final Score (Same As Sportsbook Totals)
+    total = sims['home_goals'].astype(np.int32) + sims['away_goals'] + sims['went_ot'].astype(np.int32)
+    cols = {
+        'home_win': sims['home_win'].mean(axis=0),
+        'away_win': 1.0 - sims['home_win'].mean(axis=0),
+        'ot_prob': sims['went_ot'].mean(axis=0),
+        'exp_home_goals': sims['home_goals'].mean(axis=0),
+        'exp_away_goals': sims['away_goals'].mean(axis=0),
+        'exp_total': total.mean(axis=0)
+    }
+    for line in total_lines:
+        cols[f'over_{line}'] = (total > line).mean(axis=0)
+    return games.select(id_col).with_columns([pl.Series(name, values) for name, values in cols.items()])
+
+# 7) FUNCTION: One Call From Schedule + Cube Rates To Probabilities
+def game_probabilities(games, rates, n_sims=20000, seed=None, home_col='home_team', away_col='away_team', id_col='id', home_edge=1.0, total_lines=[5.5, 6.5]):
+    """This function will simulate every game in the frame (one slate or the rest of a season) in one vectorized pass"""
+    home_rate, away_rate = matchup_rates(games, rates, home_col, away_col, home_edge)
+    sims = simulate_games(home_rate, away_rate, n_sims=n_sims, seed=seed)
+    return summarize_games(sims, games, total_lines, id_col)
+
+### END GAME SIMULATOR ###
+
+### SEASON SIMULATOR - DEFINE ###
+
+# 8) FUNCTION: Simulate The Rest Of A Season Into Standings Points
+def simulate_season(schedule, rates, current_points=None, n_sims=20000, seed=None, home_col='home_team', away_col='away_team', home_edge=1.0):
+    """This function will simulate every remaining game n_sims times and add points (2 per win, 1 per OT/shootout loss)
+    to current_points ({team: points}) with one bincount per side.
+
+    Returns one row per team with expected final points and the 10th/50th/90th percentile
+    """
+    home_rate, away_rate = matchup_rates(schedule, rates, home_col, away_col, home_edge)
+    teams = sorted(set(rates['team'].to_list()) | set(schedule[home_col].to_list()) | set(schedule[away_col].to_list()))
+    team_idx = {t: n for n, t in enumerate(teams)}
+    home_idx = np.array([team_idx[t] for t in schedule[home_col].to_list()], dtype=np.int64)
+    away_idx = np.array([team_idx[t] for t in schedule[away_col].to_list()], dtype=np.int64)
+    base = np.array([(current_points or {}).get(t, 0) for t in teams], dtype=np.int32)
+
+    rng = np.random.default_rng(seed)
+    points = []
+    for start in range(0, n_sims, CHUNK_SIMS):
+        n = min(CHUNK_SIMS, n_sims - start)
+        sims = simulate_games(home_rate, away_rate, n_sims=n, seed=rng.integers(1 << 32), chunk_sims=n)
+        home_pts = np.where(sims['home_win'], 2, np.where(sims['went_ot'], 1, 0))
+        away_pts = np.where(~sims['home_win'], 2, np.where(sims['went_ot'], 1, 0))
+        sim_offset = (np.arange(n, dtype=np.int64) * len(teams))[:, None]
+        pts = (
+            np.bincount((sim_offset + home_idx).ravel(), weights=home_pts.ravel(), minlength=n * len(teams))
+            + np.bincount((sim_offset + away_idx).ravel(), weights=away_pts.ravel(), minlength=n * len(teams))
+        ).reshape(n, len(teams))
+        points.append(pts + base)
+    points = np.concatenate(points)
+
+    return (
+        pl.DataFrame({
+            'team': teams,
+            'current_points': base,
+            'exp_points': points.mean(axis=0),
+            'points_p10': np.percentile(points, 10, axis=0),
+            'points_p50': np.percentile(points, 50, axis=0),
+            'points_p90': np.percentile(points, 90, axis=0)
+        })
+        .sort('exp_points', descending=True)
+    )
+
+### END SEASON SIMULATOR ###
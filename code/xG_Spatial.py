@@ -0,0 +1,215 @@
+# Arrays
+import numpy as np
+
+# Polars (Arrow)
+import polars as pl
+
+# Tools
+import os
+import json
+
+
+### SPATIAL SHOT GRIDS - DEFINE ###
+
+# Path (One File Per Season)
+grid_dir = 'Data/Grids'
+
+# Rink Extent (Feet) - x_abs/y_abs Are Relative To The Shooting Team's Attacking Zone (x_abs > 0 = Offensive Side)
+X_RANGE = (-100.0, 100.0)
+Y_RANGE = (-42.5, 42.5)
+
+# Stats Stored Per Cell
+grid_stats = ['shots', 'goals', 'xg']
+
+# 1) CLASS: Fixed-Resolution Shot/Goal/xG Arrays Per Team x Season x Strength Model x Shot Type
+class ShotGrids:
+    """Keeps one (shots, goals, xG sum) 2D array per (team, season, model_type, shot_type) key.
+
+    Shots are binned once with np.bincount as games are added and every heatmap afterwards is a sum/ratio/difference of
+    stored arrays. Games already added are remembered so re-adding a frame only bins its new games, and a re-scored game is
+    patched by remove_shots (its old rows) then add_shots (its new rows).
+    """
+
+    def __init__(self, bin_ft=2.0):
+        """
+        Parameters:
+        - bin_ft (float): Cell size in feet (2.0 = 100 x 43 cells).
+        """
+        self.bin_ft = bin_ft
+        self.x_edges = np.arange(X_RANGE[0], X_RANGE[1] + bin_ft, bin_ft)
+        self.y_edges = np.arange(Y_RANGE[0], Y_RANGE[1] + bin_ft, bin_ft)
+        self.shape = (len(self.x_edges) - 1, len(self.y_edges) - 1)
+        self.keys = []
+        self._key_idx = {}
+        self.arrays = {stat: np.zeros((0,) + self.shape, dtype=np.float32 if stat == 'xg' else np.int32) for stat in grid_stats}
+        self.game_ids = set()
+
+    def _grow(self, new_keys):
+        for key in new_keys:
+            self._key_idx[key] = len(self.keys)
+            self.keys.append(key)
+        for stat in grid_stats:
+            pad = np.zeros((len(new_keys),) + self.shape, dtype=self.arrays[stat].dtype)
+            self.arrays[stat] = np.concatenate([self.arrays[stat], pad])
+
+    def add_shots(self, shots, team_col='event_team_abbr', x_col='x_abs', y_col='y_abs', shot_type_col='secondary_type'):
+        """Bin every shot from games not already added. Needs season, game_id, model_type, xG, event_type (or is_goal) + coordinates"""
+        new_games = self._accumulate(shots.filter(~pl.col('game_id').is_in(list(self.game_ids))), 1, team_col, x_col, y_col, shot_type_col)
+        self.game_ids |= new_games
+        return len(new_games)
+
+    def remove_shots(self, shots, team_col='event_team_abbr', x_col='x_abs', y_col='y_abs', shot_type_col='secondary_type'):
+        """Subtract the shots of games already added (pass the same rows they were added with) and forget those games, so
+        add_shots of their re-scored rows patches revised games in place. Returns the games removed"""
+        old_games = self._accumulate(shots.filter(pl.col('game_id').is_in(list(self.game_ids))), -1, team_col, x_col, y_col, shot_type_col)
+        self.game_ids -= old_games
+        return len(old_games)
+
+    def _accumulate(self, shots, sign, team_col, x_col, y_col, shot_type_col):
+        """Add (sign = 1) or subtract (sign = -1) the shots' cells and return their game_ids"""
+        data = shots.filter(pl.col(x_col).is_not_null() & pl.col(y_col).is_not_null())
+        if data.height == 0:
+            return set()
+        goal = (pl.col('event_type') == 'GOAL') if 'event_type' in data.columns else (pl.col('is_goal') == 1)
+        data = data.select([
+            pl.col(team_col).cast(pl.Utf8).alias('team'),
+            pl.col('season').cast(pl.Utf8),
+            pl.col('model_type').cast(pl.Utf8),
+            pl.col(shot_type_col).cast(pl.Utf8).fill_null('Unknown').alias('shot_type'),
+            pl.col(x_col).cast(pl.Float64).alias('x'),
+            pl.col(y_col).cast(pl.Float64).alias('y'),
+            goal.cast(pl.Int32).alias('goal'),
+            pl.col('xG').cast(pl.Float64).fill_null(0.0),
+            pl.col('game_id')
+        ])
+
+        # a) Key Index Per Shot (New Keys Get New Arrays)
+        key_rows = list(zip(data['team'].to_list(), data['season'].to_list(), data['model_type'].to_list(), data['shot_type'].to_list()))
+        new_keys = sorted({k for k in key_rows if k not in self._key_idx}, key=lambda k: tuple(str(v) for v in k))
+        if new_keys:
+            self._grow(new_keys)
+        key_idx = np.fromiter((self._key_idx[k] for k in key_rows), dtype=np.int64, count=len(key_rows))
+
+        # b) Cell Index Per Shot (Clipped To The Rink)
+        ix = np.clip(((data['x'].to_numpy() - X_RANGE[0]) // self.bin_ft).astype(np.int64), 0, self.shape[0] - 1)
+        iy = np.clip(((data['y'].to_numpy() - Y_RANGE[0]) // self.bin_ft).astype(np.int64), 0, self.shape[1] - 1)
+        flat = (key_idx * self.shape[0] + ix) * self.shape[1] + iy
+        size = len(self.keys) * self.shape[0] * self.shape[1]
+
+        # c) One bincount Per Stat
+        self.arrays['shots'] += sign * np.bincount(flat, minlength=size).reshape(self.arrays['shots'].shape).astype(np.int32)
+        self.arrays['goals'] += sign * np.bincount(flat, weights=data['goal'].to_numpy(), minlength=size).reshape(self.arrays['goals'].shape).astype(np.int32)
+        self.arrays['xg'] += sign * np.bincount(flat, weights=data['xG'].to_numpy(), minlength=size).reshape(self.arrays['xg'].shape).astype(np.float32)
+        return set(data['game_id'].unique().to_list())
+
+    def merge(self, other):
+        """Add another ShotGrids (same bin size) into this one - e.g. grids built in parallel per season"""
+        if other.bin_ft != self.bin_ft:
+            raise ValueError(f"Cannot merge grids with different bin sizes ({self.bin_ft} vs {other.bin_ft})")
+        new_keys = [k for k in other.keys if k not in self._key_idx]
+        if new_keys:
+            self._grow(new_keys)
+        idx = np.array([self._key_idx[k] for k in other.keys], dtype=np.int64)
+        for stat in grid_stats:
+            np.add.at(self.arrays[stat], idx, other.arrays[stat])
+        self.game_ids |= other.game_ids
+        return self
+
+    def select(self, team=None, season=None, model_type=None, shot_type=None):
+        """Indices of stored keys matching every filter (None = all, a list = any of)"""
+        def match(value, wanted):
+            if wanted is None:
+                return True
+            if isinstance(wanted, (list, tuple, set)):
+                return value in [str(w) for w in wanted]
+            return value == str(wanted)
+        return [i for i, (t, s, m, st) in enumerate(self.keys)
+                if match(t, team) and match(s, season) and match(m, model_type) and match(st, shot_type)]
+
+    def grid(self, stat='xg', **filters):
+        """2D array for one stat summed over matching keys. stat: shots, goals, xg, xg_per_shot, goals_per_shot, gax (goals - xG)"""
+        idx = self.select(**filters)
+        total = {s: (self.arrays[s][idx].sum(axis=0).astype(np.float64) if idx else np.zeros(self.shape)) for s in grid_stats}
+        if stat in grid_stats:
+            return total[stat]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if stat == 'xg_per_shot':
+                return np.where(total['shots'] > 0, total['xg'] / total['shots'], np.nan)
+            if stat == 'goals_per_shot':
+                return np.where(total['shots'] > 0, total['goals'] / total['shots'], np.nan)
+        if stat == 'gax':
+            return total['goals'] - total['xg']
+        raise ValueError(f"Unknown stat: {stat}")
+
+    def differential(self, stat='xg', per_game=True, **filters):
+        """Filtered grid minus the league-wide grid (same season/model/shot type filters, all teams), per team-game by default"""
+        league_filters = dict(filters, team=None)
+        target, league = self.grid(stat, **filters), self.grid(stat, **league_filters)
+        if per_game and stat in grid_stats:
+            n_teams = max(len({k[0] for k in (self.keys[i] for i in self.select(**league_filters))}), 1)
+            n_target = max(len({k[0] for k in (self.keys[i] for i in self.select(**filters))}), 1)
+            league = league * n_target / n_teams
+        return target - league
+
+    def points(self, arr):
+        """Flatten a grid to (x, y, value) cell centers (non-NaN) for plt.hexbin(C=...) or NHLRink.contourf(..., statistic='mean')"""
+        xc = (self.x_edges[:-1] + self.x_edges[1:]) / 2
+        yc = (self.y_edges[:-1] + self.y_edges[1:]) / 2
+        xx, yy = np.meshgrid(xc, yc, indexing='ij')
+        keep = ~np.isnan(arr)
+        return xx[keep], yy[keep], arr[keep]
+
+    def plot(self, arr, ax=None, cmap='bwr', **kwargs):
+        """Draw a grid with imshow in rink coordinates (x across, y up)"""
+        import matplotlib.pyplot as plt
+
+        ax = ax or plt.gca()
+        img = ax.imshow(arr.T, origin='lower', extent=(X_RANGE[0], X_RANGE[1], Y_RANGE[0], Y_RANGE[1]), cmap=cmap, **kwargs)
+        return img
+
+    def save(self, path):
+        """Write arrays, keys and added game_ids to one .npz"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(
+            path,
+            shots=self.arrays['shots'], goals=self.arrays['goals'], xg=self.arrays['xg'],
+            keys=np.array(json.dumps(self.keys)), game_ids=np.array(sorted(self.game_ids), dtype=np.int64),
+            bin_ft=np.array(self.bin_ft)
+        )
+        return path
+
+    @classmethod
+    def load(cls, path):
+        stored = np.load(path)
+        grids = cls(bin_ft=float(stored['bin_ft']))
+        grids._grow([tuple(k) for k in json.loads(str(stored['keys']))])
+        for stat in grid_stats:
+            grids.arrays[stat] = stored[stat]
+        grids.game_ids = set(stored['game_ids'].tolist())
+        return grids
+
+# 2) FUNCTION: Add New Games To Each Season's Stored Grids
+def update_shot_grids(shots, save_dir=grid_dir, bin_ft=2.0, **kwargs):
+    """This function will load Data/Grids/ShotGrid_{season}.npz (if it exists), bin only games not already in it and save.
+    kwargs are passed to ShotGrids.add_shots (column names). Returns {season: ShotGrids}"""
+    out = {}
+    for season in sorted(shots['season'].unique().to_list()):
+        path = os.path.join(save_dir, f"ShotGrid_{season}.npz")
+        grids = ShotGrids.load(path) if os.path.exists(path) else ShotGrids(bin_ft=bin_ft)
+        n_new = grids.add_shots(shots.filter(pl.col('season') == season), **kwargs)
+        if n_new:
+            grids.save(path)
+        print(f"Shot Grids {season}: {n_new} New Games | {len(grids.game_ids)} Total Games | {len(grids.keys)} Keys | Path: {path}")
+        out[season] = grids
+    return out
+
+# 3) FUNCTION: Load Several Seasons As One Set Of Grids
+def load_shot_grids(seasons, save_dir=grid_dir):
+    """This function will merge the stored grids of every season in seasons into one ShotGrids"""
+    grids = None
+    for season in seasons:
+        season_grids = ShotGrids.load(os.path.join(save_dir, f"ShotGrid_{season}.npz"))
+        grids = season_grids if grids is None else grids.merge(season_grids)
+    return grids
+
+### END SPATIAL SHOT GRIDS ###